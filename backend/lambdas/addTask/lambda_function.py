@@ -1,29 +1,20 @@
-import json
-import boto3
-import os
 import uuid
 from datetime import datetime
 
+from common import get_db, DB_TABLE, user_pk, task_item, rank_between, last_rank, goal_counter_update, lower_next_deadline, cancelled_by_condition, user_id_from_event, query_param, json_body, bump_versions, response, error, idempotent, traced
 
-DB_TABLE = os.environ.get("DB_TABLE")
-db = boto3.client("dynamodb")
-
+@traced("addTask")
+@idempotent
 def lambda_handler(event, context):
     try: 
-        user_id = event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
-        pk = f"USER#{user_id}"
-        goal_id = event["queryStringParameters"]["goalId"] 
-        body = json.loads(event["body"])
+        user_id = user_id_from_event(event)
+        goal_id = query_param(event, "goalId")
+        body = json_body(event)
         task_id = str(uuid.uuid4())
-        order = body.get("order")
         taskText = body.get("taskText")
 
         if not goal_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing goalId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
+            return error(400, "Missing goalId")
 
         created_at = datetime.utcnow().isoformat()
 
@@ -32,29 +23,31 @@ def lambda_handler(event, context):
         else:
             deadline = ''
 
-        db.put_item(
-            TableName=DB_TABLE,
-            Item={
-                "PK": {"S": f"USER#{user_id}"},
-                "SK": {"S": f"TASK#{goal_id}#{task_id}"},
-                "type": {"S": 'task'},
-                "taskText": {"S": taskText},
-                "completed": {"BOOL": False},
-                "createdAt": {"S": created_at},
-                "order": {"N": str(order)},
-                "deadline": {"S": deadline},
-                "timeSpent": {"N": '0'}
-            }
-        )
-
-
-        return {
-            "statusCode": 200,
-            "body": json.dumps({ "success": True }),
-        }
+        pk = user_pk(user_id)
+        # New tasks go to the end of the list
+        rank = rank_between(last_rank(pk, goal_id), None)
+
+        db = get_db()
+        try:
+            db.transact_write_items(TransactItems=[
+                {
+                    "Put": {
+                        "TableName": DB_TABLE,
+                        "Item": task_item(pk, goal_id, task_id, taskText, rank, created_at, deadline)
+                    }
+                },
+                goal_counter_update(pk, goal_id, tasks=1)
+            ])
+        except db.exceptions.TransactionCanceledException as e:
+            if cancelled_by_condition(e):
+                return error(404, "Goal not found")
+            raise
+
+        if deadline:
+            lower_next_deadline(pk, goal_id, deadline)
+        bump_versions(pk, goal_id)
+
+        return response(200, { "success": True, "taskId": task_id, "rank": rank })
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({ "error": str(e) }),
-        }
+        return error(500, str(e))
@@ -0,0 +1,306 @@
+import uuid
+from datetime import datetime
+
+from common import get_db, DB_TABLE, user_pk, task_sk, rank_between, last_rank, goal_counter_update, refresh_next_deadline, encode_task, decode_task, open_keys, task_item, task_update, update_expression, task_condition, try_batch_write, sync_attributes, sync_set, tombstone_put, bump_versions, request_rebalance, user_id_from_event, query_param, json_body, response, error, idempotent, traced
+
+# Body: {"mode": "transaction" | "bestEffort", "operations": [
+#   {"op": "add", "taskText": ..., "deadline"?: ...},
+#   {"op": "edit", "taskId": ..., "taskText"?: ..., "deadline"?: ..., "timeSpent"?: ...},
+#   {"op": "mark", "taskId": ..., "completed": true | false},
+#   {"op": "reorder", "taskId": ..., "prevRank"?: ..., "nextRank"?: ...},
+#   {"op": "delete", "taskId": ...}
+# ]}
+# Operations are applied in order and merged per task, so each task is written once.
+
+OPERATIONS = ("add", "edit", "mark", "reorder", "delete")
+MODES = ("transaction", "bestEffort")
+EDITABLE_FIELDS = ("taskText", "deadline", "timeSpent")
+MAX_OPERATIONS = 100
+# TransactWriteItems takes at most 100 items, one of which is the goal's counter update
+MAX_TRANSACT_ITEMS = 100
+MAX_ATTEMPTS = 3
+BATCH_GET_SIZE = 100
+
+def validate(op):
+    if not isinstance(op, dict) or op.get("op") not in OPERATIONS:
+        return f"op must be one of {', '.join(OPERATIONS)}"
+    kind = op["op"]
+    if kind == "add":
+        if not isinstance(op.get("taskText"), str) or not op["taskText"].strip():
+            return "Missing taskText"
+        return None
+    if not op.get("taskId"):
+        return "Missing taskId"
+    if kind == "mark" and not isinstance(op.get("completed"), bool):
+        return "completed must be a boolean"
+    if kind == "edit":
+        if not any(k in op for k in EDITABLE_FIELDS):
+            return "Nothing to update"
+        if "timeSpent" in op and (isinstance(op["timeSpent"], bool) or not isinstance(op["timeSpent"], int) or op["timeSpent"] < 0):
+            return "timeSpent must be a non-negative integer"
+    if kind == "reorder":
+        try:
+            rank_between(op.get("prevRank"), op.get("nextRank"))
+        except ValueError as e:
+            return str(e)
+    return None
+
+def read_tasks(pk, goal_id, task_ids):
+    # Current items for the tasks the batch refers to, keyed by task id
+    db = get_db()
+    keys = [{"PK": {"S": pk}, "SK": {"S": task_sk(goal_id, t)}} for t in task_ids]
+    found = {}
+    for i in range(0, len(keys), BATCH_GET_SIZE):
+        request = {DB_TABLE: {"Keys": keys[i:i+BATCH_GET_SIZE], "ConsistentRead": True}}
+        while request:
+            resp = db.batch_get_item(RequestItems=request)
+            for item in resp.get("Responses", {}).get(DB_TABLE, []):
+                found[item["SK"]["S"].rpartition("#")[2]] = item
+            request = resp.get("UnprocessedKeys") or None
+    return found
+
+def merge(operations, current, pk, goal_id):
+    # Applies the operations in order to in-memory task states; returns (states, per-operation results)
+    states = {}
+    results = []
+    db_end = None
+    for i, op in enumerate(operations):
+        result = {"index": i, "op": op.get("op") if isinstance(op, dict) else None}
+        results.append(result)
+        message = validate(op)
+        if message:
+            result.update(status="error", error=message)
+            continue
+
+        if op["op"] == "add":
+            # Added tasks go to the end of the list, in the order they appear in the batch. The end is after the last
+            # stored rank and after every rank this batch has assigned so far, since a reorder may have moved a task
+            # past the stored end.
+            if db_end is None:
+                # "" for a goal without ranked tasks, so the lookup still happens once per batch
+                db_end = last_rank(pk, goal_id) or ""
+            assigned = [s["new"]["rank"] for s in states.values() if s["new"]["rank"] and not s["deleted"]]
+            end_rank = rank_between(max([db_end] + assigned) or None, None)
+            task_id = str(uuid.uuid4())
+            states[task_id] = {"old": None, "new": {
+                "taskText": op["taskText"],
+                "deadline": op.get("deadline", ""),
+                "timeSpent": 0,
+                "completed": False,
+                "rank": end_rank
+            }, "deleted": False, "ops": [i]}
+            result.update(status="ok", taskId=task_id, rank=end_rank)
+            continue
+
+        task_id = op["taskId"]
+        result["taskId"] = task_id
+        state = states.get(task_id)
+        if state is None:
+            if task_id not in current:
+                result.update(status="error", error="Task not found")
+                continue
+            old = decode_task(current[task_id])
+            state = states[task_id] = {"old": old, "new": dict(old), "deleted": False, "ops": []}
+        if state["deleted"]:
+            result.update(status="error", error="Task was deleted earlier in this batch")
+            continue
+
+        state["ops"].append(i)
+        if op["op"] == "edit":
+            state["new"].update({k: op[k] for k in EDITABLE_FIELDS if k in op})
+        elif op["op"] == "mark":
+            state["new"]["completed"] = op["completed"]
+        elif op["op"] == "reorder":
+            state["new"]["rank"] = rank_between(op.get("prevRank"), op.get("nextRank"))
+            result["rank"] = state["new"]["rank"]
+        else:
+            state["deleted"] = True
+        result["status"] = "ok"
+    return states, results
+
+def deltas(state):
+    # Changes to the goal's (taskCount, completedCount, totalTimeSpent) from writing this task state
+    old, new = state["old"], state["new"]
+    if old is None:
+        return (0, 0, 0) if state["deleted"] else (1, 0, 0)
+    if state["deleted"]:
+        return (-1, -1 if old["completed"] else 0, -old["timeSpent"])
+    return (0, int(new["completed"]) - int(old["completed"]), new["timeSpent"] - old["timeSpent"])
+
+def changes(state):
+    return {k: v for k, v in state["new"].items() if v != state["old"][k]}
+
+def new_item(pk, goal_id, task_id, task, created_at):
+    return task_item(pk, goal_id, task_id, task["taskText"], task["rank"], created_at, task["deadline"])
+
+def rewritten_item(pk, goal_id, task_id, task, current):
+    # The whole task in the compact encoding, for writes that replace the item
+    item = {
+        "PK": {"S": pk},
+        "SK": {"S": task_sk(goal_id, task_id)},
+        **encode_task(task),
+        **open_keys(pk, goal_id, task["completed"]),
+        **sync_attributes(pk, goal_id)
+    }
+    if task["rank"]:
+        item["rank"] = {"S": task["rank"]}
+    if "order" in current:
+        item["order"] = current["order"]
+    return item
+
+def transact_items(pk, goal_id, states, created_at):
+    items = []
+    totals = [0, 0, 0]
+    for task_id, state in states.items():
+        if state["old"] is None and state["deleted"]:
+            continue
+        key = {"PK": {"S": pk}, "SK": {"S": task_sk(goal_id, task_id)}}
+        # Existing tasks are written only if completed/timeSpent still match what was read, so the counter deltas hold
+        if state["old"]:
+            condition, condition_values, condition_names = task_condition(completed=state["old"]["completed"], time_spent=state["old"]["timeSpent"])
+
+        if state["old"] is None:
+            items.append({"Put": {"TableName": DB_TABLE, "Item": new_item(pk, goal_id, task_id, state["new"], created_at)}})
+        elif state["deleted"]:
+            items.append({"Delete": {
+                "TableName": DB_TABLE,
+                "Key": key,
+                "ConditionExpression": condition,
+                "ExpressionAttributeNames": condition_names,
+                "ExpressionAttributeValues": condition_values
+            }})
+            items.append(tombstone_put(pk, goal_id, task_id))
+        else:
+            changed = changes(state)
+            if not changed:
+                continue
+            sets, removes, expr_attr_vals, expr_attr_names = task_update(changed, pk, goal_id)
+            sync_expr, sync_values = sync_set(pk, goal_id)
+            items.append({"Update": {
+                "TableName": DB_TABLE,
+                "Key": key,
+                "UpdateExpression": update_expression(sets + [sync_expr], removes),
+                "ConditionExpression": condition,
+                "ExpressionAttributeNames": {**expr_attr_names, **condition_names},
+                "ExpressionAttributeValues": {**expr_attr_vals, **sync_values, **condition_values}
+            }})
+        totals = [t + d for t, d in zip(totals, deltas(state))]
+
+    if items:
+        # Also fails the whole transaction if the goal no longer exists
+        items.append(goal_counter_update(pk, goal_id, *totals))
+    return items
+
+def apply_best_effort(pk, goal_id, states, current, created_at):
+    # BatchWriteItem has no conditions or updates: changed tasks are rewritten whole, so a concurrent write to
+    # the same task between the read and this write is lost. Returns the ids of tasks that couldn't be written.
+    requests = {}
+    for task_id, state in states.items():
+        if state["old"] is None and state["deleted"]:
+            continue
+        key = {"PK": {"S": pk}, "SK": {"S": task_sk(goal_id, task_id)}}
+        if state["old"] is None:
+            requests[task_id] = [{"PutRequest": {"Item": new_item(pk, goal_id, task_id, state["new"], created_at)}}]
+        elif state["deleted"]:
+            requests[task_id] = [
+                {"DeleteRequest": {"Key": key}},
+                {"PutRequest": {"Item": tombstone_put(pk, goal_id, task_id)["Put"]["Item"]}}
+            ]
+        elif changes(state):
+            requests[task_id] = [{"PutRequest": {"Item": rewritten_item(pk, goal_id, task_id, state["new"], current[task_id])}}]
+
+    failed_keys = {
+        (r.get("PutRequest", {}).get("Item") or r.get("DeleteRequest", {}).get("Key"))["SK"]["S"]
+        for r in try_batch_write([r for reqs in requests.values() for r in reqs])
+    }
+    failed = {task_id for task_id in requests if task_sk(goal_id, task_id) in failed_keys}
+
+    totals = [0, 0, 0]
+    for task_id in requests:
+        if task_id not in failed:
+            totals = [t + d for t, d in zip(totals, deltas(states[task_id]))]
+    if any(totals):
+        db = get_db()
+        update = goal_counter_update(pk, goal_id, *totals)["Update"]
+        try:
+            db.update_item(
+                TableName=DB_TABLE,
+                Key=update["Key"],
+                UpdateExpression=update["UpdateExpression"],
+                ConditionExpression=update["ConditionExpression"],
+                ExpressionAttributeValues=update["ExpressionAttributeValues"]
+            )
+        except db.exceptions.ConditionalCheckFailedException:
+            # Goal deleted meanwhile; its counters went with it
+            pass
+    return failed
+
+def goal_missing(e):
+    # The goal's counter update is always the last item of the transaction
+    reasons = getattr(e, "response", {}).get("CancellationReasons", [])
+    return bool(reasons) and reasons[-1].get("Code") == "ConditionalCheckFailed"
+
+@traced("batchTasks")
+@idempotent
+def lambda_handler(event, context):
+    try:
+        user_id = user_id_from_event(event)
+        goal_id = query_param(event, "goalId")
+        body = json_body(event)
+        operations = body.get("operations")
+        mode = body.get("mode", "transaction")
+
+        if not goal_id:
+            return error(400, "Missing goalId")
+        if not isinstance(operations, list) or not operations:
+            return error(400, "Missing operations")
+        if len(operations) > MAX_OPERATIONS:
+            return error(400, f"At most {MAX_OPERATIONS} operations per batch")
+        if mode not in MODES:
+            return error(400, f"mode must be one of {', '.join(MODES)}")
+
+        pk = user_pk(user_id)
+        db = get_db()
+        created_at = datetime.utcnow().isoformat()
+        task_ids = {op["taskId"] for op in operations if isinstance(op, dict) and isinstance(op.get("taskId"), str) and op["taskId"]}
+
+        if mode == "bestEffort":
+            current = read_tasks(pk, goal_id, task_ids)
+            states, results = merge(operations, current, pk, goal_id)
+            failed = apply_best_effort(pk, goal_id, states, current, created_at)
+            for task_id in failed:
+                for i in states[task_id]["ops"]:
+                    results[i].update(status="error", error="Write failed")
+        else:
+            # Optimistic: re-read and re-merge if a task changed between the read and the transaction
+            for attempt in range(MAX_ATTEMPTS):
+                current = read_tasks(pk, goal_id, task_ids)
+                states, results = merge(operations, current, pk, goal_id)
+                if any(r["status"] == "error" for r in results):
+                    return response(400, {"error": "Invalid operations, nothing was applied", "results": results})
+
+                items = transact_items(pk, goal_id, states, created_at)
+                if len(items) > MAX_TRANSACT_ITEMS:
+                    return error(400, "Batch touches too many items for one transaction, use bestEffort or split it")
+                if not items:
+                    break
+                try:
+                    db.transact_write_items(TransactItems=items)
+                    break
+                except db.exceptions.TransactionCanceledException as e:
+                    if goal_missing(e):
+                        return error(404, "Goal not found")
+                    if attempt == MAX_ATTEMPTS - 1:
+                        return error(409, "Tasks kept changing while the batch was applied, nothing was applied")
+
+        applied = [r for r in results if r["status"] == "ok"]
+        if applied:
+            # Any of these can move the goal's next deadline
+            refresh_next_deadline(pk, goal_id)
+            bump_versions(pk, goal_id)
+            request_rebalance(user_id, goal_id, [r.get("rank") for r in applied])
+
+        return response(200, {"results": results, "applied": len(applied)})
+
+    except Exception as e:
+        return error(500, str(e))
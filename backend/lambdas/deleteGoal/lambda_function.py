@@ -1,77 +1,22 @@
-import json
-import boto3
-import os
-import time 
-
-DB_TABLE = os.environ.get("DB_TABLE")
-db = boto3.client("dynamodb")
+from common import delete_goal, delete_metrics, user_id_from_event, query_param, bump_versions, user_pk, response, error, idempotent, traced
 
+@traced("deleteGoal")
+@idempotent
 def lambda_handler(event, context):
     try: 
-        user_id = event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
-        pk = f"USER#{user_id}"
-        goal_id = event["queryStringParameters"]["goalId"] 
-        sk_prefix = f"TASK#{goal_id}#"
+        user_id = user_id_from_event(event)
+        goal_id = query_param(event, "goalId")
 
         if not goal_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing goalId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
-
-        response = db.query(
-            TableName=DB_TABLE,
-            KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
-            ExpressionAttributeValues={
-                ":pk": {"S": pk},
-                ":sk_prefix": {"S": sk_prefix}
-            }
-        )
-        
-        #DELETE TASKS 
-        sks = []
-        for item in response["Items"]:
-            sks.append(item["SK"]["S"])
-
-        deleted = 0 
-        for i in range(0, len(sks), 25):
-            batch = sks[i:i+25]
-            req = {DB_TABLE: [{"DeleteRequest": {"Key": {"PK": {"S": pk}, "SK": {"S": k}}}} for k in batch]}
-            print("REQUEST")
-            print(req)
-            backoff = 0.05
-            max_attemps = 5
-            while max_attemps > 0:
-                resp = db.batch_write_item(RequestItems=req)
-                un = resp.get("UnprocessedItems", {}).get(DB_TABLE, [])
-                deleted += len(batch) - len(un)
-                if not un: 
-                    break
-                req = {DB_TABLE: un} 
-                time.sleep(backoff)
-                backoff *= 2
-                max_attemps -= 1
+            return error(400, "Missing goalId")
 
-        #DELETE GOAL
-        sk = f"GOAL#{goal_id}"
-        db.delete_item(
-            TableName=DB_TABLE,
-            Key={
-                "PK": {"S": pk},
-                "SK": {"S": sk}
-            }
-        )
-        
-        print(f"Deleted {deleted} tasks")
+        # Tasks go first and the goal last; a goal too large for one invocation is hidden right away
+        # and finished by goalWorker
+        deleted, remaining = delete_goal(user_id, goal_id, context)
+        bump_versions(user_pk(user_id))
+        delete_metrics(deleted, remaining, "deleteGoal")
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps({ "success": True }),
-        }
+        return response(202 if remaining else 200, { "success": True, "deleted": deleted, "remaining": remaining })
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({ "error": str(e) }),
-        }
+        return error(500, str(e))
@@ -1,49 +1,61 @@
-import json
-import boto3
-import os
+from common import get_db, DB_TABLE, user_pk, task_sk, decode_task, task_condition, goal_counter_update, refresh_next_deadline, cancelled_by_condition, user_id_from_event, query_param, json_body, tombstone_put, bump_versions, response, error, traced
 
-DB_TABLE = os.environ.get("DB_TABLE")
-db = boto3.client("dynamodb")
+MAX_ATTEMPTS = 3
 
+@traced("deleteTask")
 def lambda_handler(event, context):
     try: 
-        user_id = event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
-        pk = f"USER#{user_id}"
-        goal_id = event["queryStringParameters"]["goalId"] 
-        body = json.loads(event["body"])
+        user_id = user_id_from_event(event)
+        goal_id = query_param(event, "goalId")
+        body = json_body(event)
         task_id = body.get("taskId")
 
         if not goal_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing goalId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
+            return error(400, "Missing goalId")
         if not task_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing taskId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
-
-        sk = f"TASK#{goal_id}#{task_id}"
-        
-        db.delete_item(
-            TableName=DB_TABLE,
-            Key={
-                "PK": {"S": pk},
-                "SK": {"S": sk}
-            }
-        )
-
-
-        return {
-            "statusCode": 200,
-            "body": json.dumps({ "success": True }),
+            return error(400, "Missing taskId")
+
+        pk = user_pk(user_id)
+        key = {
+            "PK": {"S": pk},
+            "SK": {"S": task_sk(goal_id, task_id)}
         }
+        db = get_db()
+
+        # Read the task, then delete it only if it still matches what was read, so the goal counters get the right deltas
+        for attempt in range(MAX_ATTEMPTS):
+            task = db.get_item(TableName=DB_TABLE, Key=key, ConsistentRead=True).get("Item")
+            if not task:
+                return response(200, { "success": True })
+
+            task = decode_task(task)
+            completed = task["completed"]
+            time_spent = task["timeSpent"]
+            condition, condition_values, condition_names = task_condition(completed=completed, time_spent=time_spent)
+            try:
+                db.transact_write_items(TransactItems=[
+                    {
+                        "Delete": {
+                            "TableName": DB_TABLE,
+                            "Key": key,
+                            "ConditionExpression": condition,
+                            "ExpressionAttributeNames": condition_names,
+                            "ExpressionAttributeValues": condition_values
+                        }
+                    },
+                    goal_counter_update(pk, goal_id, tasks=-1, completed=-1 if completed else 0, time_spent=-time_spent),
+                    tombstone_put(pk, goal_id, task_id)
+                ])
+                break
+            except db.exceptions.TransactionCanceledException as e:
+                if not cancelled_by_condition(e) or attempt == MAX_ATTEMPTS - 1:
+                    raise
+
+        if not completed and task["deadline"]:
+            refresh_next_deadline(pk, goal_id)
+        bump_versions(pk, goal_id)
+
+        return response(200, { "success": True })
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({ "error": str(e) }),
-        }
+        return error(500, str(e))
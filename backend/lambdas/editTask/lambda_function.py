@@ -1,79 +1,83 @@
-import json
-import boto3
-import os
+from common import get_db, DB_TABLE, user_pk, task_sk, decode_task, goal_counter_update, refresh_next_deadline, cancelled_by_condition, user_id_from_event, query_param, json_body, task_update, update_expression, task_condition, sync_set, bump_versions, response, error, idempotent, traced
 
-DB_TABLE = os.environ.get("DB_TABLE")
-db = boto3.client("dynamodb")
+MAX_ATTEMPTS = 3
+EDITABLE_FIELDS = ("taskText", "deadline", "timeSpent")
 
+@traced("editTask")
+@idempotent
 def lambda_handler(event, context):
     try: 
-        user_id = event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
-        pk = f"USER#{user_id}"
-        goal_id = event["queryStringParameters"]["goalId"] 
-        body = json.loads(event["body"])
-        print(body)
+        user_id = user_id_from_event(event)
+        goal_id = query_param(event, "goalId")
+        body = json_body(event)
         task_id = body.get("taskId")
 
         if not goal_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing goalId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
+            return error(400, "Missing goalId")
         if not task_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing taskId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
+            return error(400, "Missing taskId")
 
-        sk = f"TASK#{goal_id}#{task_id}"
-        
+        pk = user_pk(user_id)
+        sets, removes, expr_attr_vals, expr_attr_names = task_update({k: body[k] for k in EDITABLE_FIELDS if k in body}, pk, goal_id)
 
-        update_expr = []
-        expr_attr_vals = {}
-        expr_attr_names = {}
+        if not expr_attr_names:
+            return error(400, 'Nothing to update')
 
-        if 'taskText' in body:
-            update_expr.append('#text = :taskText')
-            expr_attr_vals[':taskText'] = {'S': body['taskText']}
-            expr_attr_names['#text'] = 'taskText'
-
-        if 'deadline' in body:
-            update_expr.append('#deadline = :deadline')
-            expr_attr_vals[':deadline'] = {'S': body['deadline']}
-            expr_attr_names['#deadline'] = 'deadline'
-
-        if 'timeSpent' in body:
-            update_expr.append('#timeSpent = :timeSpent')
-            expr_attr_vals[':timeSpent'] = {'N': str(body['timeSpent'])}
-            expr_attr_names['#timeSpent'] = 'timeSpent'
+        sync_expr, sync_values = sync_set(pk, goal_id)
+        update_expr = update_expression(sets + [sync_expr], removes)
+        expr_attr_vals.update(sync_values)
+        key = {
+            "PK": {"S": pk},
+            "SK": {"S": task_sk(goal_id, task_id)}
+        }
+        db = get_db()
 
-        if not update_expr:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': 'Nothing to update'})
-            }
+        if 'timeSpent' not in body:
+            # Without the condition an update to a missing task would create a partial task item
+            try:
+                db.update_item(
+                    TableName=DB_TABLE,
+                    Key=key,
+                    UpdateExpression=update_expr,
+                    ConditionExpression="attribute_exists(SK)",
+                    ExpressionAttributeValues=expr_attr_vals,
+                    ExpressionAttributeNames=expr_attr_names
+                )
+            except db.exceptions.ConditionalCheckFailedException:
+                return error(404, "Task not found")
+        else:
+            # timeSpent feeds the goal's totalTimeSpent, so apply the delta against the value that was read
+            for attempt in range(MAX_ATTEMPTS):
+                task = db.get_item(TableName=DB_TABLE, Key=key, ConsistentRead=True).get("Item")
+                if not task:
+                    return error(404, "Task not found")
 
-        db.update_item(
-            TableName=DB_TABLE,
-            Key={
-                "PK": {"S": pk},
-                "SK": {"S": sk}
-            },
-            UpdateExpression='SET ' + ', '.join(update_expr),
-            ExpressionAttributeValues=expr_attr_vals,
-            ExpressionAttributeNames=expr_attr_names
-        )
+                old_time_spent = decode_task(task)["timeSpent"]
+                condition, condition_values, condition_names = task_condition(time_spent=old_time_spent)
+                try:
+                    db.transact_write_items(TransactItems=[
+                        {
+                            "Update": {
+                                "TableName": DB_TABLE,
+                                "Key": key,
+                                "UpdateExpression": update_expr,
+                                "ConditionExpression": condition,
+                                "ExpressionAttributeValues": {**expr_attr_vals, **condition_values},
+                                "ExpressionAttributeNames": {**expr_attr_names, **condition_names}
+                            }
+                        },
+                        goal_counter_update(pk, goal_id, time_spent=int(body['timeSpent']) - old_time_spent)
+                    ])
+                    break
+                except db.exceptions.TransactionCanceledException as e:
+                    if not cancelled_by_condition(e) or attempt == MAX_ATTEMPTS - 1:
+                        raise
 
+        if 'deadline' in body:
+            refresh_next_deadline(pk, goal_id)
+        bump_versions(pk, goal_id)
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps({ "success": True }),
-        }
+        return response(200, { "success": True })
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({ "error": str(e) }),
-        }
+        return error(500, str(e))
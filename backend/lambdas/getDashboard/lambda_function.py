@@ -0,0 +1,91 @@
+from datetime import datetime
+from itertools import chain
+
+from common import DB_TABLE, query_pages, decode_task, task_attribute_names, user_pk, GOAL_PREFIX, TASK_PREFIX, goal_id_from_sk, task_id_from_sk, user_id_from_event, query_param, response, error, traced
+
+# Everything the rollups need; task text and rank are only read when tasks are requested
+COUNT_ATTRIBUTES = ["SK", "goalText", "createdAt", "deletingAt", *task_attribute_names(["completed", "deadline", "timeSpent"])]
+
+@traced("getDashboard")
+def lambda_handler(event, context):
+    try: 
+        user_id = user_id_from_event(event)
+        include_tasks = query_param(event, "include") == "tasks"
+        # Deadlines are local datetime strings from the browser, so the client can pass its own "now" to compare against
+        now = query_param(event, "now") or datetime.utcnow().isoformat(timespec="minutes")
+
+        def items(prefix):
+            # Only GOAL# and TASK# keys are read; jobs, tombstones and other bookkeeping items share the partition
+            query = {
+                "TableName": DB_TABLE,
+                "KeyConditionExpression": "PK = :pk AND begins_with(SK, :prefix)",
+                "ExpressionAttributeValues": {
+                    ":pk": {"S": user_pk(user_id)},
+                    ":prefix": {"S": prefix}
+                }
+            }
+            if not include_tasks:
+                query["ProjectionExpression"] = ", ".join(f"#a{i}" for i in range(len(COUNT_ATTRIBUTES)))
+                query["ExpressionAttributeNames"] = {f"#a{i}": name for i, name in enumerate(COUNT_ATTRIBUTES)}
+            return query_pages(**query)
+
+        # Goals are read first, so every goal is known before its tasks
+        goals = {}
+        for item in chain(items(GOAL_PREFIX), items(TASK_PREFIX)):
+            sk = item["SK"]["S"]
+            goal_id = goal_id_from_sk(sk)
+            if sk.startswith(GOAL_PREFIX):
+                # A goal being deleted in the background is left out along with its tasks
+                if "deletingAt" in item:
+                    continue
+                goals[goal_id] = {
+                    "goalId": goal_id,
+                    "goalText": item["goalText"]["S"],
+                    "createdAt": item["createdAt"]["S"],
+                    "total": 0,
+                    "completed": 0,
+                    "overdue": 0,
+                    "timeSpent": 0
+                }
+                if include_tasks:
+                    goals[goal_id]["tasks"] = []
+                continue
+            goal = goals.get(goal_id)
+            if goal is None:
+                continue
+
+            task = decode_task(item)
+            completed = task["completed"]
+            deadline = task["deadline"]
+            time_spent = task["timeSpent"]
+            goal["total"] += 1
+            goal["timeSpent"] += time_spent
+            if completed:
+                goal["completed"] += 1
+            elif deadline and deadline < now:
+                goal["overdue"] += 1
+
+            if include_tasks:
+                goal["tasks"].append({
+                    "taskId": task_id_from_sk(sk),
+                    "taskText": task["taskText"],
+                    "createdAt": task["createdAt"],
+                    "rank": task["rank"],
+                    "completed": completed,
+                    "deadline": deadline,
+                    "timeSpent": time_spent
+                })
+
+        if include_tasks:
+            for goal in goals.values():
+                goal["tasks"].sort(key=lambda t: t["rank"] or "")
+
+        totals = {"goals": len(goals), "total": 0, "completed": 0, "overdue": 0, "timeSpent": 0}
+        for goal in goals.values():
+            for key in ("total", "completed", "overdue", "timeSpent"):
+                totals[key] += goal[key]
+
+        return response(200, { "goals": list(goals.values()), "totals": totals })
+
+    except Exception as e:
+        return error(500, str(e))
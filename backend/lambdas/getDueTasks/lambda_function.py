@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from common import get_db, DB_TABLE, DUE_INDEX, TASK_ATTRIBUTES, decode_task, user_pk, goal_sk, goal_id_from_sk, task_id_from_sk, user_id_from_event, query_param, encoded_response, encode_token, decode_token, error, traced
+
+MAX_PAGE_LIMIT = 100
+DEADLINE_ATTRIBUTE = TASK_ATTRIBUTES["deadline"][0]
+
+def goal_texts(pk, goal_ids):
+    # goalId -> goalText for the goals of one page (at most MAX_PAGE_LIMIT keys, one BatchGetItem); goals
+    # being deleted are left out
+    db = get_db()
+    request = {DB_TABLE: {
+        "Keys": [{"PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}} for goal_id in goal_ids],
+        "ProjectionExpression": "SK, goalText, deletingAt"
+    }}
+    texts = {}
+    while request:
+        resp = db.batch_get_item(RequestItems=request)
+        for item in resp.get("Responses", {}).get(DB_TABLE, []):
+            if "deletingAt" not in item:
+                texts[goal_id_from_sk(item["SK"]["S"])] = item["goalText"]["S"]
+        request = resp.get("UnprocessedKeys") or None
+    return texts
+
+@traced("getDueTasks")
+def lambda_handler(event, context):
+    try:
+        user_id = user_id_from_event(event)
+        pk = user_pk(user_id)
+        before = query_param(event, "before")
+        limit = query_param(event, "limit")
+        next_token = query_param(event, "nextToken")
+        # Deadlines are local datetime strings from the browser, so the client can pass its own "now" to compare against
+        now = query_param(event, "now") or datetime.utcnow().isoformat(timespec="minutes")
+
+        if not before:
+            return error(400, "Missing before")
+
+        # Open tasks with a deadline earlier than before, soonest (most overdue) first, across every goal
+        query = {
+            "TableName": DB_TABLE,
+            "IndexName": DUE_INDEX,
+            "KeyConditionExpression": "dueKey = :pk AND #deadline < :before",
+            "ExpressionAttributeNames": {"#deadline": DEADLINE_ATTRIBUTE},
+            "ExpressionAttributeValues": {
+                ":pk": {"S": pk},
+                ":before": {"S": before}
+            }
+        }
+        try:
+            limit = int(limit or MAX_PAGE_LIMIT)
+            if limit < 1:
+                raise ValueError("Invalid limit")
+            query["Limit"] = min(limit, MAX_PAGE_LIMIT)
+            if next_token:
+                query["ExclusiveStartKey"] = decode_token(next_token, pk)
+        except ValueError as e:
+            return error(400, str(e))
+
+        page = get_db().query(**query)
+        last_key = page.get("LastEvaluatedKey")
+
+        goal_ids = list(dict.fromkeys(goal_id_from_sk(item["SK"]["S"]) for item in page["Items"]))
+        texts = goal_texts(pk, goal_ids) if goal_ids else {}
+
+        tasks = []
+        for item in page["Items"]:
+            goal_id = goal_id_from_sk(item["SK"]["S"])
+            if goal_id not in texts:
+                continue
+            task = decode_task(item)
+            tasks.append({
+                "taskId": task_id_from_sk(item["SK"]["S"]),
+                "goalId": goal_id,
+                "goalText": texts[goal_id],
+                "taskText": task["taskText"],
+                "createdAt": task["createdAt"],
+                "rank": task["rank"],
+                "deadline": task["deadline"],
+                "timeSpent": task["timeSpent"],
+                "overdue": task["deadline"] < now
+            })
+
+        return encoded_response(event, 200, {
+            "tasks": tasks,
+            "nextToken": encode_token(last_key) if last_key else None
+        })
+
+    except Exception as e:
+        return error(500, str(e))
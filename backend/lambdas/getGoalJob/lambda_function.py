@@ -0,0 +1,18 @@
+from common import get_job, job_status, user_id_from_event, query_param, response, error, traced
+
+@traced("getGoalJob")
+def lambda_handler(event, context):
+    user_id = user_id_from_event(event)
+    job_id = query_param(event, "jobId")
+
+    if not job_id:
+        return error(400, "Missing jobId")
+
+    try:
+        item = get_job(user_id, job_id)
+        if not item:
+            return error(404, "Job not found")
+        return response(200, job_status(item))
+
+    except Exception as e:
+        return error(500, str(e))
@@ -1,59 +1,157 @@
-import json
-import boto3
-import os
+from common import get_db, DB_TABLE, RANK_INDEX, OPEN_INDEX, query_pages, rank_sort_key, decode_task, task_attribute_names, task_condition, user_pk, goal_sk, task_prefix, sync_key, task_id_from_sk, read_version, make_etag, sync_cursor, changed_since, TOMBSTONE_TTL, etag_matches, etag_headers, not_modified, user_id_from_event, query_param, encoded_response, encode_token, decode_token, error, traced
 
-DB_TABLE = os.environ.get("DB_TABLE")
-db = boto3.client("dynamodb")
+MAX_PAGE_LIMIT = 500
+STATUSES = ("open", "done")
 
+# Task fields a client can ask for with ?fields=
+TASK_FIELDS = ("taskText", "createdAt", "rank", "completed", "deadline", "timeSpent")
+
+def parse_fields(value):
+    # None means every field; taskId is always included
+    if not value:
+        return None
+    fields = [f.strip() for f in value.split(",") if f.strip() and f.strip() != "taskId"]
+    unknown = [f for f in fields if f not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return sorted(set(fields))
+
+def project(query, fields):
+    # Reads only the requested attributes, plus the key and what sorting by rank needs
+    names = list(dict.fromkeys(["SK", "rank", "order", *task_attribute_names(fields)]))
+    query["ProjectionExpression"] = ", ".join(f"#p{i}" for i in range(len(names)))
+    query.setdefault("ExpressionAttributeNames", {}).update({f"#p{i}": name for i, name in enumerate(names)})
+
+def ordered_query(pk, goal_id, status):
+    # The goal's tasks in rank order from a GSI. Open tasks have their own sparse index; done tasks are filtered
+    # out of the rank index, so their pages can come back with fewer than limit items.
+    query = {
+        "TableName": DB_TABLE,
+        "IndexName": OPEN_INDEX if status == "open" else RANK_INDEX,
+        "KeyConditionExpression": f"{'openKey' if status == 'open' else 'syncKey'} = :syncKey",
+        "ExpressionAttributeValues": {":syncKey": {"S": sync_key(pk, goal_id)}}
+    }
+    if status == "done":
+        condition, values, names = task_condition(completed=True)
+        query["FilterExpression"] = condition
+        query["ExpressionAttributeValues"].update(values)
+        query["ExpressionAttributeNames"] = names
+    return query
+
+def page_token(last_key, offset):
+    # The nextToken also carries how many tasks earlier pages returned, so order keeps counting across pages
+    return encode_token({**last_key, "offset": {"N": str(offset)}})
+
+def read_page_token(token, pk):
+    # Returns (ExclusiveStartKey, offset); tokens from before the offset was added start counting again at 0
+    last_key = decode_token(token, pk)
+    offset = int(last_key.pop("offset", {"N": "0"})["N"])
+    return last_key, offset
+
+def to_task(item, fields=None):
+    decoded = decode_task(item)
+    task = {"taskId": task_id_from_sk(item["SK"]["S"])}
+    for name in fields or TASK_FIELDS:
+        task[name] = decoded[name]
+    return task
+
+@traced("getTasks")
 def lambda_handler(event, context):
     try: 
-        user_id = event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
-        pk = f"USER#{user_id}"
-        goal_id = event["queryStringParameters"]["goalId"] 
+        user_id = user_id_from_event(event)
+        pk = user_pk(user_id)
+        goal_id = query_param(event, "goalId")
+        limit = query_param(event, "limit")
+        next_token = query_param(event, "nextToken")
+        status = query_param(event, "status")
 
         if not goal_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing goalId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
+            return error(400, "Missing goalId")
+        if status is not None and status not in STATUSES:
+            return error(400, "status must be open or done")
+        try:
+            fields = parse_fields(query_param(event, "fields"))
+        except ValueError as e:
+            return error(400, str(e))
 
-        sk_prefix = f"TASK#{goal_id}#"
+        # Paginated mode: one page per request in rank order, resumed from an opaque nextToken
+        if limit or next_token or status:
+            query = ordered_query(pk, goal_id, status)
+            if fields is not None:
+                project(query, fields)
+            try:
+                limit = int(limit or MAX_PAGE_LIMIT)
+                if limit < 1:
+                    raise ValueError("Invalid limit")
+                query["Limit"] = min(limit, MAX_PAGE_LIMIT)
+                offset = 0
+                if next_token:
+                    query["ExclusiveStartKey"], offset = read_page_token(next_token, pk)
+            except ValueError as e:
+                return error(400, str(e))
 
-        response = db.query(
-            TableName=DB_TABLE,
-            KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
-            ExpressionAttributeValues={
-                ":pk": {"S": pk},
-                ":sk_prefix": {"S": sk_prefix}
-            }
-        )
+            page = get_db().query(**query)
+            last_key = page.get("LastEvaluatedKey")
 
-        tasks = []
-        for item in response["Items"]:
-            tasks.append({
-                "taskId": item["SK"]["S"].split("#")[-1],
-                "taskText": item["taskText"]["S"],
-                "createdAt": item["createdAt"]["S"],
-                "order": float(item["order"]["N"]),
-                "completed": item["completed"]["BOOL"],
-                "deadline": item["deadline"]["S"],
-                "timeSpent": int(item["timeSpent"]["N"])
+            # Same fields as the full list, with order as the position in the (filtered) rank order
+            tasks = []
+            for i, item in enumerate(page["Items"]):
+                task = to_task(item, fields)
+                task["order"] = (offset+i+1)*1000.0
+                tasks.append(task)
+
+            return encoded_response(event, 200, {
+                "tasks": tasks,
+                "nextToken": page_token(last_key, offset + len(tasks)) if last_key else None
             })
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps({ "tasks": tasks }),
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Authorization,Content-Type",
-                "Access-Control-Allow-Methods": "GET"
+        # The goal's version is read before the query, so the ETag can only be older than the data it's sent with
+        version = read_version(pk, goal_sk(goal_id))
+        etag = make_etag(goal_id, version or 0, *(fields or []))
+        matched = etag_matches(event, etag) if version is not None else None
+        if matched:
+            return not_modified(matched)
+
+        query = {
+            "TableName": DB_TABLE,
+            "KeyConditionExpression": "PK = :pk AND begins_with(SK, :sk_prefix)",
+            "ExpressionAttributeValues": {
+                ":pk": {"S": pk},
+                ":sk_prefix": {"S": task_prefix(goal_id)}
             }
         }
+        if fields is not None:
+            project(query, fields)
+
+        # Taken before reading, so the next ?since= covers anything written while this request runs
+        cursor = sync_cursor()
+
+        # Delta mode: only tasks written and deleted after the client's last cursor
+        since = query_param(event, "since")
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return error(400, "Invalid since")
+            # Tombstones expire, so deletions older than their TTL can't be reported any more
+            if since < cursor - TOMBSTONE_TTL * 1000:
+                return error(410, "since is too old, fetch the full list")
+
+            changed, deleted = changed_since(pk, goal_id, since)
+            return encoded_response(event, 200, {
+                "tasks": [to_task(item, fields) for item in changed],
+                "deleted": deleted,
+                "version": cursor
+            }, etag_headers(etag))
+
+        # Sorted by rank, with order as the position so clients can keep sorting and averaging numbers
+        tasks = []
+        for i, item in enumerate(sorted(query_pages(**query), key=rank_sort_key)):
+            task = to_task(item, fields)
+            task["order"] = (i+1)*1000.0
+            tasks.append(task)
+
+        return encoded_response(event, 200, { "tasks": tasks, "version": cursor }, etag_headers(etag))
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({ "error": str(e) }),
-            "headers": { "Access-Control-Allow-Origin": "*" }
-        }
+        return error(500, str(e))
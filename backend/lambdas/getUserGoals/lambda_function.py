@@ -1,45 +1,39 @@
-import json
-import boto3
-import os
-
-DB_TABLE = os.environ.get("DB_TABLE")
-db = boto3.client("dynamodb")
+from common import DB_TABLE, query_pages, goal_progress, user_pk, GOAL_PREFIX, goal_id_from_sk, USER_META_SK, read_version, make_etag, etag_matches, etag_headers, not_modified, user_id_from_event, encoded_response, error, traced
 
+@traced("getUserGoals")
 def lambda_handler(event, context):
     try: 
-        user_id = event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
-        pk = f"USER#{user_id}"
+        user_id = user_id_from_event(event)
+
+        # Users who have never written anything have no version item yet; they get version 0
+        version = read_version(user_pk(user_id), USER_META_SK) or 0
+        etag = make_etag(user_id, version)
+        matched = etag_matches(event, etag)
+        if matched:
+            return not_modified(matched)
 
-        response = db.query(
+        items = query_pages(
             TableName=DB_TABLE,
             KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
             ExpressionAttributeValues={
-                ":pk": {"S": pk},
-                ":sk_prefix": {"S": "GOAL#"}
+                ":pk": {"S": user_pk(user_id)},
+                ":sk_prefix": {"S": GOAL_PREFIX}
             }
         )
 
         goals = []
-        for item in response["Items"]:
+        for item in items:
+            # Goals still being deleted in the background are already gone as far as the user is concerned
+            if "deletingAt" in item:
+                continue
             goals.append({
-                "goalId": item["SK"]["S"].replace("GOAL#", ""),
+                "goalId": goal_id_from_sk(item["SK"]["S"]),
                 "goalText": item["goalText"]["S"],
-                "createdAt": item["createdAt"]["S"]
+                "createdAt": item["createdAt"]["S"],
+                **goal_progress(item)
             })
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps({ "goals": goals }),
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Authorization,Content-Type",
-                "Access-Control-Allow-Methods": "GET"
-            }
-        }
+        return encoded_response(event, 200, { "goals": goals }, etag_headers(etag))
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({ "error": str(e) }),
-            "headers": { "Access-Control-Allow-Origin": "*" }
-        }
+        return error(500, str(e))
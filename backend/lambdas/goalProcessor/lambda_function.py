@@ -1,172 +1,157 @@
-import json
-import os
-import urllib.request
-import re 
-import time 
+import time
 import uuid
+import json
 from datetime import datetime
-import boto3
-from huggingface_hub import InferenceClient
-
-
-HF_API_KEY = os.environ.get("HF_API_KEY")
-#HF_MODEL = "mistralai/Mistral-7B-Instruct-v0.1"  
-#HF_MODEL = "mistralai/Mistral-7B-Instruct-v0.3"
-HF_MODEL = "meta-llama/Llama-3.1-8B-Instruct"
-DB_TABLE = os.environ.get("DB_TABLE")
-
-db = boto3.client("dynamodb")
-
-#def extract_tasks_bullets(text: str) -> list[str]:
-#    # Split by bullet styles: "- ", "* ", or "1. "
-#    #raw_tasks = re.split(r'(?m)^\s*(?:[-*]|\d+\.)\s+', text)
-#    raw_tasks = re.split(r'\n+\s*(?:[-*•→]|\d+\.)\s+', text)
-#
-#    # Clean and filter out empty or short lines
-#    cleaned_tasks = [task.strip() for task in raw_tasks if task.strip()]
-#    return cleaned_tasks
-
-def extract_tasks_bullets(text: str) -> list[str]:                                                                                                                                                                              
-      raw_tasks = re.split(r'\n+\s*(?:[-*•→]|\d+\.)\s+', text)                                                                                                                                                                    
-                                                                                                                                                                                                                                  
-      cleaned = []                                                                                                                                                                                                                
-      seen = set()                                                                                                                                                                                                                
-      for task in raw_tasks:                                                                                                                                                                                                      
-          # Strip markdown formatting and leading number prefixes                                                                                                                                                                 
-          task = re.sub(r'[*#_`]+', '', task)                                                                                                                                                                                     
-          task = re.sub(r'^\d+\.\s*', '', task).strip()                                                                                                                                                                           
-          if not task or len(task) < 10:                                                                                                                                                                                          
-              continue                                                                                                                                                                                                            
-          key = task.lower()                                                                                                                                                                                                      
-          if key not in seen:                                                                                                                                                                                                     
-              seen.add(key)                                                                                                                                                                                                       
-              cleaned.append(task)                                                                                                                                                                                                
-                                                                                                                                                                                                                                  
-      return cleaned
-
-def call_huggingface(goal: str):
-    #url = f"https://api-inference.huggingface.co/models/{HF_MODEL}"
-    #url = "https://router.huggingface.co/hf-inference/models/mistralai/Mistral-7B-Instruct-v0.3"
-    client = InferenceClient(
-    provider="novita",
-    api_key=HF_API_KEY,
-    )
-    prompt = f"Break the following goal into a single flat numbered list of actionable tasks. Each task should be a specific, concrete action, not a category or phase. If the goal mentions a timeframe, distribute tasks across that timeframe. Output ONLY the numbered list. No introductions, no summaries, no section headers, no sub-lists, no markdown formatting, no commentary before or after the list. Maximum 12 tasks.\n\nGoal: {goal}" 
 
-
-    completion = client.chat.completions.create(
-        model=HF_MODEL,
-        messages=[
-            {"role": "user", "content": prompt}
-        ]
+from common import get_db, DB_TABLE, emit_metrics, rank_between, goal_counter_update, user_id_from_event, json_body, user_pk, goal_sk, bump_versions, response, error, idempotent, traced
+from common import plan_cache_key, get_cached_plan, put_cached_plan, generate_plan, create_goal, call_huggingface_stream, TaskLineParser, task_item, create_job, backoff, claim_plan, release_plan_lease
+
+STREAM_ATTEMPTS = 2
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_goal(goal, user_id, cache_key, cached, write):
+    # Persists the goal first, then each task as soon as its line is complete, calling write() with an SSE event for each
+    started = time.time()
+    # Fixed timespec, so the createdAt streamed here is the one GET /tasks returns later
+    created_at = datetime.utcnow().isoformat(timespec="microseconds")
+    goal_id = str(uuid.uuid4())
+    pk = user_pk(user_id)
+    db = get_db()
+
+    db.put_item(
+        TableName=DB_TABLE,
+        Item={
+            "PK": {"S": pk},
+            "SK": {"S": goal_sk(goal_id)},
+            "type": {"S": 'goal'},
+            "goalText": {"S": goal},
+            "createdAt": {"S": created_at},
+            "taskCount": {"N": '0'},
+            "completedCount": {"N": '0'},
+            "totalTimeSpent": {"N": '0'}
+        }
     )
+    write(sse("goal", {"goalId": goal_id, "message": f"Your goal: {goal}", "cached": bool(cached)}))
 
-    return completion.choices[0].message["content"]
-
+    # Tasks land one transaction at a time; the versions are bumped once at the end, however the stream ends
+    try:
+        tasks = []
+        rank = None
+        first_task_ms = None
 
-    #headers = {
-    #    "Authorization": f"Bearer {HF_API_KEY}",
-    #    "Content-Type": "application/json"
-    #}
-    #payload = json.dumps({"inputs": f"Break this specific goal down into 5-8 steps and output them as bullet points: {goal}"})
-    
-    #req = urllib.request.Request(url, data=payload.encode(), headers=headers)
-    #with urllib.request.urlopen(req) as res:
-    #    result = res.read().decode()
-    #    return json.loads(result)
+        def persist(task_text):
+            nonlocal rank, first_task_ms
+            task_id = str(uuid.uuid4())
+            rank = rank_between(rank, None)
+            db.transact_write_items(TransactItems=[
+                {"Put": {"TableName": DB_TABLE, "Item": task_item(pk, goal_id, task_id, task_text, rank, created_at)}},
+                goal_counter_update(pk, goal_id, tasks=1)
+            ])
+            tasks.append(task_text)
+            if first_task_ms is None:
+                first_task_ms = int((time.time() - started) * 1000)
+            write(sse("task", {
+                "taskId": task_id,
+                "taskText": task_text,
+                "order": 1000.0 * len(tasks),
+                "rank": rank,
+                "completed": False,
+                "createdAt": created_at
+            }))
+
+        if cached:
+            for task_text in cached[0]:
+                persist(task_text)
+            emit_metrics({"PlanCacheHit": (1, "Count"), "PlanCacheLatencySaved": (cached[1], "Milliseconds")}, {"Function": "goalProcessor", "Mode": "stream"})
+        else:
+            # Provider failover happens before the first chunk; this only restarts a stream that broke before any task was emitted
+            for i in range(STREAM_ATTEMPTS):
+                parser = TaskLineParser()
+                try:
+                    for chunk in call_huggingface_stream(goal):
+                        for task_text in parser.feed(chunk):
+                            persist(task_text)
+                    for task_text in parser.finish():
+                        persist(task_text)
+                    break
+                except Exception as e:
+                    if i == STREAM_ATTEMPTS - 1 or tasks:
+                        raise e
+                    time.sleep(backoff(i))
+
+            llm_ms = int((time.time() - started) * 1000)
+            if tasks:
+                put_cached_plan(cache_key, tasks, llm_ms)
+            emit_metrics({
+                "PlanCacheMiss": (1, "Count"),
+                "LLMLatency": (llm_ms, "Milliseconds"),
+                "TimeToFirstTask": (first_task_ms or llm_ms, "Milliseconds")
+            }, {"Function": "goalProcessor", "Mode": "stream"})
+    finally:
+        bump_versions(pk, goal_id)
+
+    write(sse("done", {"goalId": goal_id, "taskCount": len(tasks)}))
+
+def stream_response(goal, user_id, cache_key, cached, lease=None):
+    # The events come back as one text/event-stream body once generation has finished: API Gateway buffers Lambda
+    # responses and the Python runtime can't stream them, so the client gets nothing earlier. What does happen early
+    # is the writes: the goal and each task are stored as soon as they are parsed, and show up in GET /goals and /tasks
+    events = []
+    try:
+        stream_goal(goal, user_id, cache_key, cached, events.append)
+    except Exception as e:
+        events.append(sse("error", {"error": str(e)}))
+    finally:
+        if lease:
+            release_plan_lease(cache_key, lease)
+    return {
+        "statusCode": 200,
+        "body": "".join(events),
+        "headers": {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Access-Control-Allow-Origin": "*"
+        }
+    }
 
+@traced("goalProcessor")
+@idempotent
 def lambda_handler(event, context):
-    body = json.loads(event['body']) if 'body' in event else {}
+    body = json_body(event)
     goal = body.get("goal", "")
-    user_id = event['requestContext']['authorizer']['jwt']['claims']['sub']
+    user_id = user_id_from_event(event)
 
     if not goal:
-        return {
-            "statusCode": 400,
-            "body": json.dumps({"error": "Missing goal"}),
-            "headers": {"Content-Type": "application/json"}
-        }
+        return error(400, "Missing goal")
 
     try:
-        for i in range(3):  # Retry mechanism
-            try:
-                ai_response = call_huggingface(goal)
-                break
-            except Exception as e:
-                if i == 2:  # Last attempt
-                    raise e
-                time.sleep(2)  # Wait for 2 seconds before retrying
-
-        # The model usually returns a list with one generated string
-        #generated_text = ai_response[0]["generated_text"]
-        print("----RAW TEXT----")
-        print(repr(ai_response))
-        print("----------------")
-
-
-        # Split it into steps 
-        #tasks = [line.strip() for line in generated_text.split("\n") if line.strip()]
-        tasks = extract_tasks_bullets(ai_response)
-
-        #store in dynamodb=================================================================
-        created_at = datetime.utcnow().isoformat()
-        goal_id = str(uuid.uuid4())
-
-        #Goal
-        db.put_item(
-            TableName=DB_TABLE,
-            Item={
-                "PK": {"S": f"USER#{user_id}"},
-                "SK": {"S": f"GOAL#{goal_id}"},
-                "type": {"S": 'goal'},
-                "goalText": {"S": goal},
-                "createdAt": {"S": created_at}
-            }
-        )
-
-        #Tasks
-        ordered_tasks = []
-        for i, task_text in enumerate(tasks):
-            task_id = str(uuid.uuid4())
-            order = 1000.0 * (i+1)
-            db.put_item(
-                TableName=DB_TABLE,
-                Item={
-                    "PK": {"S": f"USER#{user_id}"},
-                    "SK": {"S": f"TASK#{goal_id}#{task_id}"},
-                    "type": {"S": 'task'},
-                    "taskText": {"S": task_text},
-                    "completed": {"BOOL": False},
-                    "createdAt": {"S": created_at},
-                    "order": {"N": str(order)},
-                    "deadline": {"S": ""},
-                    "timeSpent": {"N": '0'}
-                }
-            )
-
-            ordered_tasks.append({
-                "taskId": task_id,
-                "taskText": task_text,
-                "order": order,
-                "completed": False,
-                "createdAt": created_at
-            })
-
-
-        return {
-            "statusCode": 200,
-            "body": json.dumps({
-                "goalId": goal_id,
-                "message": f"Your goal: {goal}",
-                "tasks": ordered_tasks
-            }),
-            "isBase64Encoded": False,
-            "headers": {"Content-Type": "application/json"}
-        }
+        # "async" only records and enqueues a job; goalWorker generates the plan and the client polls /goalJob
+        if body.get("async"):
+            job_id = create_job(user_id, goal, body.get("regenerate"))
+            return response(202, {"jobId": job_id, "status": "queued"})
+
+        if body.get("stream"):
+            # "regenerate" skips the cache lookup so the user gets a fresh plan, which then replaces the cached one
+            cache_key = plan_cache_key(goal)
+            cached = None if body.get("regenerate") else get_cached_plan(cache_key)
+            lease = None
+            if not cached:
+                # Identical goals submitted at the same time share one model call; duplicates replay the winner's plan
+                cached, lease = claim_plan(cache_key)
+            return stream_response(goal, user_id, cache_key, cached, lease)
+
+        tasks, cached, _ = generate_plan(goal, body.get("regenerate"))
+        goal_id, ordered_tasks = create_goal(user_id, goal, tasks)
+
+        return response(200, {
+            "goalId": goal_id,
+            "message": f"Your goal: {goal}",
+            "tasks": ordered_tasks,
+            "cached": cached
+        })
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": str(e)}),
-            "headers": {"Content-Type": "application/json"}
-        }
+        return error(500, str(e))
@@ -0,0 +1,64 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from common import emit_metrics, claim_job, finish_job, generate_plan, create_goal, delete_goal, delete_metrics, reindex_goal, bump_versions, user_pk, traced
+
+# Bounds concurrent model calls per container; SQS batch size and the function's reserved concurrency bound the rest
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", "4"))
+
+def resume_delete(message, context):
+    # Continues a goal deletion that ran out of time; delete_goal re-enqueues itself if this run does too
+    deleted, remaining = delete_goal(message["userId"], message["goalId"], context)
+    if not remaining:
+        bump_versions(user_pk(message["userId"]))
+    delete_metrics(deleted, remaining, "goalWorker")
+    return "deleted" if not remaining else "resumed"
+
+def rebalance(message):
+    # Renumbers a goal whose rank keys have grown long (common.request_rebalance)
+    reindex_goal(user_pk(message["userId"]), message["goalId"])
+    return "reindexed"
+
+def process(record, context):
+    message = json.loads(record["body"])
+    if message.get("kind") == "deleteGoal":
+        return resume_delete(message, context)
+    if message.get("kind") == "reindexTasks":
+        return rebalance(message)
+    user_id, job_id = message["userId"], message["jobId"]
+
+    job = claim_job(user_id, job_id)
+    if job is None:
+        return "skipped"
+
+    try:
+        tasks, cached, llm_ms = generate_plan(job["goalText"]["S"], job.get("regenerate", {}).get("BOOL", False), function="goalWorker")
+        goal_id, _ = create_goal(user_id, job["goalText"]["S"], tasks)
+    except Exception as e:
+        # Generation failures are recorded on the job; if recording fails too, the message is retried and the stale claim taken over
+        finish_job(user_id, job_id, error=str(e))
+        return "failed"
+
+    finish_job(user_id, job_id, goal_id=goal_id)
+    return "done"
+
+@traced("goalWorker")
+def lambda_handler(event, context):
+    records = event.get("Records", [])
+    results = {}
+    failures = []
+    with ThreadPoolExecutor(max_workers=WORKER_CONCURRENCY) as pool:
+        futures = [(record, pool.submit(process, record, context)) for record in records]
+        for record, future in futures:
+            try:
+                outcome = future.result()
+            except Exception as e:
+                print(f"Job message {record.get('messageId')} failed: {e}")
+                failures.append({"itemIdentifier": record.get("messageId")})
+                outcome = "error"
+            results[outcome] = results.get(outcome, 0) + 1
+
+    emit_metrics({f"Jobs{k.capitalize()}": (v, "Count") for k, v in results.items()}, {"Function": "goalWorker"})
+    # Requires ReportBatchItemFailures on the event source mapping so only the failed messages are redelivered
+    return {"batchItemFailures": failures}
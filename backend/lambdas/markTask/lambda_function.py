@@ -1,57 +1,76 @@
-import json
-import boto3
-import os
-
-DB_TABLE = os.environ.get("DB_TABLE")
-db = boto3.client("dynamodb")
+from common import get_db, DB_TABLE, user_pk, task_sk, decode_task, task_attribute_names, task_update, update_expression, task_condition, goal_counter_update, lower_next_deadline, refresh_next_deadline, cancelled_by_condition, user_id_from_event, query_param, json_body, sync_set, bump_versions, response, error, idempotent, traced
 
+@traced("markTask")
+@idempotent
 def lambda_handler(event, context):
     try: 
-        user_id = event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
-        pk = f"USER#{user_id}"
-        goal_id = event["queryStringParameters"]["goalId"] 
-        body = json.loads(event["body"])
+        user_id = user_id_from_event(event)
+        goal_id = query_param(event, "goalId")
+        body = json_body(event)
         task_id = body.get("taskId")
         completed = body.get("completed")
 
         if not goal_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing goalId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
+            return error(400, "Missing goalId")
         if not task_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing taskId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
-            
-        sk = f"TASK#{goal_id}#{task_id}"
+            return error(400, "Missing taskId")
+        if not isinstance(completed, bool):
+            return error(400, "Missing completed")
+
+        pk = user_pk(user_id)
+        db = get_db()
+
+        # The condition makes the goal's completedCount change only when the task actually flips
+        sync_expr, sync_values = sync_set(pk, goal_id)
+        sets, removes, values, names = task_update({"completed": completed}, pk, goal_id)
+        condition, condition_values, condition_names = task_condition(completed=not completed)
+        try:
+            db.transact_write_items(TransactItems=[
+                {
+                    "Update": {
+                        "TableName": DB_TABLE,
+                        "Key": {
+                            "PK": {"S": pk},
+                            "SK": {"S": task_sk(goal_id, task_id)}
+                        },
+                        "UpdateExpression": update_expression(sets + [sync_expr], removes),
+                        "ConditionExpression": condition,
+                        "ExpressionAttributeNames": {**names, **condition_names},
+                        "ExpressionAttributeValues": {**values, **sync_values, **condition_values},
+                        "ReturnValuesOnConditionCheckFailure": "ALL_OLD"
+                    }
+                },
+                goal_counter_update(pk, goal_id, completed=1 if completed else -1)
+            ])
+        except db.exceptions.TransactionCanceledException as e:
+            if not cancelled_by_condition(e):
+                raise
+            task_reason, goal_reason = e.response["CancellationReasons"]
+            if goal_reason.get("Code") == "ConditionalCheckFailed":
+                return error(404, "Goal not found")
+            # The task's old item comes back only if it exists, in which case it's already in the requested state
+            if "Item" not in task_reason:
+                return error(404, "Task not found")
+            return response(200, { "success": True })
 
-        db.update_item(
+        task = db.get_item(
             TableName=DB_TABLE,
             Key={
                 "PK": {"S": pk},
-                "SK": {"S": sk}
+                "SK": {"S": task_sk(goal_id, task_id)}
             },
-            UpdateExpression="SET #completed = :completed",
-            ExpressionAttributeNames={
-                "#completed": "completed"
-            },
-            ExpressionAttributeValues={
-                ":completed": {"BOOL": completed}
-            }
-        )
-
+            ProjectionExpression="#dl, #deadline",
+            ExpressionAttributeNames=dict(zip(("#dl", "#deadline"), task_attribute_names(["deadline"])))
+        ).get("Item", {})
+        deadline = decode_task(task)["deadline"]
+        if deadline:
+            if completed:
+                refresh_next_deadline(pk, goal_id)
+            else:
+                lower_next_deadline(pk, goal_id, deadline)
+        bump_versions(pk, goal_id)
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps({ "success": True }),
-        }
+        return response(200, { "success": True })
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({ "error": str(e) }),
-        }
+        return error(500, str(e))
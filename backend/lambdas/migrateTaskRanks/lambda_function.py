@@ -0,0 +1,62 @@
+from common import get_db, DB_TABLE, query_pages, goal_items, goal_id_from_sk, task_prefix, task_id_from_sk, task_sk, ranks_after, rank_sort_key, sync_set, bump_versions, traced
+
+# Invoked directly, not through API Gateway, to move tasks from numeric order to rank keys:
+#   {"dryRun": true | false, "userId": "<optional, limits the run to one user>"}
+
+TRANSACT_CHUNK_SIZE = 100
+
+def migrate_goal(pk, goal_id, dry_run):
+    tasks = sorted(query_pages(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
+        ProjectionExpression="SK, #rank, #order",
+        ExpressionAttributeNames={"#rank": "rank", "#order": "order"},
+        ExpressionAttributeValues={
+            ":pk": {"S": pk},
+            ":sk_prefix": {"S": task_prefix(goal_id)}
+        }
+    ), key=rank_sort_key)
+
+    # Goals with no legacy tasks are already done
+    if all("order" not in t for t in tasks):
+        return 0
+
+    # Legacy tasks sort first by their old order, then tasks already given a rank; all get fresh ranks in that order
+    sync_expr, sync_values = sync_set(pk, goal_id)
+    updates = []
+    for task, rank in zip(tasks, ranks_after(None, len(tasks))):
+        if task.get("rank", {}).get("S") == rank and "order" not in task:
+            continue
+        updates.append({
+            "Update": {
+                "TableName": DB_TABLE,
+                "Key": {"PK": {"S": pk}, "SK": {"S": task_sk(goal_id, task_id_from_sk(task["SK"]["S"]))}},
+                "UpdateExpression": f"SET #rank = :rank, {sync_expr} REMOVE #order",
+                "ConditionExpression": "attribute_exists(SK)",
+                "ExpressionAttributeNames": {"#rank": "rank", "#order": "order"},
+                "ExpressionAttributeValues": {":rank": {"S": rank}, **sync_values}
+            }
+        })
+
+    if not dry_run:
+        for i in range(0, len(updates), TRANSACT_CHUNK_SIZE):
+            get_db().transact_write_items(TransactItems=updates[i:i+TRANSACT_CHUNK_SIZE])
+        if updates:
+            bump_versions(pk, goal_id)
+    return len(updates)
+
+@traced("migrateTaskRanks")
+def lambda_handler(event, context):
+    dry_run = event.get("dryRun", True)
+    goals = 0
+    migrated_goals = 0
+    tasks = 0
+    for item in goal_items(event.get("userId")):
+        goals += 1
+        updated = migrate_goal(item["PK"]["S"], goal_id_from_sk(item["SK"]["S"]), dry_run)
+        if updated:
+            migrated_goals += 1
+            tasks += updated
+
+    print(f"{'dry run' if dry_run else 'migrated'}: {migrated_goals} of {goals} goals, {tasks} tasks")
+    return {"dryRun": dry_run, "goals": goals, "migratedGoals": migrated_goals, "tasks": tasks}
@@ -0,0 +1,74 @@
+from common import get_db, DB_TABLE, query_pages, goal_items, goal_id_from_sk, task_prefix, encode_task, decode_task, open_keys, item_size, traced
+
+# Invoked directly, not through API Gateway, to rewrite task items in the compact encoding with their index keys:
+#   {"dryRun": true | false, "userId": "<optional, limits the run to one user>"}
+# Items keep their version, so clients don't resync them; an item written while the run reads it fails the
+# version condition and is left for the next run.
+
+KEPT_ATTRIBUTES = ("rank", "order", "syncKey", "version")
+
+def compact_item(item):
+    task = decode_task(item)
+    # Also backfills the open-index and due-index keys on tasks written before it existed
+    compact = {
+        "PK": item["PK"],
+        "SK": item["SK"],
+        **encode_task(task),
+        **open_keys(item["PK"]["S"], goal_id_from_sk(item["SK"]["S"]), task["completed"])
+    }
+    for name in KEPT_ATTRIBUTES:
+        if name in item:
+            compact[name] = item[name]
+    return compact
+
+def put_compact(item, compact):
+    db = get_db()
+    if "version" in item:
+        condition = {"ConditionExpression": "#version = :version", "ExpressionAttributeValues": {":version": item["version"]}}
+    else:
+        condition = {"ConditionExpression": "attribute_exists(SK) AND attribute_not_exists(#version)"}
+    try:
+        db.put_item(TableName=DB_TABLE, Item=compact, ExpressionAttributeNames={"#version": "version"}, **condition)
+        return True
+    except db.exceptions.ConditionalCheckFailedException:
+        return False
+
+def migrate_goal(pk, goal_id, dry_run, stats):
+    for item in query_pages(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
+        ExpressionAttributeValues={
+            ":pk": {"S": pk},
+            ":sk_prefix": {"S": task_prefix(goal_id)}
+        }
+    ):
+        compact = compact_item(item)
+        stats["tasks"] += 1
+        stats["bytesBefore"] += item_size(item)
+        stats["bytesAfter"] += item_size(compact)
+        if compact == item:
+            continue
+        if dry_run or put_compact(item, compact):
+            stats["migrated"] += 1
+        else:
+            stats["skipped"] += 1
+
+@traced("migrateTaskSchema")
+def lambda_handler(event, context):
+    dry_run = event.get("dryRun", True)
+    stats = {"goals": 0, "tasks": 0, "migrated": 0, "skipped": 0, "bytesBefore": 0, "bytesAfter": 0}
+    for item in goal_items(event.get("userId")):
+        stats["goals"] += 1
+        migrate_goal(item["PK"]["S"], goal_id_from_sk(item["SK"]["S"]), dry_run, stats)
+
+    tasks = stats["tasks"] or 1
+    print(f"{'dry run' if dry_run else 'migrated'}: {stats['migrated']} of {stats['tasks']} tasks in {stats['goals']} goals, {stats['skipped']} skipped")
+    return {
+        "dryRun": dry_run,
+        "goals": stats["goals"],
+        "tasks": stats["tasks"],
+        "migrated": stats["migrated"],
+        "skipped": stats["skipped"],
+        "avgBytesBefore": round(stats["bytesBefore"] / tasks, 1),
+        "avgBytesAfter": round(stats["bytesAfter"] / tasks, 1)
+    }
@@ -1,64 +1,27 @@
-import json
-import boto3
-import os
-
-DB_TABLE = os.environ.get("DB_TABLE")
-db = boto3.client("dynamodb")
+from common import reindex_goal, user_pk, user_id_from_event, query_param, json_body, response, error, traced
 
+@traced("reindexTasks")
 def lambda_handler(event, context):
     try: 
-        user_id = event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
-        pk = f"USER#{user_id}"
-        goal_id = event["queryStringParameters"]["goalId"] 
+        user_id = user_id_from_event(event)
+        pk = user_pk(user_id)
+        goal_id = query_param(event, "goalId")
+        body = json_body(event)
+        task_ids = body.get("taskIds")
 
         if not goal_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing goalId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
-
-        sk_prefix = f"TASK#{goal_id}#"
-
-        response = db.query(
-            TableName=DB_TABLE,
-            KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
-            ExpressionAttributeValues={
-                ":pk": {"S": pk},
-                ":sk_prefix": {"S": sk_prefix}
-            }
-        )
-
-        tasks = response['Items']
-        tasks.sort(key=lambda t: float(t['order']['N']))
-
-        for i, task in enumerate(tasks):
-            new_order = (i+1)*1000.0
-            task_id = task['SK']['S'].split('#')[-1]
+            return error(400, "Missing goalId")
+        if task_ids is not None and not isinstance(task_ids, list):
+            return error(400, "taskIds must be a list")
 
-            db.update_item(
-                TableName=DB_TABLE,
-                Key={
-                    'PK': {'S': pk},
-                    'SK': {'S': f"TASK#{goal_id}#{task_id}"}
-                },
-                UpdateExpression="SET #order = :new_order",
-                ExpressionAttributeNames={
-                    '#order': 'order'
-                },
-                ExpressionAttributeValues={
-                    ':new_order': {'N': str(new_order)}
-                }
-            )
+        # Bulk reorder: the client's list goes first, tasks it didn't know about keep their relative order after it.
+        # Only tasks whose rank actually changes are rewritten.
+        try:
+            updated = reindex_goal(pk, goal_id, task_ids)
+        except ValueError as e:
+            return error(400, str(e))
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps({ "message": 'Tasks reindexed successfully' }),
-        }
+        return response(200, { "message": 'Tasks reindexed successfully', "updated": updated })
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({ "error": str(e) }),
-            "headers": { "Access-Control-Allow-Origin": "*" }
-        }
+        return error(500, str(e))
@@ -1,64 +1,52 @@
-import json
-import boto3
-import os
-
-DB_TABLE = os.environ.get("DB_TABLE")
-db = boto3.client("dynamodb")
+from common import get_db, DB_TABLE, user_pk, task_sk, rank_between, user_id_from_event, query_param, json_body, sync_set, bump_versions, request_rebalance, response, error, traced
 
+@traced("reorderTasks")
 def lambda_handler(event, context):
     try: 
-        user_id = event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
-        pk = f"USER#{user_id}"
-        goal_id = event["queryStringParameters"]["goalId"] 
-        body = json.loads(event["body"])
+        user_id = user_id_from_event(event)
+        goal_id = query_param(event, "goalId")
+        body = json_body(event)
         task_id = body.get("taskId")
-        new_order = body.get("newOrder")
+        # Ranks of the tasks the moved task now sits between; either is omitted at the ends of the list
+        prev_rank = body.get("prevRank")
+        next_rank = body.get("nextRank")
 
 
         if not goal_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing goalId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
+            return error(400, "Missing goalId")
         if not task_id:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing taskId"}),
-                "headers": {"Content-Type": "application/json"}
-            }
-        if not new_order:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Missing newOrder"}),
-                "headers": {"Content-Type": "application/json"}
-            }
-
-        sk = f"TASK#{goal_id}#{task_id}"
-
-        db.update_item(
-            TableName=DB_TABLE,
-            Key={
-                "PK": {"S": pk},
-                "SK": {"S": sk}
-            },
-            UpdateExpression="SET #order = :new_order",
-            ExpressionAttributeNames={
-                "#order": "order"
-            },
-            ExpressionAttributeValues={
-                ":new_order": {"N": str(new_order)}
-            }
-        )
-
-
-        return {
-            "statusCode": 200,
-            "body": json.dumps({ "success": True }),
-        }
+            return error(400, "Missing taskId")
+
+        try:
+            rank = rank_between(prev_rank, next_rank)
+        except ValueError as e:
+            return error(400, str(e))
+
+        db = get_db()
+        sync_expr, sync_values = sync_set(user_pk(user_id), goal_id)
+        try:
+            db.update_item(
+                TableName=DB_TABLE,
+                Key={
+                    "PK": {"S": user_pk(user_id)},
+                    "SK": {"S": task_sk(goal_id, task_id)}
+                },
+                UpdateExpression="SET #rank = :rank, " + sync_expr,
+                ConditionExpression="attribute_exists(SK)",
+                ExpressionAttributeNames={
+                    "#rank": "rank"
+                },
+                ExpressionAttributeValues={
+                    ":rank": {"S": rank},
+                    **sync_values
+                }
+            )
+        except db.exceptions.ConditionalCheckFailedException:
+            return error(404, "Task not found")
+        bump_versions(user_pk(user_id), goal_id)
+        request_rebalance(user_id, goal_id, [rank])
+
+        return response(200, { "success": True, "rank": rank })
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({ "error": str(e) }),
-        }
+        return error(500, str(e))
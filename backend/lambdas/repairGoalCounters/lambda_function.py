@@ -0,0 +1,39 @@
+from common import goal_items, goal_id_from_sk, read_goal_counters, write_goal_counters, goal_progress, bump_versions, traced
+
+# Invoked directly (console, CLI or schedule), not through API Gateway:
+#   {"mode": "check" | "repair", "userId": "<optional, limits the run to one user>"}
+
+@traced("repairGoalCounters")
+def lambda_handler(event, context):
+    mode = event.get("mode", "check")
+    if mode not in ("check", "repair"):
+        return {"error": f"Unknown mode {mode}"}
+
+    checked = 0
+    mismatched = []
+    for item in goal_items(event.get("userId")):
+        pk = item["PK"]["S"]
+        goal_id = goal_id_from_sk(item["SK"]["S"])
+        expected = read_goal_counters(pk, goal_id)
+        stored = goal_progress(item)
+        checked += 1
+
+        # Goals written before counters existed have no attributes at all, so compare presence too
+        missing = [name for name in ("taskCount", "completedCount", "totalTimeSpent") if name not in item]
+        diff = {name: {"stored": stored[name], "expected": expected[name]} for name in expected if stored[name] != expected[name]}
+        if not diff and not missing:
+            continue
+
+        mismatched.append({"PK": pk, "goalId": goal_id, "diff": diff, "missing": missing})
+        if mode == "repair":
+            write_goal_counters(pk, goal_id, expected)
+            bump_versions(pk, goal_id)
+
+    print(f"{mode}: checked {checked} goals, {len(mismatched)} inconsistent")
+    return {
+        "mode": mode,
+        "checked": checked,
+        "inconsistent": len(mismatched),
+        "repaired": len(mismatched) if mode == "repair" else 0,
+        "goals": mismatched[:100]
+    }
@@ -0,0 +1,42 @@
+import os
+import importlib.util
+
+from common import error
+
+# Handlers are loaded from the sibling function directories, so deploy this function with all of backend/lambdas
+LAMBDAS_DIR = os.environ.get("LAMBDAS_DIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROUTES = {
+    "GET /tasks": "getTasks",
+    "POST /addTask": "addTask",
+    "PATCH /markTask": "markTask",
+    "PATCH /editTask": "editTask",
+    "PATCH /updateTaskOrder": "reorderTasks",
+    "POST /reindexTasks": "reindexTasks",
+    "POST /deleteTask": "deleteTask",
+    "POST /tasks/batch": "batchTasks",
+    "GET /tasks/due": "getDueTasks",
+    "DELETE /deleteGoal": "deleteGoal",
+    "GET /goals": "getUserGoals",
+    "GET /dashboard": "getDashboard",
+    "GET /goalJob": "getGoalJob"
+}
+
+# Imported on first use of a route and kept for the life of the container
+_handlers = {}
+
+def get_handler(name):
+    handler = _handlers.get(name)
+    if handler is None:
+        spec = importlib.util.spec_from_file_location(f"{name}_lambda_function", os.path.join(LAMBDAS_DIR, name, "lambda_function.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        handler = module.lambda_handler
+        _handlers[name] = handler
+    return handler
+
+def lambda_handler(event, context):
+    name = ROUTES.get(event.get("routeKey"))
+    if name is None:
+        return error(404, "Unknown route")
+    return get_handler(name)(event, context)
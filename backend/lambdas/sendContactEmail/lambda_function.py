@@ -2,9 +2,8 @@ import json
 import os
 import re
 import base64
-import boto3
 
-ses = boto3.client("sesv2")
+from common import client, traced
 
 SENDER = os.environ.get("SENDER_EMAIL")           
 RECIPIENT = os.environ.get("RECIPIENT_EMAIL")     
@@ -42,6 +41,7 @@ def validate(payload):
         "message": message
     }, None
 
+@traced("sendContactEmail")
 def lambda_handler(event, context):
     headers_in = event.get("headers") or {}
     origin = headers_in.get("origin") or headers_in.get("Origin")
@@ -83,7 +83,7 @@ def lambda_handler(event, context):
     )
 
     try:
-        ses.send_email(
+        client("sesv2").send_email(
             FromEmailAddress=SENDER,
             Destination={"ToAddresses": [RECIPIENT]},
             ReplyToAddresses=[clean["email"]],
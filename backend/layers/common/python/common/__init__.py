@@ -0,0 +1,38 @@
+# Names are loaded from their submodule on first use (PEP 562), so a handler only pays for the modules it
+# imports from: `from common import response` never loads the planner, inference client or job queue.
+import importlib
+
+_EXPORTS = {
+    "common.clients": "client get_db DB_TABLE",
+    "common.dynamo": "query_pages scan_pages goal_items batch_write try_batch_write cancelled_by_condition item_size",
+    "common.keys": "user_pk goal_sk task_sk task_prefix GOAL_PREFIX TASK_PREFIX task_id_from_sk goal_id_from_sk tombstone_sk sync_key",
+    "common.api": "user_id_from_event query_param header json_body response encoded_response encode_token decode_token error",
+    "common.idempotency": "idempotent",
+    "common.tasks": "TASK_SCHEMA TASK_ATTRIBUTES RANK_INDEX OPEN_INDEX DUE_INDEX encode_task decode_task task_attribute_names open_keys task_item task_update update_expression task_condition last_rank",
+    "common.counters": "goal_counter_update lower_next_deadline refresh_next_deadline read_goal_counters compute_goal_counters write_goal_counters goal_progress",
+    "common.ranks": "rank_between ranks_after validate_rank rank_sort_key REBALANCE_LENGTH",
+    "common.reindex": "reindex_goal request_rebalance",
+    "common.metrics": "emit_metrics",
+    "common.tracing": "traced phase",
+    "common.sync": "TOMBSTONE_TTL sync_attributes sync_set sync_cursor tombstone_put changed_since",
+    "common.versions": "USER_META_SK bump_versions read_version make_etag etag_matches etag_headers not_modified",
+    "common.inference": "complete complete_stream call_with_failover backoff CircuitBreaker ProvidersUnavailable",
+    "common.planner": "plan_cache_key get_cached_plan put_cached_plan claim_plan release_plan_lease generate_plan create_goal call_huggingface_stream TaskLineParser",
+    "common.jobs": "create_job get_job claim_job finish_job job_status enqueue queue_url local_queue",
+    "common.deletion": "delete_goal delete_goal_tasks delete_metrics DELETE_CONCURRENCY"
+}
+
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names.split()}
+
+__all__ = list(_MODULES)
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module 'common' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,117 @@
+import os
+import json
+import base64
+
+from common.tracing import phase
+
+# Optional speedups, used when they are installed into the layer
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this go out uncompressed; below about a kilobyte the encoding overhead outweighs the saving
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+# Content-codings encoded_response can pick, in order of preference
+ENCODINGS = ("br", "gzip")
+
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Authorization,Content-Type,Idempotency-Key,If-None-Match"
+}
+
+def user_id_from_event(event):
+    with phase("Auth"):
+        return event["requestContext"]["authorizer"]["jwt"]["claims"]["sub"]
+
+def query_param(event, name):
+    return (event.get("queryStringParameters") or {}).get(name)
+
+def header(event, name):
+    # HTTP API (payload v2) lowercases header names, but direct invocations may not
+    name = name.lower()
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+def json_body(event):
+    with phase("Parse"):
+        return json.loads(event.get("body") or "{}")
+
+def dumps(body):
+    if orjson is not None:
+        return orjson.dumps(body)
+    return json.dumps(body, separators=(",", ":")).encode()
+
+def response(status_code, body, headers=None):
+    with phase("Serialize"):
+        return {
+            "statusCode": status_code,
+            "body": dumps(body).decode(),
+            "headers": {**DEFAULT_HEADERS, **(headers or {})}
+        }
+
+def accepted_encoding(event):
+    # Best encoding the client accepts: br when brotli is installed, then gzip; None for identity
+    accepted = {}
+    for part in (header(event, "Accept-Encoding") or "").split(","):
+        name, _, params = part.strip().lower().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    for name in (ENCODINGS if brotli is not None else ("gzip",)):
+        if accepted.get(name, accepted.get("*", 0)) > 0:
+            return name
+    return None
+
+def encoded_response(event, status_code, body, headers=None):
+    # Same as response(), but compresses large bodies with the encoding negotiated from Accept-Encoding;
+    # API Gateway passes base64 bodies through as binary
+    with phase("Serialize"):
+        raw = dumps(body)
+        headers = {**DEFAULT_HEADERS, "Vary": "Accept-Encoding", **(headers or {})}
+        encoding = accepted_encoding(event) if len(raw) >= COMPRESS_MIN_BYTES else None
+        if encoding is None:
+            return {"statusCode": status_code, "body": raw.decode(), "headers": headers}
+        if encoding == "br":
+            data = brotli.compress(raw, quality=4)
+        else:
+            import gzip
+            data = gzip.compress(raw, compresslevel=5)
+        if "ETag" in headers:
+            headers["ETag"] = encoded_etag(headers["ETag"], encoding)
+        return {
+            "statusCode": status_code,
+            "body": base64.b64encode(data).decode(),
+            "isBase64Encoded": True,
+            "headers": {**headers, "Content-Encoding": encoding}
+        }
+
+def encoded_etag(etag, encoding):
+    # A compressed body is a different representation from the identity one, so it gets its own strong tag
+    # ('"v:5"' -> '"v:5-gzip"'); otherwise caches could answer an identity request with gzip bytes or vice versa
+    return f'{etag[:-1]}-{encoding}"'
+
+def encode_token(last_key):
+    # Opaque nextToken for a Query's LastEvaluatedKey
+    return base64.urlsafe_b64encode(json.dumps(last_key).encode()).decode()
+
+def decode_token(token, pk):
+    # Raises ValueError unless the token is a key from the caller's own partition
+    last_key = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+    if not isinstance(last_key, dict) or last_key.get("PK", {}).get("S") != pk:
+        raise ValueError("Invalid nextToken")
+    return last_key
+
+def error(status_code, message):
+    return response(status_code, {"error": message})
@@ -0,0 +1,26 @@
+import os
+
+DB_TABLE = os.environ.get("DB_TABLE")
+
+# boto3 is imported and clients are built on first use, then reused by every warm invocation
+_clients = {}
+
+def client(service):
+    c = _clients.get(service)
+    if c is None:
+        import boto3
+        from botocore.config import Config
+
+        c = boto3.client(service, config=Config(
+            max_pool_connections=int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "25")),
+            tcp_keepalive=True,
+            retries={"mode": "standard"}
+        ))
+        if service == "dynamodb":
+            from common.tracing import instrument
+            instrument(c)
+        _clients[service] = c
+    return c
+
+def get_db():
+    return client("dynamodb")
@@ -0,0 +1,111 @@
+from common.clients import get_db, DB_TABLE
+from common.dynamo import query_pages
+from common.keys import goal_sk, task_prefix
+from common.tasks import decode_task, task_attribute_names
+
+# Progress rollups kept on each GOAL# item so reads never have to touch task items
+COUNTER_ATTRIBUTES = ("taskCount", "completedCount", "totalTimeSpent")
+
+def goal_counter_update(pk, goal_id, tasks=0, completed=0, time_spent=0):
+    # TransactWriteItems entry that ADDs the deltas to the goal; fails the transaction if the goal is gone
+    return {
+        "Update": {
+            "TableName": DB_TABLE,
+            "Key": {"PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}},
+            "UpdateExpression": "ADD taskCount :tasks, completedCount :completed, totalTimeSpent :time_spent",
+            "ConditionExpression": "attribute_exists(SK)",
+            "ExpressionAttributeValues": {
+                ":tasks": {"N": str(tasks)},
+                ":completed": {"N": str(completed)},
+                ":time_spent": {"N": str(time_spent)}
+            }
+        }
+    }
+
+def lower_next_deadline(pk, goal_id, deadline):
+    # nextDeadline only ever moves earlier here, so a conditional SET is enough
+    db = get_db()
+    try:
+        db.update_item(
+            TableName=DB_TABLE,
+            Key={"PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}},
+            UpdateExpression="SET nextDeadline = :deadline",
+            ConditionExpression="attribute_exists(SK) AND (attribute_not_exists(nextDeadline) OR nextDeadline > :deadline)",
+            ExpressionAttributeValues={":deadline": {"S": deadline}}
+        )
+    except db.exceptions.ConditionalCheckFailedException:
+        pass
+
+def compute_goal_counters(task_items):
+    counters = {"taskCount": 0, "completedCount": 0, "totalTimeSpent": 0, "nextDeadline": None}
+    for item in task_items:
+        task = decode_task(item)
+        counters["taskCount"] += 1
+        counters["totalTimeSpent"] += task["timeSpent"]
+        if task["completed"]:
+            counters["completedCount"] += 1
+            continue
+        deadline = task["deadline"]
+        if deadline and (counters["nextDeadline"] is None or deadline < counters["nextDeadline"]):
+            counters["nextDeadline"] = deadline
+    return counters
+
+def read_goal_counters(pk, goal_id):
+    names = task_attribute_names(["completed", "deadline", "timeSpent"])
+    return compute_goal_counters(query_pages(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
+        ProjectionExpression=", ".join(f"#a{i}" for i in range(len(names))),
+        ExpressionAttributeNames={f"#a{i}": name for i, name in enumerate(names)},
+        ExpressionAttributeValues={
+            ":pk": {"S": pk},
+            ":sk_prefix": {"S": task_prefix(goal_id)}
+        }
+    ))
+
+def write_goal_counters(pk, goal_id, counters, fields=None):
+    fields = fields or COUNTER_ATTRIBUTES + ("nextDeadline",)
+    sets = []
+    removes = []
+    values = {}
+    for name in fields:
+        value = counters[name]
+        if value is None:
+            removes.append(name)
+        elif name == "nextDeadline":
+            sets.append(f"{name} = :{name}")
+            values[f":{name}"] = {"S": value}
+        else:
+            sets.append(f"{name} = :{name}")
+            values[f":{name}"] = {"N": str(value)}
+
+    update_expr = ""
+    if sets:
+        update_expr += "SET " + ", ".join(sets)
+    if removes:
+        update_expr += " REMOVE " + ", ".join(removes)
+
+    kwargs = {"ExpressionAttributeValues": values} if values else {}
+    db = get_db()
+    try:
+        db.update_item(
+            TableName=DB_TABLE,
+            Key={"PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}},
+            UpdateExpression=update_expr.strip(),
+            ConditionExpression="attribute_exists(SK)",
+            **kwargs
+        )
+    except db.exceptions.ConditionalCheckFailedException:
+        pass
+
+def refresh_next_deadline(pk, goal_id):
+    # Completing or deleting the earliest task can move nextDeadline later, which needs the remaining tasks
+    write_goal_counters(pk, goal_id, read_goal_counters(pk, goal_id), fields=("nextDeadline",))
+
+def goal_progress(item):
+    return {
+        "taskCount": int(item.get("taskCount", {}).get("N", "0")),
+        "completedCount": int(item.get("completedCount", {}).get("N", "0")),
+        "totalTimeSpent": int(item.get("totalTimeSpent", {}).get("N", "0")),
+        "nextDeadline": item.get("nextDeadline", {}).get("S")
+    }
@@ -0,0 +1,149 @@
+import os
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from common.clients import get_db, DB_TABLE
+from common.keys import user_pk, goal_sk, task_prefix
+from common.dynamo import BATCH_SIZE, try_batch_write
+from common.jobs import enqueue, queue_url
+from common.metrics import emit_metrics
+
+# Concurrent BatchWriteItem workers per deletion; keep at or below AWS_MAX_POOL_CONNECTIONS
+DELETE_CONCURRENCY = int(os.environ.get("DELETE_CONCURRENCY", "8"))
+# Stop starting new batches when the invocation has less than this left, and hand the rest to the worker
+DELETE_TIME_MARGIN_MS = int(os.environ.get("DELETE_TIME_MARGIN_MS", "10000"))
+
+def mark_goal_deleting(pk, goal_id):
+    # Checkpoint for a deletion that may span invocations: the flagged goal is hidden from listings and records
+    # how many tasks are gone so far. Deleted keys never come back, so a resumed run just queries what's left.
+    try:
+        get_db().update_item(
+            TableName=DB_TABLE,
+            Key={"PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}},
+            UpdateExpression="SET deletingAt = if_not_exists(deletingAt, :now)",
+            ConditionExpression="attribute_exists(SK)",
+            ExpressionAttributeValues={":now": {"S": datetime.utcnow().isoformat()}}
+        )
+    except get_db().exceptions.ConditionalCheckFailedException:
+        # Goal item already gone; any tasks left behind are still swept
+        pass
+
+def record_progress(pk, goal_id, deleted):
+    try:
+        get_db().update_item(
+            TableName=DB_TABLE,
+            Key={"PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}},
+            UpdateExpression="ADD deletedTasks :deleted",
+            ConditionExpression="attribute_exists(SK)",
+            ExpressionAttributeValues={":deleted": {"N": str(deleted)}}
+        )
+    except get_db().exceptions.ConditionalCheckFailedException:
+        pass
+
+def task_key_pages(pk, goal_id):
+    # Key-only pages of the goal's tasks, so each 1 MB page carries as many keys as possible
+    db = get_db()
+    query = {
+        "TableName": DB_TABLE,
+        "KeyConditionExpression": "PK = :pk AND begins_with(SK, :sk_prefix)",
+        "ProjectionExpression": "SK",
+        "ExpressionAttributeValues": {":pk": {"S": pk}, ":sk_prefix": {"S": task_prefix(goal_id)}}
+    }
+    while True:
+        page = db.query(**query)
+        yield [item["SK"]["S"] for item in page["Items"]]
+        last_key = page.get("LastEvaluatedKey")
+        if not last_key:
+            return
+        query["ExclusiveStartKey"] = last_key
+
+def count_tasks(pk, goal_id):
+    db = get_db()
+    query = {
+        "TableName": DB_TABLE,
+        "KeyConditionExpression": "PK = :pk AND begins_with(SK, :sk_prefix)",
+        "Select": "COUNT",
+        "ExpressionAttributeValues": {":pk": {"S": pk}, ":sk_prefix": {"S": task_prefix(goal_id)}}
+    }
+    count = 0
+    while True:
+        page = db.query(**query)
+        count += page["Count"]
+        last_key = page.get("LastEvaluatedKey")
+        if not last_key:
+            return count
+        query["ExclusiveStartKey"] = last_key
+
+def delete_batch(pk, sks):
+    failed = try_batch_write([{"DeleteRequest": {"Key": {"PK": {"S": pk}, "SK": {"S": sk}}}} for sk in sks])
+    return len(sks) - len(failed)
+
+def delete_goal_tasks(pk, goal_id, out_of_time=lambda: False):
+    # Feeds 25-key batches from the paginated key reads to DELETE_CONCURRENCY workers, keeping at most twice that
+    # many batches queued. Returns (deleted, finished); finished is False when out_of_time() stopped it early or
+    # some deletes were still unprocessed after their retries.
+    deleted = 0
+    finished = True
+    pending = set()
+
+    def collect(done):
+        nonlocal deleted, finished
+        for future in done:
+            count, size = future.result()
+            deleted += count
+            if count < size:
+                finished = False
+
+    with ThreadPoolExecutor(max_workers=DELETE_CONCURRENCY) as pool:
+        for sks in task_key_pages(pk, goal_id):
+            for i in range(0, len(sks), BATCH_SIZE):
+                if out_of_time():
+                    finished = False
+                    break
+                if len(pending) >= 2 * DELETE_CONCURRENCY:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                batch = sks[i:i+BATCH_SIZE]
+                pending.add(pool.submit(lambda b: (delete_batch(pk, b), len(b)), batch))
+            if not finished:
+                break
+        collect(wait(pending).done)
+    return deleted, finished
+
+def delete_goal(user_id, goal_id, context=None):
+    # Deletes the goal's tasks and then the goal item, so a run cut short never leaves tasks without their goal.
+    # With a Lambda context, stops short of the timeout and enqueues a resume job for the worker.
+    # Returns (deleted, remaining); remaining is 0 once the goal item is gone.
+    pk = user_pk(user_id)
+    if context is not None:
+        # A run that may hand off needs the job queue; fail before the goal is hidden rather than part-way through
+        queue_url()
+    mark_goal_deleting(pk, goal_id)
+
+    if context is not None:
+        out_of_time = lambda: context.get_remaining_time_in_millis() < DELETE_TIME_MARGIN_MS
+    else:
+        out_of_time = lambda: False
+
+    deleted, finished = delete_goal_tasks(pk, goal_id, out_of_time)
+    if not finished:
+        if deleted == 0:
+            # Nothing went through (throttled throughout); fail rather than hand off a run that isn't progressing
+            raise Exception("Could not delete any tasks")
+        record_progress(pk, goal_id, deleted)
+        enqueue({"kind": "deleteGoal", "userId": user_id, "goalId": goal_id})
+        return deleted, count_tasks(pk, goal_id)
+
+    get_db().delete_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}}
+    )
+    return deleted, 0
+
+def delete_metrics(deleted, remaining, function):
+    # One EMF line per deletion run; GoalDeleteHandedOff counts runs that left the rest to goalWorker
+    emit_metrics({
+        "GoalTasksDeleted": (deleted, "Count"),
+        "GoalTasksRemaining": (remaining, "Count"),
+        "GoalDeleteHandedOff": (int(bool(remaining)), "Count")
+    }, {"Function": function})
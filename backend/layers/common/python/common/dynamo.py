@@ -0,0 +1,98 @@
+import random
+import time
+
+from common.clients import get_db, DB_TABLE
+from common.keys import user_pk, GOAL_PREFIX
+
+BATCH_SIZE = 25
+MAX_BATCH_ATTEMPTS = 5
+
+def query_pages(**kwargs):
+    # Walks every Query page, following LastEvaluatedKey until the result set is exhausted
+    db = get_db()
+    while True:
+        response = db.query(**kwargs)
+        for item in response["Items"]:
+            yield item
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+def scan_pages(**kwargs):
+    # Same as query_pages for Scan; only used by maintenance jobs
+    db = get_db()
+    while True:
+        response = db.scan(**kwargs)
+        for item in response["Items"]:
+            yield item
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+def goal_items(user_id=None):
+    # Every GOAL# item of one user, or of the whole table when no user is given
+    if user_id:
+        return query_pages(
+            TableName=DB_TABLE,
+            KeyConditionExpression="PK = :pk AND begins_with(SK, :goal)",
+            ExpressionAttributeValues={":pk": {"S": user_pk(user_id)}, ":goal": {"S": GOAL_PREFIX}}
+        )
+    return scan_pages(
+        TableName=DB_TABLE,
+        FilterExpression="begins_with(SK, :goal)",
+        ExpressionAttributeValues={":goal": {"S": GOAL_PREFIX}}
+    )
+
+def try_batch_write(requests):
+    # Sends Put/DeleteRequests in 25-item BatchWriteItem chunks, retrying UnprocessedItems with jittered backoff;
+    # returns the requests still unprocessed after the last attempt
+    db = get_db()
+    failed = []
+    for i in range(0, len(requests), BATCH_SIZE):
+        req = {DB_TABLE: requests[i:i+BATCH_SIZE]}
+        backoff = 0.05
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            resp = db.batch_write_item(RequestItems=req)
+            un = resp.get("UnprocessedItems", {}).get(DB_TABLE, [])
+            if not un:
+                break
+            if attempt == MAX_BATCH_ATTEMPTS - 1:
+                failed.extend(un)
+                break
+            req = {DB_TABLE: un}
+            time.sleep(random.uniform(0, backoff))
+            backoff *= 2
+    return failed
+
+def batch_write(requests):
+    failed = try_batch_write(requests)
+    if failed:
+        raise Exception(f"Failed to write {len(failed)} items")
+    return len(requests)
+
+def cancelled_by_condition(e):
+    # True when a TransactionCanceledException was caused by a failed ConditionExpression rather than a conflict
+    reasons = getattr(e, "response", {}).get("CancellationReasons", [])
+    return any(r.get("Code") == "ConditionalCheckFailed" for r in reasons)
+
+def item_size(item):
+    # Stored size of an item in bytes by DynamoDB's rules (names plus values, numbers ~1 byte per 2 digits);
+    # reads are billed per 4 KB of it
+    return sum(len(name.encode()) + value_size(value) for name, value in item.items())
+
+def value_size(value):
+    kind, data = next(iter(value.items()))
+    if kind in ("S", "B"):
+        return len(data.encode() if isinstance(data, str) else data)
+    if kind == "N":
+        digits = data.lstrip("-").replace(".", "").strip("0")
+        return (len(digits) + 1) // 2 + 1
+    if kind in ("BOOL", "NULL"):
+        return 1
+    if kind == "M":
+        return 3 + sum(1 + len(name.encode()) + value_size(v) for name, v in data.items())
+    if kind == "L":
+        return 3 + sum(1 + value_size(v) for v in data)
+    return sum(len(v.encode() if isinstance(v, str) else v) for v in data)
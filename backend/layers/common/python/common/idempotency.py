@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import hashlib
+import functools
+
+from common.clients import get_db, DB_TABLE
+from common.api import user_id_from_event, header, error
+
+IDEMPOTENCY_PREFIX = "IDEMPOTENCY#"
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL_HOURS", "24")) * 3600
+# An in-progress record older than this belongs to an invocation that died; a retry may take it over
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get("IDEMPOTENCY_LOCK_SECONDS", "60"))
+
+def idempotency_pk(user_id):
+    # Records live in their own partition per user, so the stored responses never add to reads of the USER# partition
+    return IDEMPOTENCY_PREFIX + user_id
+
+def idempotency_key(event, key):
+    # Scoped per route so the same client key on two endpoints never collides
+    raw = f"{event.get('routeKey', '')}|{key}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def request_hash(event):
+    raw = json.dumps([event.get("queryStringParameters") or {}, event.get("body") or ""], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def idempotent(handler):
+    # Handlers wrapped with this honour an Idempotency-Key header: the first request runs and its response is stored,
+    # replays get the stored response back, and a duplicate arriving while the first is still running gets a 409.
+    # 5xx responses aren't stored, so a retry after a server error runs the handler again.
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        key = header(event, "Idempotency-Key")
+        if not key:
+            return handler(event, context)
+
+        db = get_db()
+        record_key = {"PK": {"S": idempotency_pk(user_id_from_event(event))}, "SK": {"S": idempotency_key(event, key)}}
+        fingerprint = request_hash(event)
+        now = int(time.time())
+
+        try:
+            db.put_item(
+                TableName=DB_TABLE,
+                Item={
+                    **record_key,
+                    "type": {"S": 'idempotency'},
+                    "status": {"S": 'in_progress'},
+                    "requestHash": {"S": fingerprint},
+                    "lockExpires": {"N": str(now + IDEMPOTENCY_LOCK_SECONDS)},
+                    "ttl": {"N": str(now + IDEMPOTENCY_TTL)}
+                },
+                ConditionExpression="attribute_not_exists(SK) OR (#status = :in_progress AND lockExpires < :now) OR #ttl < :now",
+                ExpressionAttributeNames={"#status": "status", "#ttl": "ttl"},
+                ExpressionAttributeValues={":in_progress": {"S": "in_progress"}, ":now": {"N": str(now)}}
+            )
+        except db.exceptions.ConditionalCheckFailedException:
+            record = db.get_item(TableName=DB_TABLE, Key=record_key, ConsistentRead=True).get("Item")
+            if record is None or record["status"]["S"] != "completed":
+                return error(409, "A request with this Idempotency-Key is already in progress")
+            if record["requestHash"]["S"] != fingerprint:
+                return error(422, "Idempotency-Key was already used with a different request")
+            stored = json.loads(record["response"]["S"])
+            stored["headers"] = {**stored.get("headers", {}), "Idempotent-Replayed": "true"}
+            return stored
+
+        try:
+            result = handler(event, context)
+        except Exception:
+            db.delete_item(TableName=DB_TABLE, Key=record_key)
+            raise
+
+        if result.get("statusCode", 500) >= 500:
+            db.delete_item(TableName=DB_TABLE, Key=record_key)
+            return result
+
+        db.update_item(
+            TableName=DB_TABLE,
+            Key=record_key,
+            UpdateExpression="SET #status = :completed, #response = :response",
+            ExpressionAttributeNames={"#status": "status", "#response": "response"},
+            ExpressionAttributeValues={":completed": {"S": "completed"}, ":response": {"S": json.dumps(result)}}
+        )
+        return result
+
+    return wrapper
@@ -0,0 +1,140 @@
+import os
+import time
+import random
+import threading
+
+from common.metrics import emit_metrics
+from common.tracing import phase
+
+HF_API_KEY = os.environ.get("HF_API_KEY")
+HF_MODEL = os.environ.get("HF_MODEL", "meta-llama/Llama-3.1-8B-Instruct")
+
+# Ordered "provider:model" pairs; the first is the primary, the rest are tried in order when it fails or its breaker is open
+PROVIDERS = [
+    tuple(entry.strip().split(":", 1))
+    for entry in os.environ.get("HF_PROVIDERS", f"novita:{HF_MODEL}").split(",") if entry.strip()
+]
+
+HF_TIMEOUT = float(os.environ.get("HF_TIMEOUT_SECONDS", "20"))
+HF_ATTEMPTS = int(os.environ.get("HF_ATTEMPTS_PER_PROVIDER", "2"))
+BACKOFF_BASE = float(os.environ.get("HF_BACKOFF_BASE_SECONDS", "0.5"))
+BACKOFF_CAP = float(os.environ.get("HF_BACKOFF_CAP_SECONDS", "4"))
+BREAKER_FAILURES = int(os.environ.get("HF_BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN = float(os.environ.get("HF_BREAKER_COOLDOWN_SECONDS", "30"))
+
+class ProvidersUnavailable(Exception):
+    pass
+
+class CircuitBreaker:
+    # Opens after BREAKER_FAILURES consecutive failures and rejects calls until the cooldown passes;
+    # then lets one trial call through (half-open), which either closes it again or restarts the cooldown
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.max_failures = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.trial or time.time() - self.opened_at < self.cooldown:
+                return False
+            self.trial = True
+            return True
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial or self.failures >= self.max_failures:
+                self.opened_at = time.time()
+            self.trial = False
+
+# One client and breaker per provider, kept for the life of the container so warm invocations reuse
+# the HTTP session (and its keep-alive connections) instead of reconnecting to the provider each time
+_clients = {}
+_breakers = {}
+
+def inference_client(provider):
+    c = _clients.get(provider)
+    if c is None:
+        # Deferred so requests that fail validation never pay for importing huggingface_hub
+        from huggingface_hub import InferenceClient
+
+        c = InferenceClient(provider=provider, api_key=HF_API_KEY, timeout=HF_TIMEOUT)
+        _clients[provider] = c
+    return c
+
+def breaker(provider):
+    return _breakers.setdefault(provider, CircuitBreaker())
+
+def backoff(attempt):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+def call_with_failover(call):
+    # Runs call(client, model) against each provider in order, retrying each up to HF_ATTEMPTS times,
+    # and skipping providers whose breaker is open. Raises the last error once every provider is exhausted.
+    last_error = None
+    for provider, model in PROVIDERS:
+        b = breaker(provider)
+        for attempt in range(HF_ATTEMPTS):
+            if not b.allow():
+                emit_metrics({"ProviderRejected": (1, "Count")}, {"Provider": provider})
+                break
+            try:
+                with phase("LLM"):
+                    result = call(inference_client(provider), model)
+            except Exception as e:
+                b.failure()
+                last_error = e
+                print(f"Inference call to {provider} failed (attempt {attempt + 1}): {e}")
+                emit_metrics({"ProviderFailure": (1, "Count")}, {"Provider": provider})
+                if attempt < HF_ATTEMPTS - 1:
+                    time.sleep(backoff(attempt))
+                continue
+            b.success()
+            return result
+    raise last_error or ProvidersUnavailable("All inference providers are unavailable")
+
+def complete(prompt):
+    def call(client, model):
+        completion = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return completion.choices[0].message["content"]
+
+    return call_with_failover(call)
+
+def complete_stream(prompt):
+    # Fails over only until the first chunk arrives; after that the caller has already used the output,
+    # so a broken stream is raised instead of being silently restarted on another provider
+    def call(client, model):
+        chunks = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
+        )
+        for chunk in chunks:
+            content = chunk.choices[0].delta.content if chunk.choices else None
+            if content:
+                return content, chunks
+        return None, chunks
+
+    first, chunks = call_with_failover(call)
+    if first is None:
+        return
+    yield first
+    for chunk in chunks:
+        content = chunk.choices[0].delta.content if chunk.choices else None
+        if content:
+            yield content
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from common.clients import client, get_db, DB_TABLE
+from common.keys import user_pk
+
+JOB_PREFIX = "JOB#"
+# An SQS queue URL, or "local" for the in-memory queue; unset is a configuration error, not a reason to drop jobs
+JOB_QUEUE_URL = os.environ.get("JOB_QUEUE_URL")
+JOB_TTL = int(os.environ.get("JOB_TTL_HOURS", "24")) * 3600
+# A running job whose worker hasn't touched it for this long is assumed dead and can be claimed again
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", "300"))
+
+def job_sk(job_id):
+    return JOB_PREFIX + job_id
+
+def utc_now():
+    # Aware, so arithmetic on it never goes through the container's local time
+    return datetime.now(timezone.utc)
+
+class LocalQueue:
+    # In-memory stand-in for SQS, used only when JOB_QUEUE_URL is explicitly "local" (tests and local runs)
+    def __init__(self):
+        self.messages = deque()
+
+    def send(self, body):
+        self.messages.append(body)
+
+    def drain(self, handler, batch_size=10):
+        # Feeds queued messages to an SQS-style handler until the queue is empty; returns how many were delivered
+        delivered = 0
+        while self.messages:
+            batch = [self.messages.popleft() for _ in range(min(batch_size, len(self.messages)))]
+            handler({"Records": [
+                {"messageId": str(uuid.uuid4()), "body": body, "eventSource": "aws:sqs"} for body in batch
+            ]}, None)
+            delivered += len(batch)
+        return delivered
+
+local_queue = LocalQueue()
+
+def queue_url():
+    if not JOB_QUEUE_URL:
+        raise RuntimeError('JOB_QUEUE_URL is not set; use an SQS queue URL, or "local" for the in-memory queue')
+    return JOB_QUEUE_URL
+
+def enqueue(message):
+    body = json.dumps(message)
+    if queue_url() == "local":
+        local_queue.send(body)
+    else:
+        client("sqs").send_message(QueueUrl=JOB_QUEUE_URL, MessageBody=body)
+
+def create_job(user_id, goal, regenerate=False):
+    # Checked before the job item is written, so a misconfigured function doesn't leave jobs that never run
+    queue_url()
+    job_id = str(uuid.uuid4())
+    now = utc_now().isoformat()
+    get_db().put_item(
+        TableName=DB_TABLE,
+        Item={
+            "PK": {"S": user_pk(user_id)},
+            "SK": {"S": job_sk(job_id)},
+            "type": {"S": 'job'},
+            "status": {"S": 'queued'},
+            "goalText": {"S": goal},
+            "regenerate": {"BOOL": bool(regenerate)},
+            "createdAt": {"S": now},
+            "updatedAt": {"S": now},
+            "ttl": {"N": str(int(time.time()) + JOB_TTL)}
+        }
+    )
+    enqueue({"userId": user_id, "jobId": job_id})
+    return job_id
+
+def get_job(user_id, job_id):
+    return get_db().get_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": user_pk(user_id)}, "SK": {"S": job_sk(job_id)}},
+        ConsistentRead=True
+    ).get("Item")
+
+def claim_job(user_id, job_id):
+    # Moves a queued (or abandoned running) job to running; returns the job item, or None if another worker owns it
+    # or it has already finished, which makes SQS redeliveries harmless
+    now = utc_now()
+    stale = (now - timedelta(seconds=JOB_STALE_SECONDS)).isoformat()
+    try:
+        return get_db().update_item(
+            TableName=DB_TABLE,
+            Key={"PK": {"S": user_pk(user_id)}, "SK": {"S": job_sk(job_id)}},
+            UpdateExpression="SET #status = :running, updatedAt = :now ADD attempts :one",
+            ConditionExpression="#status = :queued OR (#status = :running AND updatedAt < :stale)",
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues={
+                ":running": {"S": "running"},
+                ":queued": {"S": "queued"},
+                ":now": {"S": now.isoformat()},
+                ":stale": {"S": stale},
+                ":one": {"N": "1"}
+            },
+            ReturnValues="ALL_NEW"
+        )["Attributes"]
+    except get_db().exceptions.ConditionalCheckFailedException:
+        return None
+
+def finish_job(user_id, job_id, goal_id=None, error=None):
+    values = {
+        ":status": {"S": "failed" if error else "done"},
+        ":now": {"S": utc_now().isoformat()},
+        ":result": {"S": error or goal_id}
+    }
+    get_db().update_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": user_pk(user_id)}, "SK": {"S": job_sk(job_id)}},
+        UpdateExpression=f"SET #status = :status, updatedAt = :now, {'#error' if error else 'goalId'} = :result",
+        ExpressionAttributeNames={"#status": "status", **({"#error": "error"} if error else {})},
+        ExpressionAttributeValues=values
+    )
+
+def job_status(item):
+    status = {"jobId": item["SK"]["S"][len(JOB_PREFIX):], "status": item["status"]["S"]}
+    if "goalId" in item:
+        status["goalId"] = item["goalId"]["S"]
+    if "error" in item:
+        status["error"] = item["error"]["S"]
+    return status
@@ -0,0 +1,31 @@
+USER_PREFIX = "USER#"
+GOAL_PREFIX = "GOAL#"
+TASK_PREFIX = "TASK#"
+
+def user_pk(user_id):
+    return USER_PREFIX + user_id
+
+def goal_sk(goal_id):
+    return GOAL_PREFIX + goal_id
+
+def task_prefix(goal_id):
+    return f"{TASK_PREFIX}{goal_id}#"
+
+def task_sk(goal_id, task_id):
+    return f"{TASK_PREFIX}{goal_id}#{task_id}"
+
+def task_id_from_sk(sk):
+    return sk.rpartition("#")[2]
+
+def goal_id_from_sk(sk):
+    # Works for both GOAL#<goalId> and TASK#<goalId>#<taskId>
+    return sk.split("#", 2)[1]
+
+TOMBSTONE_PREFIX = "TOMBSTONE#"
+
+def tombstone_sk(goal_id, task_id):
+    return f"{TOMBSTONE_PREFIX}{goal_id}#{task_id}"
+
+def sync_key(pk, goal_id):
+    # Partition key of the sync index: one partition per goal, holding its tasks and tombstones by version
+    return f"{pk}#{goal_id}"
@@ -0,0 +1,22 @@
+import json
+import os
+import time
+
+NAMESPACE = os.environ.get("METRICS_NAMESPACE", "GoalApp")
+
+def emit_metrics(metrics, dimensions=None):
+    # One CloudWatch Embedded Metric Format line; metrics maps name -> (value, unit)
+    dimensions = dimensions or {}
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": [list(dimensions)],
+                "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in metrics.items()]
+            }]
+        },
+        **dimensions,
+        **{name: value for name, (value, _) in metrics.items()}
+    }
+    print(json.dumps(record))
@@ -0,0 +1,320 @@
+import os
+import re
+import time
+import string
+import uuid
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+
+from common.clients import get_db, DB_TABLE
+from common.dynamo import query_pages, batch_write
+from common.inference import HF_MODEL, complete, complete_stream
+from common.keys import user_pk, goal_sk
+from common.metrics import emit_metrics
+from common.ranks import ranks_after
+from common.tasks import task_item
+from common.versions import bump_versions
+
+# Goal -> task plan generation, shared by goalProcessor (sync and stream modes) and the async goalWorker
+
+# Bump PROMPT_VERSION whenever PROMPT changes so cached plans from the old prompt are not reused
+PROMPT_VERSION = "1"
+PROMPT = "Break the following goal into a single flat numbered list of actionable tasks. Each task should be a specific, concrete action, not a category or phase. If the goal mentions a timeframe, distribute tasks across that timeframe. Output ONLY the numbered list. No introductions, no summaries, no section headers, no sub-lists, no markdown formatting, no commentary before or after the list. Maximum 12 tasks.\n\nGoal: {goal}"
+
+PLAN_CACHE_TTL = int(os.environ.get("PLAN_CACHE_TTL_DAYS", "7")) * 86400
+PLAN_CACHE_LOCAL_SIZE = int(os.environ.get("PLAN_CACHE_LOCAL_SIZE", "256"))
+# How long a request generating a plan holds the lease, and how often duplicates check for its result
+PLAN_LEASE_SECONDS = int(os.environ.get("PLAN_LEASE_SECONDS", "60"))
+PLAN_LEASE_POLL_SECONDS = float(os.environ.get("PLAN_LEASE_POLL_SECONDS", "0.25"))
+# Logs every raw model response (for backend/tools/bench_extractor.py); off by default, responses can be long
+LOG_MODEL_OUTPUT = os.environ.get("LOG_MODEL_OUTPUT") == "1"
+
+# In-container LRU in front of the DynamoDB plan cache: key -> (tasks, llm_ms, expires_at)
+_plan_cache = OrderedDict()
+
+def normalize_goal(goal):
+    return " ".join(re.sub(r"[^\w\s]", " ", goal.lower()).split())
+
+def plan_cache_key(goal):
+    raw = f"{HF_MODEL}|{PROMPT_VERSION}|{normalize_goal(goal)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def get_cached_plan(key):
+    entry = _plan_cache.get(key)
+    if entry and entry[2] > time.time():
+        _plan_cache.move_to_end(key)
+        return entry[0], entry[1]
+
+    # The cache is an optimisation; a failed lookup just means calling the model
+    try:
+        item = get_db().get_item(
+            TableName=DB_TABLE,
+            Key={"PK": {"S": f"PLAN#{key}"}, "SK": {"S": "PLAN"}}
+        ).get("Item")
+    except Exception as e:
+        print(f"Plan cache read failed: {e}")
+        return None
+    # DynamoDB deletes expired items lazily, so check the TTL ourselves
+    if not item or int(item["ttl"]["N"]) <= time.time():
+        return None
+
+    tasks = [t["S"] for t in item["tasks"]["L"]]
+    llm_ms = int(item["llmMs"]["N"])
+    remember_plan(key, tasks, llm_ms, int(item["ttl"]["N"]))
+    return tasks, llm_ms
+
+def remember_plan(key, tasks, llm_ms, expires_at):
+    _plan_cache[key] = (tasks, llm_ms, expires_at)
+    _plan_cache.move_to_end(key)
+    while len(_plan_cache) > PLAN_CACHE_LOCAL_SIZE:
+        _plan_cache.popitem(last=False)
+
+def put_cached_plan(key, tasks, llm_ms):
+    expires_at = int(time.time()) + PLAN_CACHE_TTL
+    remember_plan(key, tasks, llm_ms, expires_at)
+    try:
+        get_db().put_item(
+            TableName=DB_TABLE,
+            Item={
+                "PK": {"S": f"PLAN#{key}"},
+                "SK": {"S": "PLAN"},
+                "type": {"S": 'plan'},
+                "tasks": {"L": [{"S": t} for t in tasks]},
+                "model": {"S": HF_MODEL},
+                "promptVersion": {"S": PROMPT_VERSION},
+                "llmMs": {"N": str(llm_ms)},
+                "ttl": {"N": str(expires_at)}
+            }
+        )
+    except Exception as e:
+        print(f"Plan cache write failed: {e}")
+
+def acquire_plan_lease(key):
+    # Single-flight: only the request that writes the lease calls the model for this goal; returns the lease id, or None
+    # if another request holds it. If DynamoDB is unavailable we proceed as the owner rather than block the request.
+    lease = str(uuid.uuid4())
+    now = int(time.time())
+    db = get_db()
+    try:
+        db.put_item(
+            TableName=DB_TABLE,
+            Item={
+                "PK": {"S": f"PLAN#{key}"},
+                "SK": {"S": "LEASE"},
+                "type": {"S": 'lease'},
+                "lease": {"S": lease},
+                "ttl": {"N": str(now + PLAN_LEASE_SECONDS)}
+            },
+            ConditionExpression="attribute_not_exists(PK) OR #ttl < :now",
+            ExpressionAttributeNames={"#ttl": "ttl"},
+            ExpressionAttributeValues={":now": {"N": str(now)}}
+        )
+    except db.exceptions.ConditionalCheckFailedException:
+        return None
+    except Exception as e:
+        print(f"Plan lease write failed: {e}")
+    return lease
+
+def release_plan_lease(key, lease):
+    db = get_db()
+    try:
+        db.delete_item(
+            TableName=DB_TABLE,
+            Key={"PK": {"S": f"PLAN#{key}"}, "SK": {"S": "LEASE"}},
+            ConditionExpression="lease = :lease",
+            ExpressionAttributeValues={":lease": {"S": lease}}
+        )
+    except Exception as e:
+        # Already expired and taken over, or a DynamoDB failure; either way the TTL cleans it up
+        print(f"Plan lease release failed: {e}")
+
+def wait_for_plan(key):
+    # Polls the plan's partition (cached plan and lease in one read) until the lease holder stores its plan.
+    # Returns None if the holder gave up or its lease expired, in which case the caller generates the plan itself.
+    deadline = time.time() + PLAN_LEASE_SECONDS
+    while time.time() < deadline:
+        time.sleep(PLAN_LEASE_POLL_SECONDS)
+        try:
+            items = {item["SK"]["S"]: item for item in query_pages(
+                TableName=DB_TABLE,
+                KeyConditionExpression="PK = :pk",
+                ExpressionAttributeValues={":pk": {"S": f"PLAN#{key}"}},
+                ConsistentRead=True
+            )}
+        except Exception as e:
+            print(f"Plan lease poll failed: {e}")
+            return None
+
+        plan, lease = items.get("PLAN"), items.get("LEASE")
+        if plan and int(plan["ttl"]["N"]) > time.time() and not lease:
+            tasks = [t["S"] for t in plan["tasks"]["L"]]
+            llm_ms = int(plan["llmMs"]["N"])
+            remember_plan(key, tasks, llm_ms, int(plan["ttl"]["N"]))
+            return tasks, llm_ms
+        if not lease or int(lease["ttl"]["N"]) <= time.time():
+            return None
+    return None
+
+def claim_plan(key):
+    # Returns (cached, lease): a plan produced by a concurrent identical request, or the lease to generate it ourselves
+    lease = acquire_plan_lease(key)
+    if lease:
+        return None, lease
+    return wait_for_plan(key), None
+
+def extract_tasks_bullets(text: str) -> list[str]:
+    parser = TaskLineParser()
+    tasks = parser.feed(text) + parser.finish()
+    if tasks or parser.markers:
+        return tasks
+
+    # No list markers at all: fall back to one task per non-empty line
+    return [task for task in map(parser.clean, text.split("\n")) if task]
+
+def call_huggingface(goal: str):
+    return complete(PROMPT.format(goal=goal))
+
+def call_huggingface_stream(goal: str):
+    # Same request as call_huggingface, but yields text chunks as the provider sends them
+    return complete_stream(PROMPT.format(goal=goal))
+
+# Bold/code markers are dropped before matching so "**1.** Do x" still reads as a numbered line
+EMPHASIS_RE = re.compile(r'\*\*|__|`')
+# Matched over whole blocks of lines at once (MULTILINE), so the scan for list lines stays in the regex engine
+TASK_LINE_RE = re.compile(r'^[ \t]*(?:[-*•→+]|(\d{1,2})([.)]))[ \t]+(.*)', re.MULTILINE)
+# A later item of an inline "1) Do x 2) Do y" list; only splits where the number continues the sequence with the same punctuation
+INLINE_ITEM_RE = re.compile(r'\s(\d{1,2})([.)])\s+(?=[A-Z])')
+MARKDOWN_RE = re.compile(r'[*#_`]+')
+# Trimmed from both ends of the near-duplicate key, so "Do x." and "do x" count as the same task
+KEY_PUNCTUATION = string.punctuation + "…“”‘’"
+MIN_TASK_LENGTH = 10
+
+class TaskLineParser:
+    # Turns a token stream into tasks, one per completed bullet or numbered line (or inline numbered item).
+    # Lines without a list marker (intros, sign-offs, headers) are skipped, and tasks that differ only in
+    # case, spacing or surrounding punctuation are kept once.
+    def __init__(self):
+        self.buffer = ""
+        self.seen = set()
+        self.markers = 0
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        end = self.buffer.rfind("\n")
+        if end < 0:
+            return []
+        lines, self.buffer = self.buffer[:end], self.buffer[end + 1:]
+        return self.parse(lines)
+
+    def finish(self):
+        lines, self.buffer = self.buffer, ""
+        return self.parse(lines)
+
+    def parse(self, lines):
+        if "**" in lines or "__" in lines or "`" in lines:
+            lines = EMPHASIS_RE.sub("", lines)
+        tasks = []
+        for match in TASK_LINE_RE.finditer(lines):
+            self.markers += 1
+            number, punct, text = match.groups()
+            if number and INLINE_ITEM_RE.search(text):
+                tasks.extend(filter(None, (self.clean(part) for part in split_inline(text, int(number), punct))))
+            else:
+                task = self.clean(text)
+                if task:
+                    tasks.append(task)
+        return tasks
+
+    def clean(self, text):
+        if "*" in text or "#" in text or "_" in text or "`" in text:
+            text = MARKDOWN_RE.sub("", text)
+        text = text.strip()
+        if len(text) < MIN_TASK_LENGTH:
+            return None
+        # Case, spacing and surrounding punctuation don't make a task distinct
+        key = "".join(text.lower().split()).strip(KEY_PUNCTUATION)
+        if key in self.seen:
+            return None
+        self.seen.add(key)
+        return text
+
+def split_inline(text, number, punct):
+    parts = []
+    start = 0
+    for match in INLINE_ITEM_RE.finditer(text):
+        if int(match.group(1)) == number + 1 and match.group(2) == punct:
+            parts.append(text[start:match.start()].strip())
+            start = match.end()
+            number += 1
+    parts.append(text[start:])
+    return parts
+
+def generate_plan(goal, regenerate=False, function="goalProcessor"):
+    # Returns (tasks, cached, llm_ms); "regenerate" skips the cache lookup and replaces the cached plan
+    cache_key = plan_cache_key(goal)
+    cached = None if regenerate else get_cached_plan(cache_key)
+    lease = None
+    if not cached:
+        cached, lease = claim_plan(cache_key)
+        if cached:
+            emit_metrics({"PlanCoalesced": (1, "Count")}, {"Function": function})
+    if cached:
+        tasks, llm_ms = cached
+        emit_metrics({"PlanCacheHit": (1, "Count"), "PlanCacheLatencySaved": (llm_ms, "Milliseconds")}, {"Function": function})
+        return tasks, True, llm_ms
+
+    try:
+        # Retries, backoff and provider failover happen inside call_huggingface
+        started = time.time()
+        ai_response = call_huggingface(goal)
+        llm_ms = int((time.time() - started) * 1000)
+
+        if LOG_MODEL_OUTPUT:
+            print("----RAW TEXT----")
+            print(repr(ai_response))
+            print("----------------")
+
+        tasks = extract_tasks_bullets(ai_response)
+        if tasks:
+            put_cached_plan(cache_key, tasks, llm_ms)
+    finally:
+        if lease:
+            release_plan_lease(cache_key, lease)
+    emit_metrics({"PlanCacheMiss": (1, "Count"), "LLMLatency": (llm_ms, "Milliseconds")}, {"Function": function})
+    return tasks, False, llm_ms
+
+def create_goal(user_id, goal, tasks):
+    # Writes the goal (with its counters) and all tasks in batched requests; returns the goal id and task payloads
+    # Fixed timespec, so the task payloads returned here match what GET /tasks returns later
+    created_at = datetime.utcnow().isoformat(timespec="microseconds")
+    goal_id = str(uuid.uuid4())
+    pk = user_pk(user_id)
+
+    items = [{
+        "PK": {"S": pk},
+        "SK": {"S": goal_sk(goal_id)},
+        "type": {"S": 'goal'},
+        "goalText": {"S": goal},
+        "createdAt": {"S": created_at},
+        "taskCount": {"N": str(len(tasks))},
+        "completedCount": {"N": '0'},
+        "totalTimeSpent": {"N": '0'}
+    }]
+
+    ordered_tasks = []
+    for i, (task_text, rank) in enumerate(zip(tasks, ranks_after(None, len(tasks)))):
+        task_id = str(uuid.uuid4())
+        items.append(task_item(pk, goal_id, task_id, task_text, rank, created_at))
+        ordered_tasks.append({
+            "taskId": task_id,
+            "taskText": task_text,
+            "order": 1000.0 * (i+1),
+            "rank": rank,
+            "completed": False,
+            "createdAt": created_at
+        })
+
+    batch_write([{"PutRequest": {"Item": item}} for item in items])
+    bump_versions(pk)
+    return goal_id, ordered_tasks
@@ -0,0 +1,142 @@
+# Fractional index keys for task ordering. A key is an integer part (a head
+# letter giving its length, then base-62 digits) followed by an optional
+# base-62 fraction with no trailing zero. Keys sort correctly as plain strings
+# and there is always room for a key between any two of them, so moving a task
+# only ever rewrites that task.
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+INTEGER_ZERO = "a0"
+# Inserting again and again between the same two neighbours grows the key by about a digit every six inserts;
+# past this length the goal's tasks are renumbered (common.request_rebalance)
+REBALANCE_LENGTH = 32
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+_DIGIT_INDEX = {d: i for i, d in enumerate(DIGITS)}
+
+def _integer_length(head):
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid rank head: {head}")
+
+def _integer_part(key):
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid rank: {key}")
+    return key[:length]
+
+def validate_rank(key):
+    if not isinstance(key, str) or not key or key == SMALLEST_INTEGER:
+        raise ValueError(f"Invalid rank: {key}")
+    integer = _integer_part(key)
+    fraction = key[len(integer):]
+    if any(c not in _DIGIT_INDEX for c in key[1:]) or fraction.endswith(DIGITS[0]):
+        raise ValueError(f"Invalid rank: {key}")
+
+def _midpoint(a, b):
+    # Fraction strictly between a and b (b=None means 1); neither may end in a zero digit
+    zero = DIGITS[0]
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else zero) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = _DIGIT_INDEX[a[0]] if a else 0
+    digit_b = _DIGIT_INDEX[b[0]] if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+def _increment_integer(x):
+    head, digits = x[0], list(x[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        d = _DIGIT_INDEX[digits[i]] + 1
+        if d < len(DIGITS):
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+def _decrement_integer(x):
+    head, digits = x[0], list(x[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        d = _DIGIT_INDEX[digits[i]] - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+def rank_between(a=None, b=None):
+    # Rank strictly between a and b; None means the start or end of the list
+    if a is not None:
+        validate_rank(a)
+    if b is not None:
+        validate_rank(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Ranks out of order: {a} >= {b}")
+
+    if a is None:
+        if b is None:
+            return INTEGER_ZERO
+        int_b = _integer_part(b)
+        frac_b = b[len(int_b):]
+        if int_b == SMALLEST_INTEGER:
+            return int_b + _midpoint("", frac_b)
+        if int_b < b:
+            return int_b
+        prev = _decrement_integer(int_b)
+        if prev is None:
+            raise ValueError("Cannot rank before the smallest key")
+        return prev
+
+    int_a = _integer_part(a)
+    frac_a = a[len(int_a):]
+    if b is None:
+        nxt = _increment_integer(int_a)
+        return int_a + _midpoint(frac_a, None) if nxt is None else nxt
+
+    int_b = _integer_part(b)
+    frac_b = b[len(int_b):]
+    if int_a == int_b:
+        return int_a + _midpoint(frac_a, frac_b)
+    nxt = _increment_integer(int_a)
+    if nxt is None:
+        raise ValueError("Cannot rank after the largest key")
+    if nxt < b:
+        return nxt
+    return int_a + _midpoint(frac_a, None)
+
+def ranks_after(a, n):
+    # n increasing ranks after a (or from the start), for appending or renumbering a whole list
+    ranks = []
+    for _ in range(n):
+        a = rank_between(a, None)
+        ranks.append(a)
+    return ranks
+
+def rank_sort_key(item):
+    # Items from before ranks existed have only a numeric order; they sort first until migrated
+    return (item.get("rank", {}).get("S", ""), float(item.get("order", {}).get("N", "0")))
@@ -0,0 +1,77 @@
+from common.clients import get_db, DB_TABLE
+from common.dynamo import query_pages
+from common.keys import task_sk, task_prefix, task_id_from_sk
+from common.ranks import ranks_after, rank_sort_key, REBALANCE_LENGTH
+from common.sync import sync_set
+from common.versions import bump_versions
+from common.jobs import enqueue
+
+TRANSACT_CHUNK_SIZE = 100
+
+def reindex_goal(pk, goal_id, task_ids=None):
+    # Renumbers the goal's tasks with short, evenly spaced ranks. task_ids (optional) go first in that order and the
+    # rest keep their relative order after them. Only tasks whose rank changes are written; returns how many were.
+    items = query_pages(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
+        ProjectionExpression="SK, #rank, #order",
+        ExpressionAttributeNames={
+            "#rank": "rank",
+            "#order": "order"
+        },
+        ExpressionAttributeValues={
+            ":pk": {"S": pk},
+            ":sk_prefix": {"S": task_prefix(goal_id)}
+        }
+    )
+
+    current = {}
+    by_order = []
+    for item in sorted(items, key=rank_sort_key):
+        task_id = task_id_from_sk(item['SK']['S'])
+        current[task_id] = item.get('rank', {}).get('S')
+        by_order.append(task_id)
+
+    if task_ids is not None:
+        if any(t not in current for t in task_ids) or len(set(task_ids)) != len(task_ids):
+            raise ValueError("taskIds must be unique ids of this goal's tasks")
+        listed = set(task_ids)
+        by_order = task_ids + [t for t in by_order if t not in listed]
+
+    sync_expr, sync_values = sync_set(pk, goal_id)
+    updates = []
+    for task_id, new_rank in zip(by_order, ranks_after(None, len(by_order))):
+        if current[task_id] == new_rank:
+            continue
+        updates.append({
+            "Update": {
+                "TableName": DB_TABLE,
+                "Key": {
+                    'PK': {'S': pk},
+                    'SK': {'S': task_sk(goal_id, task_id)}
+                },
+                "UpdateExpression": "SET #rank = :rank, " + sync_expr,
+                "ConditionExpression": "attribute_exists(SK)",
+                "ExpressionAttributeNames": {
+                    '#rank': 'rank'
+                },
+                "ExpressionAttributeValues": {
+                    ':rank': {'S': new_rank},
+                    **sync_values
+                }
+            }
+        })
+
+    for i in range(0, len(updates), TRANSACT_CHUNK_SIZE):
+        get_db().transact_write_items(TransactItems=updates[i:i+TRANSACT_CHUNK_SIZE])
+    if updates:
+        bump_versions(pk, goal_id)
+    return len(updates)
+
+def request_rebalance(user_id, goal_id, ranks):
+    # Keys grow with repeated inserts between the same neighbours; once one passes REBALANCE_LENGTH the goal is
+    # renumbered by goalWorker. Returns whether a rebalance was enqueued.
+    if not any(rank and len(rank) > REBALANCE_LENGTH for rank in ranks):
+        return False
+    enqueue({"kind": "reindexTasks", "userId": user_id, "goalId": goal_id})
+    return True
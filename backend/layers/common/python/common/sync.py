@@ -0,0 +1,72 @@
+import os
+import time
+
+from common.clients import DB_TABLE
+from common.dynamo import query_pages
+from common.keys import sync_key, tombstone_sk, task_id_from_sk, TOMBSTONE_PREFIX
+
+# Sparse GSI (partition syncKey, sort version) over task items and tombstones; items without syncKey stay out of it
+SYNC_INDEX = os.environ.get("TASK_SYNC_INDEX", "sync-index")
+TOMBSTONE_TTL = int(os.environ.get("TOMBSTONE_TTL_DAYS", "30")) * 86400
+# Cursors handed to clients trail the clock by this much, covering writes still in flight, clock skew between
+# containers and GSI propagation; anything in the overlap is simply sent twice
+SYNC_LAG_MS = int(os.environ.get("SYNC_LAG_MS", "5000"))
+
+def now_version():
+    return int(time.time() * 1000)
+
+def sync_cursor():
+    return now_version() - SYNC_LAG_MS
+
+def sync_attributes(pk, goal_id):
+    # For Put items; version is also the time of the write, in epoch milliseconds
+    return {
+        "syncKey": {"S": sync_key(pk, goal_id)},
+        "version": {"N": str(now_version())}
+    }
+
+def sync_set(pk, goal_id):
+    # SET clause and values for UpdateExpressions on task items
+    values = {
+        ":syncKey": {"S": sync_key(pk, goal_id)},
+        ":version": {"N": str(now_version())}
+    }
+    return "syncKey = :syncKey, version = :version", values
+
+def tombstone_put(pk, goal_id, task_id):
+    # TransactWriteItems entry recording a deleted task for delta sync until the TTL removes it
+    return {
+        "Put": {
+            "TableName": DB_TABLE,
+            "Item": {
+                "PK": {"S": pk},
+                "SK": {"S": tombstone_sk(goal_id, task_id)},
+                "type": {"S": 'tombstone'},
+                **sync_attributes(pk, goal_id),
+                "ttl": {"N": str(int(time.time()) + TOMBSTONE_TTL)}
+            }
+        }
+    }
+
+def changed_since(pk, goal_id, since):
+    # Returns (changed task items, deleted task ids) written after the since cursor. The index returns them in
+    # version order, so a later record for the same task replaces an earlier one.
+    changed = {}
+    deleted = set()
+    for item in query_pages(
+        TableName=DB_TABLE,
+        IndexName=SYNC_INDEX,
+        KeyConditionExpression="syncKey = :syncKey AND version > :since",
+        ExpressionAttributeValues={
+            ":syncKey": {"S": sync_key(pk, goal_id)},
+            ":since": {"N": str(since)}
+        }
+    ):
+        task_id = task_id_from_sk(item["SK"]["S"])
+        if item["SK"]["S"].startswith(TOMBSTONE_PREFIX):
+            changed.pop(task_id, None)
+            deleted.add(task_id)
+        else:
+            changed[task_id] = item
+            deleted.discard(task_id)
+    return list(changed.values()), sorted(deleted)
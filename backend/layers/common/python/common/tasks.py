@@ -0,0 +1,198 @@
+import os
+from datetime import datetime, timedelta
+
+from common.clients import get_db, DB_TABLE
+from common.keys import task_sk, sync_key
+from common.sync import sync_attributes
+
+# Task items are stored in a compact encoding: short attribute names, defaults left out and createdAt as epoch
+# microseconds, marked with the schema number. Items written before it use the long names. Every reader goes
+# through decode_task and the helpers below, which take each field from whichever name the item has, so both
+# kinds (and items half-converted by updates) read the same; migrateTaskSchema rewrites the old ones.
+# Schema 1 stored createdAt in milliseconds, which dropped the microseconds of the original timestamp.
+TASK_SCHEMA = 2
+SCHEMA_ATTRIBUTE = "s"
+
+# field -> (compact attribute, legacy attribute, DynamoDB type, default that compact items leave out)
+TASK_ATTRIBUTES = {
+    "taskText": ("tx", "taskText", "S", None),
+    "completed": ("c", "completed", "BOOL", False),
+    "createdAt": ("ca", "createdAt", "N", None),
+    "deadline": ("dl", "deadline", "S", ""),
+    "timeSpent": ("ts", "timeSpent", "N", 0)
+}
+
+# GSIs that return a goal's tasks in rank order: every ranked task (partition syncKey), and only the open ones
+# (partition openKey, which holds the same value as syncKey and is removed when the task is completed)
+RANK_INDEX = os.environ.get("TASK_RANK_INDEX", "rank-index")
+OPEN_INDEX = os.environ.get("TASK_OPEN_INDEX", "open-index")
+# GSI over all of a user's open tasks that have a deadline, by deadline: partition dueKey (the user's PK, removed
+# along with openKey) and sort key the compact deadline attribute, which tasks without a deadline don't have
+DUE_INDEX = os.environ.get("TASK_DUE_INDEX", "due-index")
+
+# Task attributes a client can change, with their DynamoDB types
+TASK_FIELDS = {name: TASK_ATTRIBUTES[name][2] for name in ("taskText", "deadline", "timeSpent", "completed")}
+TASK_FIELDS["rank"] = "S"
+
+EPOCH = datetime(1970, 1, 1)
+
+def epoch_us(created_at):
+    # createdAt strings are naive UTC ISO timestamps; integer arithmetic keeps every microsecond
+    return (datetime.fromisoformat(created_at) - EPOCH) // timedelta(microseconds=1)
+
+def iso_from_us(us):
+    # Always with six fraction digits: isoformat() drops the fraction on whole seconds
+    return (EPOCH + timedelta(microseconds=us)).isoformat(timespec="microseconds")
+
+def format_created_at(value):
+    # Legacy createdAt strings in the same fixed format; one that doesn't parse is returned as stored rather than
+    # failing the whole read
+    try:
+        return iso_from_us(epoch_us(value))
+    except (TypeError, ValueError):
+        return value
+
+def task_value(name, value):
+    kind = TASK_FIELDS[name]
+    return {kind: str(value) if kind == "N" else value}
+
+def encode_task(task):
+    # Compact attributes for a task given as {taskText, completed, createdAt, deadline, timeSpent}
+    item = {SCHEMA_ATTRIBUTE: {"N": str(TASK_SCHEMA)}}
+    for name, (short, _, kind, default) in TASK_ATTRIBUTES.items():
+        value = task.get(name, default)
+        if name == "createdAt":
+            value = epoch_us(value)
+        if value == default:
+            continue
+        item[short] = {kind: str(value) if kind == "N" else value}
+    return item
+
+def decode_task(item):
+    # {taskText, completed, createdAt, deadline, timeSpent, rank} from an item in either encoding
+    task = {}
+    for name, (short, legacy, kind, default) in TASK_ATTRIBUTES.items():
+        if short in item:
+            value = item[short][kind]
+            if name == "createdAt":
+                # Schema 1 items hold milliseconds
+                scale = 1000 if item.get(SCHEMA_ATTRIBUTE, {}).get("N") == "1" else 1
+                value = iso_from_us(int(value) * scale)
+        elif legacy in item:
+            (value,) = item[legacy].values()
+            if name == "createdAt":
+                value = format_created_at(value)
+        else:
+            task[name] = default
+            continue
+        if name == "createdAt":
+            task[name] = value
+        elif kind == "N":
+            task[name] = int(value)
+        else:
+            task[name] = value
+    task["rank"] = item.get("rank", {}).get("S")
+    return task
+
+def task_attribute_names(fields):
+    # Stored attribute names that hold the given fields, in both encodings, for ProjectionExpressions
+    names = []
+    for name in fields:
+        if name in TASK_ATTRIBUTES:
+            names.extend(TASK_ATTRIBUTES[name][:2])
+        else:
+            names.append(name)
+    return names
+
+def open_keys(pk, goal_id, completed=False):
+    # For Put items: the open-index and due-index keys, present only while the task is open
+    if completed:
+        return {}
+    return {"openKey": {"S": sync_key(pk, goal_id)}, "dueKey": {"S": pk}}
+
+def task_item(pk, goal_id, task_id, task_text, rank, created_at, deadline=""):
+    return {
+        "PK": {"S": pk},
+        "SK": {"S": task_sk(goal_id, task_id)},
+        **encode_task({"taskText": task_text, "createdAt": created_at, "deadline": deadline}),
+        "rank": {"S": rank},
+        **open_keys(pk, goal_id),
+        **sync_attributes(pk, goal_id)
+    }
+
+def task_update(changes, pk, goal_id):
+    # SET and REMOVE clauses, values and names for {field: new value}. Values are written under the compact
+    # name (or removed when they are the default) and the legacy attribute is always removed. Changing completed
+    # also sets or removes the open_keys.
+    sets = []
+    removes = []
+    values = {}
+    names = {}
+    for name, value in changes.items():
+        if name not in TASK_ATTRIBUTES:
+            sets.append(f"#{name} = :{name}")
+            values[f":{name}"] = task_value(name, value)
+            names[f"#{name}"] = name
+            continue
+        short, legacy, kind, default = TASK_ATTRIBUTES[name]
+        names[f"#{short}"] = short
+        names[f"#{legacy}"] = legacy
+        if value == default:
+            removes.append(f"#{short}")
+        else:
+            sets.append(f"#{short} = :{short}")
+            values[f":{short}"] = {kind: str(value) if kind == "N" else value}
+        removes.append(f"#{legacy}")
+    if "completed" in changes:
+        for name, value in open_keys(pk, goal_id).items():
+            names[f"#{name}"] = name
+            if changes["completed"]:
+                removes.append(f"#{name}")
+            else:
+                sets.append(f"#{name} = :{name}")
+                values[f":{name}"] = value
+    return sets, removes, values, names
+
+def update_expression(sets, removes=()):
+    expression = "SET " + ", ".join(sets) if sets else ""
+    if removes:
+        expression += " REMOVE " + ", ".join(removes)
+    return expression.strip()
+
+def task_condition(completed=None, time_spent=None):
+    # ConditionExpression (with its values and names) that the task exists and has the given completed/timeSpent,
+    # whichever encoding holds them. An item has each field under at most one of its names.
+    clauses = ["attribute_exists(SK)"]
+    values = {}
+    names = {}
+    if completed is not None:
+        short, legacy = TASK_ATTRIBUTES["completed"][:2]
+        names.update({f"#{short}": short, f"#{legacy}": legacy})
+        values[":isCompleted"] = {"BOOL": True}
+        is_completed = f"(#{short} = :isCompleted OR #{legacy} = :isCompleted)"
+        clauses.append(is_completed if completed else f"NOT {is_completed}")
+    if time_spent is not None:
+        short, legacy = TASK_ATTRIBUTES["timeSpent"][:2]
+        names.update({f"#{short}": short, f"#{legacy}": legacy})
+        values[":expectedTimeSpent"] = {"N": str(time_spent)}
+        if time_spent == 0:
+            clauses.append(f"(attribute_not_exists(#{short}) OR #{short} = :expectedTimeSpent)")
+            clauses.append(f"(attribute_not_exists(#{legacy}) OR #{legacy} = :expectedTimeSpent)")
+        else:
+            clauses.append(f"(#{short} = :expectedTimeSpent OR #{legacy} = :expectedTimeSpent)")
+    return " AND ".join(clauses), values, names
+
+def last_rank(pk, goal_id):
+    # The goal's highest rank from one item of the rank index, read backwards; tasks with only a legacy numeric
+    # order aren't in the index, and sort first anyway
+    page = get_db().query(
+        TableName=DB_TABLE,
+        IndexName=RANK_INDEX,
+        KeyConditionExpression="syncKey = :syncKey",
+        ExpressionAttributeValues={":syncKey": {"S": sync_key(pk, goal_id)}},
+        ProjectionExpression="#rank",
+        ExpressionAttributeNames={"#rank": "rank"},
+        ScanIndexForward=False,
+        Limit=1
+    )
+    return page["Items"][0]["rank"]["S"] if page["Items"] else None
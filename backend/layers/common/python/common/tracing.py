@@ -0,0 +1,104 @@
+import os
+import time
+import random
+import threading
+import functools
+from contextlib import contextmanager
+
+from common.metrics import emit_metrics
+
+# Share of warm invocations that are traced; above 0, cold starts are always traced too. 0 turns tracing off
+# entirely, cold starts included, leaving one attribute check per phase as the only cost.
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0.1"))
+
+# DynamoDB operations that accept ReturnConsumedCapacity
+CAPACITY_OPERATIONS = {
+    "GetItem", "PutItem", "UpdateItem", "DeleteItem", "Query", "Scan",
+    "BatchGetItem", "BatchWriteItem", "TransactGetItems", "TransactWriteItems"
+}
+
+class Trace:
+    # Per-invocation phase timings; phases recorded from worker threads add to the same totals
+    def __init__(self, function, cold):
+        self.function = function
+        self.cold = cold
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.counts = {}
+        self.capacity = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, name, ms):
+        with self.lock:
+            self.phases[name] = self.phases.get(name, 0.0) + ms
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def emit(self):
+        metrics = {"DurationMs": (round((time.perf_counter() - self.started) * 1000, 2), "Milliseconds"), "ColdStart": (int(self.cold), "Count")}
+        for name, ms in self.phases.items():
+            metrics[f"{name}Ms"] = (round(ms, 2), "Milliseconds")
+            metrics[f"{name}Calls"] = (self.counts[name], "Count")
+        if self.capacity:
+            metrics["DynamoDBCapacityUnits"] = (self.capacity, "Count")
+        emit_metrics(metrics, {"Function": self.function})
+
+_state = threading.local()
+_current = None
+_cold = True
+
+@contextmanager
+def phase(name):
+    # Times the block into the active trace's <name>Ms metric; a no-op outside a sampled invocation
+    trace = _current
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, (time.perf_counter() - started) * 1000)
+
+def traced(function):
+    # Wraps a Lambda handler so a sampled invocation emits one EMF line with its duration, phase timings,
+    # DynamoDB capacity and whether it was a cold start. Nested handlers (router -> route) trace only the outermost.
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            global _current, _cold
+            cold, _cold = _cold, False
+            if _current is not None or not TRACE_SAMPLE_RATE or not (cold or random.random() < TRACE_SAMPLE_RATE):
+                return handler(event, context)
+            _current = trace = Trace(function, cold)
+            try:
+                return handler(event, context)
+            finally:
+                _current = None
+                trace.emit()
+        return wrapper
+    return decorator
+
+def _before_call(params, model, **kwargs):
+    if _current is None:
+        return
+    if model.name in CAPACITY_OPERATIONS:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+    _state.started = time.perf_counter()
+
+def _after_call(parsed, model, **kwargs):
+    trace = _current
+    started = getattr(_state, "started", None)
+    if trace is None or started is None:
+        return
+    _state.started = None
+    trace.add("DynamoDB", (time.perf_counter() - started) * 1000)
+    consumed = parsed.get("ConsumedCapacity") if isinstance(parsed, dict) else None
+    if consumed:
+        units = sum(c.get("CapacityUnits", 0) for c in (consumed if isinstance(consumed, list) else [consumed]))
+        with trace.lock:
+            trace.capacity += units
+
+def instrument(client):
+    # Times every call made through a DynamoDB client and adds its consumed capacity, without touching call sites
+    client.meta.events.register("provide-client-params.dynamodb.*", _before_call)
+    client.meta.events.register("after-call.dynamodb.*", _after_call)
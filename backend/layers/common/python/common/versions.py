@@ -0,0 +1,67 @@
+from common.clients import get_db, DB_TABLE
+from common.keys import goal_sk
+from common.api import ENCODINGS, header, response, encoded_etag
+
+# Version counters behind the ETags on GET /tasks (per goal, on the GOAL# item) and GET /goals (per user, on this item).
+# Mutations bump them after their writes, so a version read before a query never runs ahead of the data it tags.
+USER_META_SK = "META#USER"
+
+def bump_versions(pk, goal_id=None):
+    db = get_db()
+    db.update_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": pk}, "SK": {"S": USER_META_SK}},
+        UpdateExpression="ADD version :one",
+        ExpressionAttributeValues={":one": {"N": "1"}}
+    )
+    if goal_id is None:
+        return
+    try:
+        db.update_item(
+            TableName=DB_TABLE,
+            Key={"PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}},
+            UpdateExpression="ADD version :one",
+            ConditionExpression="attribute_exists(SK)",
+            ExpressionAttributeValues={":one": {"N": "1"}}
+        )
+    except db.exceptions.ConditionalCheckFailedException:
+        # Goal deleted in the meantime; its task list is gone with it
+        pass
+
+def read_version(pk, sk):
+    # Returns None when the item doesn't exist
+    item = get_db().get_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": pk}, "SK": {"S": sk}},
+        ProjectionExpression="version",
+        ConsistentRead=True
+    ).get("Item")
+    if item is None:
+        return None
+    return int(item.get("version", {}).get("N", "0"))
+
+def make_etag(*parts):
+    return '"' + ":".join(str(p) for p in parts) + '"'
+
+def etag_matches(event, etag):
+    # Returns the tag from If-None-Match that is this version in any content-coding (the 304 echoes it back),
+    # or None when the client's copy is stale
+    value = header(event, "If-None-Match")
+    if not value:
+        return None
+    if value.strip() == "*":
+        return etag
+    variants = {etag} | {encoded_etag(etag, encoding) for encoding in ENCODINGS}
+    for tag in value.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag in variants:
+            return tag
+    return None
+
+def etag_headers(etag):
+    # no-cache makes the browser revalidate every time, sending If-None-Match on its own
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def not_modified(etag):
+    # 304s carry no body
+    return {**response(304, None, etag_headers(etag)), "body": ""}
@@ -0,0 +1,79 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "layers", "common", "python"))
+sys.path.insert(0, os.path.join(BACKEND, "tools"))
+
+os.environ["DB_TABLE"] = "test"
+os.environ["JOB_QUEUE_URL"] = "local"
+os.environ["TRACE_SAMPLE_RATE"] = "0"
+for name, value in (("AWS_ACCESS_KEY_ID", "testing"), ("AWS_SECRET_ACCESS_KEY", "testing"), ("AWS_DEFAULT_REGION", "us-east-2")):
+    os.environ[name] = value
+os.environ.pop("AWS_ENDPOINT_URL_DYNAMODB", None)
+
+
+@pytest.fixture
+def table():
+    # A fresh moto-backed table with the app's GSIs; the shared boto3 clients are rebuilt inside the mock
+    from moto import mock_aws
+    from common import clients, local_queue
+    from local_dynamo import ensure_table
+
+    with mock_aws():
+        clients._clients.clear()
+        local_queue.messages.clear()
+        ensure_table()
+        yield os.environ["DB_TABLE"]
+        clients._clients.clear()
+        local_queue.messages.clear()
+
+
+@pytest.fixture
+def seed_goal(table):
+    # Writes a goal with `count` tasks t0, t1, ... ranked ranks_after(None, count) and returns the user's PK;
+    # goal=False writes only the tasks, as left behind by a goal being deleted
+    from common import batch_write, user_pk, goal_sk, task_item, ranks_after
+
+    def seed(count=0, goal_id="goal", user_id="user", goal=True):
+        pk = user_pk(user_id)
+        items = [task_item(pk, goal_id, f"t{i}", f"Task number {i}", rank, "2026-10-18T12:00:00")
+                 for i, rank in enumerate(ranks_after(None, count))]
+        if goal:
+            items.insert(0, {
+                "PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}, "goalText": {"S": "Run a marathon"},
+                "createdAt": {"S": "2026-10-18T12:00:00"}, "taskCount": {"N": str(count)},
+                "completedCount": {"N": "0"}, "totalTimeSpent": {"N": "0"}
+            })
+        if items:
+            batch_write([{"PutRequest": {"Item": item}} for item in items])
+        return pk
+    return seed
+
+
+@pytest.fixture
+def load_handler():
+    # Loads backend/lambdas/<name>/lambda_function.py as its own module and returns its lambda_handler
+    def load(name):
+        spec = importlib.util.spec_from_file_location(f"{name}_lambda_function", os.path.join(BACKEND, "lambdas", name, "lambda_function.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.lambda_handler
+    return load
+
+
+@pytest.fixture
+def api_event():
+    # API Gateway v2 event for an authenticated user
+    def build(user_id, params=None, body=None, headers=None):
+        return {
+            "headers": headers or {},
+            "queryStringParameters": params,
+            "body": json.dumps(body) if body is not None else None,
+            "requestContext": {"authorizer": {"jwt": {"claims": {"sub": user_id}}}}
+        }
+    return build
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from common import DB_TABLE, query_pages, task_prefix, task_id_from_sk, ranks_after
+
+
+def ranked_ids(pk):
+    items = list(query_pages(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk AND begins_with(SK, :sk)",
+        ExpressionAttributeValues={":pk": {"S": pk}, ":sk": {"S": task_prefix("goal")}}
+    ))
+    ranks = [item["rank"]["S"] for item in items]
+    assert len(set(ranks)) == len(ranks), "duplicate ranks"
+    return [task_id_from_sk(item["SK"]["S"]) for item in sorted(items, key=lambda i: i["rank"]["S"])]
+
+
+@pytest.mark.parametrize("mode", ["transaction", "bestEffort"])
+def test_add_after_reorder_to_end_gets_a_later_rank(seed_goal, load_handler, api_event, mode):
+    batch = load_handler("batchTasks")
+    pk = seed_goal(3)
+    ranks = ranks_after(None, 3)
+    # t0 moves past the stored end first, so the adds must land after its new rank rather than collide with it
+    result = batch(api_event("user", {"goalId": "goal"}, {"mode": mode, "operations": [
+        {"op": "reorder", "taskId": "t0", "prevRank": ranks[-1]},
+        {"op": "add", "taskText": "First added task"},
+        {"op": "add", "taskText": "Second added task"}
+    ]}), None)
+    assert result["statusCode"] == 200
+    results = json.loads(result["body"])["results"]
+    moved, first, second = (r["rank"] for r in results)
+    assert ranks[-1] < moved < first < second
+    assert ranked_ids(pk) == ["t1", "t2", "t0", results[1]["taskId"], results[2]["taskId"]]
+
+
+def test_adds_to_an_empty_goal(seed_goal, load_handler, api_event):
+    batch = load_handler("batchTasks")
+    pk = seed_goal()
+    result = batch(api_event("user", {"goalId": "goal"}, {"operations": [
+        {"op": "add", "taskText": "First added task"},
+        {"op": "add", "taskText": "Second added task"}
+    ]}), None)
+    assert result["statusCode"] == 200
+    assert [r["rank"] for r in json.loads(result["body"])["results"]] == ranks_after(None, 2)
+    assert len(ranked_ids(pk)) == 2
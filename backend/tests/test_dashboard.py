@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from common import get_db, DB_TABLE, goal_sk, task_item, goal_progress
+from common.jobs import job_sk
+
+NOW = "2026-10-18T12:00"
+
+
+@pytest.fixture
+def dashboard(seed_goal, load_handler, api_event):
+    # "goal": t0..t3 with t0 completed, t1 overdue, t2 due later and 90s spent on t3.
+    # "trip": t0..t1 with t1 completed and 30s spent on it.
+    # "old": being deleted. Around them sit a job, a tombstone, an orphaned task, the META item and another user's goal.
+    pk = seed_goal(4)
+    seed_goal(2, goal_id="trip")
+    seed_goal(1, goal_id="old")
+    seed_goal(3, user_id="other")
+
+    mark = load_handler("markTask")
+    edit = load_handler("editTask")
+    for goal_id, task_id, handler, body in [
+        ("goal", "t0", mark, {"completed": True}),
+        ("goal", "t1", edit, {"deadline": "2026-10-17T18:00"}),
+        ("goal", "t2", edit, {"deadline": "2026-10-30T09:00"}),
+        ("goal", "t3", edit, {"timeSpent": 90}),
+        ("trip", "t1", mark, {"completed": True}),
+        ("trip", "t1", edit, {"timeSpent": 30, "deadline": "2026-10-01T09:00"})
+    ]:
+        result = handler(api_event("user", {"goalId": goal_id}, {"taskId": task_id, **body}), None)
+        assert result["statusCode"] == 200, result
+
+    # Deleting a task leaves a tombstone (and bumps META#USER); the deleted task itself is no longer counted
+    add = load_handler("addTask")
+    added = json.loads(add(api_event("user", {"goalId": "goal"}, {"taskText": "Short-lived"}), None)["body"])["taskId"]
+    assert load_handler("deleteTask")(api_event("user", {"goalId": "goal"}, {"taskId": added}), None)["statusCode"] == 200
+
+    db = get_db()
+    db.put_item(TableName=DB_TABLE, Item={"PK": {"S": pk}, "SK": {"S": job_sk("job-1")}, "status": {"S": "queued"}})
+    db.put_item(TableName=DB_TABLE, Item=task_item(pk, "gone", "t0", "Task of a goal that no longer exists", "a0", "2026-10-18T12:00:00"))
+    db.update_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": pk}, "SK": {"S": goal_sk("old")}},
+        UpdateExpression="SET deletingAt = :now",
+        ExpressionAttributeValues={":now": {"S": "2026-10-18T12:00:00"}}
+    )
+    return load_handler("getDashboard")
+
+
+def get(handler, api_event, **params):
+    result = handler(api_event("user", {"now": NOW, **params}), None)
+    assert result["statusCode"] == 200, result
+    return json.loads(result["body"])
+
+
+def test_counts_per_goal_and_totals(dashboard, api_event):
+    body = get(dashboard, api_event)
+
+    counts = {g["goalId"]: {k: g[k] for k in ("total", "completed", "overdue", "timeSpent")} for g in body["goals"]}
+    assert counts == {
+        "goal": {"total": 4, "completed": 1, "overdue": 1, "timeSpent": 90},
+        # A completed task is never overdue
+        "trip": {"total": 2, "completed": 1, "overdue": 0, "timeSpent": 30}
+    }
+    assert body["totals"] == {"goals": 2, "total": 6, "completed": 2, "overdue": 1, "timeSpent": 120}
+    assert all("tasks" not in g for g in body["goals"])
+
+
+def test_overdue_is_relative_to_the_clients_now(dashboard, api_event):
+    assert get(dashboard, api_event, now="2026-11-01T00:00")["totals"]["overdue"] == 2
+    assert get(dashboard, api_event, now="2026-10-01T00:00")["totals"]["overdue"] == 0
+
+
+def test_include_tasks_lists_them_in_rank_order(dashboard, api_event):
+    goals = {g["goalId"]: g for g in get(dashboard, api_event, include="tasks")["goals"]}
+
+    assert [t["taskId"] for t in goals["goal"]["tasks"]] == ["t0", "t1", "t2", "t3"]
+    assert goals["goal"]["tasks"][1]["deadline"] == "2026-10-17T18:00"
+    assert goals["trip"]["tasks"][1]["completed"] is True
+    assert goals["goal"]["total"] == 4
+
+
+def test_empty_dashboard(table, load_handler, api_event):
+    assert get(load_handler("getDashboard"), api_event)["totals"] == {"goals": 0, "total": 0, "completed": 0, "overdue": 0, "timeSpent": 0}
+
+
+def stored_counters(pk, goal_id):
+    item = get_db().get_item(TableName=DB_TABLE, Key={"PK": {"S": pk}, "SK": {"S": goal_sk(goal_id)}})["Item"]
+    return goal_progress(item)
+
+
+def test_repair_recomputes_drifted_counters(seed_goal, load_handler, api_event):
+    pk = seed_goal(3)
+    seed_goal(2, goal_id="trip")
+    seed_goal(1, user_id="other")
+    mark = load_handler("markTask")
+    assert mark(api_event("user", {"goalId": "goal"}, {"taskId": "t1", "completed": True}), None)["statusCode"] == 200
+    expected = stored_counters(pk, "goal")
+
+    # One goal's counters drift and the other predates counters altogether
+    db = get_db()
+    db.update_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": pk}, "SK": {"S": goal_sk("goal")}},
+        UpdateExpression="SET taskCount = :n, completedCount = :n",
+        ExpressionAttributeValues={":n": {"N": "9"}}
+    )
+    db.update_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": pk}, "SK": {"S": goal_sk("trip")}},
+        UpdateExpression="REMOVE taskCount, completedCount, totalTimeSpent"
+    )
+    repair = load_handler("repairGoalCounters")
+
+    check = repair({"mode": "check", "userId": "user"}, None)
+    assert (check["checked"], check["inconsistent"], check["repaired"]) == (2, 2, 0)
+    reported = {g["goalId"]: g for g in check["goals"]}
+    assert reported["goal"]["diff"] == {
+        "taskCount": {"stored": 9, "expected": 3},
+        "completedCount": {"stored": 9, "expected": 1}
+    }
+    assert reported["trip"]["missing"] == ["taskCount", "completedCount", "totalTimeSpent"]
+    # Check mode writes nothing
+    assert stored_counters(pk, "goal")["taskCount"] == 9
+
+    result = repair({"mode": "repair", "userId": "user"}, None)
+    assert (result["inconsistent"], result["repaired"]) == (2, 2)
+    assert stored_counters(pk, "goal") == expected
+    assert stored_counters(pk, "trip")["taskCount"] == 2
+    assert repair({"mode": "check"}, None)["inconsistent"] == 0
+
+
+def test_repair_rejects_unknown_mode(table, load_handler):
+    assert "error" in load_handler("repairGoalCounters")({"mode": "fix"}, None)
@@ -0,0 +1,60 @@
+import json
+
+from common import jobs, get_db, DB_TABLE, local_queue, goal_sk
+
+
+class Context:
+    # Lambda context whose remaining time drops below the deletion margin after `calls` checks
+    def __init__(self, calls):
+        self.calls = calls
+
+    def get_remaining_time_in_millis(self):
+        self.calls -= 1
+        return 60000 if self.calls >= 0 else 0
+
+
+def items(pk):
+    return get_db().query(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk",
+        ExpressionAttributeValues={":pk": {"S": pk}}
+    )["Items"]
+
+
+def metric_lines(out):
+    return [json.loads(line) for line in out.splitlines() if "GoalTasksDeleted" in line]
+
+
+def test_delete_hands_off_and_reports_metrics(seed_goal, load_handler, api_event, capsys):
+    delete = load_handler("deleteGoal")
+    worker = load_handler("goalWorker")
+    pk = seed_goal(60)
+
+    result = delete(api_event("user", {"goalId": "goal"}), Context(calls=1))
+    assert result["statusCode"] == 202
+    body = json.loads(result["body"])
+    assert body["deleted"] > 0 and body["remaining"] > 0
+    assert json.loads(local_queue.messages[0]) == {"kind": "deleteGoal", "userId": "user", "goalId": "goal"}
+
+    local_queue.drain(worker)
+    assert not [i for i in items(pk) if i["SK"]["S"].startswith(("GOAL#", "TASK#"))]
+
+    out = capsys.readouterr().out
+    assert "Deleted " not in out
+    handler_line, worker_line = metric_lines(out)
+    assert handler_line["Function"] == "deleteGoal" and handler_line["GoalDeleteHandedOff"] == 1
+    assert handler_line["GoalTasksDeleted"] == body["deleted"] and handler_line["GoalTasksRemaining"] == body["remaining"]
+    assert worker_line["Function"] == "goalWorker" and worker_line["GoalTasksRemaining"] == 0
+    assert handler_line["GoalTasksDeleted"] + worker_line["GoalTasksDeleted"] == 60
+
+
+def test_delete_without_queue_fails_before_hiding_goal(seed_goal, load_handler, api_event, monkeypatch):
+    delete = load_handler("deleteGoal")
+    pk = seed_goal(3)
+    monkeypatch.setattr(jobs, "JOB_QUEUE_URL", None)
+
+    result = delete(api_event("user", {"goalId": "goal"}), Context(calls=100))
+    assert result["statusCode"] == 500
+    goal = get_db().get_item(TableName=DB_TABLE, Key={"PK": {"S": pk}, "SK": {"S": goal_sk("goal")}})["Item"]
+    assert "deletingAt" not in goal
+    assert len(items(pk)) == 4
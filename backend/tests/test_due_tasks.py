@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from common import get_db, DB_TABLE, user_pk, goal_sk, encode_token
+
+NOW = "2026-10-18T12:00"
+
+
+@pytest.fixture
+def due(seed_goal, load_handler, api_event):
+    # Two goals; "goal" has t0..t3 and "trip" has t0..t1, with deadlines on some of them
+    seed_goal(4)
+    seed_goal(2, goal_id="trip")
+    edit = load_handler("editTask")
+    deadlines = {
+        ("goal", "t0"): "2026-10-20T09:00",
+        ("goal", "t1"): "2026-10-17T18:00",
+        ("goal", "t3"): "2026-11-30T09:00",
+        ("trip", "t1"): "2026-10-18T11:30"
+    }
+    for (goal_id, task_id), deadline in deadlines.items():
+        result = edit(api_event("user", {"goalId": goal_id}, {"taskId": task_id, "deadline": deadline}), None)
+        assert result["statusCode"] == 200
+    return load_handler("getDueTasks")
+
+
+def get(handler, api_event, user_id="user", **params):
+    result = handler(api_event(user_id, {"now": NOW, **params}), None)
+    assert result["statusCode"] == 200, result
+    return json.loads(result["body"])
+
+
+def due_ids(body):
+    return [(t["goalId"], t["taskId"]) for t in body["tasks"]]
+
+
+def test_due_tasks_across_goals_soonest_first(due, api_event):
+    body = get(due, api_event, before="2026-10-21T00:00")
+
+    # Tasks without a deadline and those due after before are left out
+    assert due_ids(body) == [("goal", "t1"), ("trip", "t1"), ("goal", "t0")]
+    assert [t["overdue"] for t in body["tasks"]] == [True, True, False]
+    assert body["tasks"][0] == {
+        "taskId": "t1",
+        "goalId": "goal",
+        "goalText": "Run a marathon",
+        "taskText": "Task number 1",
+        "createdAt": "2026-10-18T12:00:00.000000",
+        "rank": body["tasks"][0]["rank"],
+        "deadline": "2026-10-17T18:00",
+        "timeSpent": 0,
+        "overdue": True
+    }
+    assert body["nextToken"] is None
+
+
+def test_overdue_is_relative_to_the_clients_now(due, api_event):
+    body = get(due, api_event, before="2026-10-21T00:00", now="2026-10-17T00:00")
+    assert [t["overdue"] for t in body["tasks"]] == [False, False, False]
+
+
+def test_completed_tasks_leave_the_due_list_and_return_when_reopened(due, load_handler, api_event):
+    mark = load_handler("markTask")
+    assert mark(api_event("user", {"goalId": "goal"}, {"taskId": "t1", "completed": True}), None)["statusCode"] == 200
+    assert due_ids(get(due, api_event, before="2026-10-21T00:00")) == [("trip", "t1"), ("goal", "t0")]
+
+    assert mark(api_event("user", {"goalId": "goal"}, {"taskId": "t1", "completed": False}), None)["statusCode"] == 200
+    assert due_ids(get(due, api_event, before="2026-10-21T00:00")) == [("goal", "t1"), ("trip", "t1"), ("goal", "t0")]
+
+
+def test_changed_and_cleared_deadlines_move_the_task(due, load_handler, api_event):
+    edit = load_handler("editTask")
+    edit(api_event("user", {"goalId": "goal"}, {"taskId": "t3", "deadline": "2026-10-19T08:00"}), None)
+    edit(api_event("user", {"goalId": "goal"}, {"taskId": "t1", "deadline": ""}), None)
+
+    assert due_ids(get(due, api_event, before="2026-10-21T00:00")) == [("trip", "t1"), ("goal", "t3"), ("goal", "t0")]
+
+
+def test_tasks_of_goals_being_deleted_are_dropped(due, api_event):
+    get_db().update_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": user_pk("user")}, "SK": {"S": goal_sk("trip")}},
+        UpdateExpression="SET deletingAt = :now",
+        ExpressionAttributeValues={":now": {"S": "2026-10-18T12:00:00"}}
+    )
+    assert due_ids(get(due, api_event, before="2026-10-21T00:00")) == [("goal", "t1"), ("goal", "t0")]
+
+
+def test_pages_follow_next_token(due, api_event):
+    first = get(due, api_event, before="2027-01-01T00:00", limit="3")
+    assert due_ids(first) == [("goal", "t1"), ("trip", "t1"), ("goal", "t0")]
+    assert first["nextToken"]
+
+    second = get(due, api_event, before="2027-01-01T00:00", limit="3", nextToken=first["nextToken"])
+    assert due_ids(second) == [("goal", "t3")]
+    assert second["nextToken"] is None
+
+
+def test_only_the_callers_tasks(due, api_event):
+    assert get(due, api_event, user_id="other", before="2027-01-01T00:00")["tasks"] == []
+
+
+def test_bad_requests(due, api_event):
+    assert due(api_event("user", {}), None)["statusCode"] == 400
+    assert due(api_event("user", {"before": "2027-01-01T00:00", "limit": "0"}), None)["statusCode"] == 400
+    foreign = encode_token({"PK": {"S": user_pk("other")}, "SK": {"S": "TASK#goal#t0"}})
+    assert due(api_event("user", {"before": "2027-01-01T00:00", "nextToken": foreign}), None)["statusCode"] == 400
@@ -0,0 +1,33 @@
+import json
+
+from common import get_db, DB_TABLE, task_sk, decode_task
+
+
+def get_task(pk):
+    return get_db().get_item(TableName=DB_TABLE, Key={"PK": {"S": pk}, "SK": {"S": task_sk("goal", "t0")}}).get("Item")
+
+
+def test_edit_text(seed_goal, load_handler, api_event):
+    edit = load_handler("editTask")
+    pk = seed_goal(1)
+    result = edit(api_event("user", {"goalId": "goal"}, {"taskId": "t0", "taskText": "Write the final report"}), None)
+    assert result["statusCode"] == 200
+    assert decode_task(get_task(pk))["taskText"] == "Write the final report"
+
+
+def test_edit_missing_task_is_404_and_writes_nothing(seed_goal, load_handler, api_event):
+    edit = load_handler("editTask")
+    pk = seed_goal()
+    for body in ({"taskId": "t0", "taskText": "Write the final report"}, {"taskId": "t0", "deadline": "2026-11-01T09:00"}):
+        result = edit(api_event("user", {"goalId": "goal"}, body), None)
+        assert result["statusCode"] == 404
+        assert json.loads(result["body"]) == {"error": "Task not found"}
+        assert get_task(pk) is None
+
+
+def test_edit_time_spent_of_missing_task_is_404(seed_goal, load_handler, api_event):
+    edit = load_handler("editTask")
+    pk = seed_goal()
+    result = edit(api_event("user", {"goalId": "goal"}, {"taskId": "t0", "timeSpent": 5}), None)
+    assert result["statusCode"] == 404
+    assert get_task(pk) is None
@@ -0,0 +1,58 @@
+import base64
+import gzip
+import json
+
+from common import bump_versions
+
+
+def get(handler, api_event, **headers):
+    return handler(api_event("user", {"goalId": "goal"}, headers=headers), None)
+
+
+def test_each_encoding_has_its_own_etag(seed_goal, load_handler, api_event):
+    get_tasks = load_handler("getTasks")
+    bump_versions(seed_goal(40), "goal")
+
+    plain = get(get_tasks, api_event)
+    zipped = get(get_tasks, api_event, **{"accept-encoding": "gzip"})
+    assert zipped["headers"]["Content-Encoding"] == "gzip"
+    assert plain["headers"]["ETag"] != zipped["headers"]["ETag"]
+    assert zipped["headers"]["ETag"] == plain["headers"]["ETag"][:-1] + '-gzip"'
+    assert json.loads(gzip.decompress(base64.b64decode(zipped["body"])))["tasks"] == json.loads(plain["body"])["tasks"]
+
+
+def test_if_none_match_accepts_either_encoding_and_echoes_it(seed_goal, load_handler, api_event):
+    get_tasks = load_handler("getTasks")
+    bump_versions(seed_goal(40), "goal")
+    plain_tag = get(get_tasks, api_event)["headers"]["ETag"]
+    gzip_tag = get(get_tasks, api_event, **{"accept-encoding": "gzip"})["headers"]["ETag"]
+
+    for tag in (plain_tag, gzip_tag, f"W/{gzip_tag}"):
+        result = get(get_tasks, api_event, **{"accept-encoding": "gzip", "if-none-match": tag})
+        assert result["statusCode"] == 304
+        assert result["headers"]["ETag"] == tag.removeprefix("W/")
+        assert result["body"] == ""
+
+    # Another version's gzip tag doesn't match
+    result = get(get_tasks, api_event, **{"accept-encoding": "gzip", "if-none-match": gzip_tag.replace(":", ":9", 1)})
+    assert result["statusCode"] == 200
+
+
+def test_new_version_invalidates_both_tags(seed_goal, load_handler, api_event):
+    get_tasks = load_handler("getTasks")
+    pk = seed_goal(40)
+    bump_versions(pk, "goal")
+    plain_tag = get(get_tasks, api_event)["headers"]["ETag"]
+    gzip_tag = get(get_tasks, api_event, **{"accept-encoding": "gzip"})["headers"]["ETag"]
+    bump_versions(pk, "goal")
+    for tag in (plain_tag, gzip_tag):
+        assert get(get_tasks, api_event, **{"accept-encoding": "gzip", "if-none-match": tag})["statusCode"] == 200
+
+
+def test_small_goal_list_is_uncompressed_with_plain_etag(seed_goal, load_handler, api_event):
+    get_goals = load_handler("getUserGoals")
+    bump_versions(seed_goal(1), "goal")
+    result = get(get_goals, api_event, **{"accept-encoding": "gzip"})
+    assert "Content-Encoding" not in result["headers"]
+    assert not result["headers"]["ETag"].endswith('-gzip"')
+    assert get(get_goals, api_event, **{"if-none-match": result["headers"]["ETag"]})["statusCode"] == 304
@@ -0,0 +1,63 @@
+import base64
+import json
+
+import pytest
+
+from common import encode_token
+
+
+@pytest.fixture
+def tasks(seed_goal, load_handler, api_event):
+    # Seven tasks in rank order t0..t6, with t1 and t4 completed
+    seed_goal(7)
+    mark = load_handler("markTask")
+    for task_id in ("t1", "t4"):
+        assert mark(api_event("user", {"goalId": "goal"}, {"taskId": task_id, "completed": True}), None)["statusCode"] == 200
+    return load_handler("getTasks")
+
+
+def get(handler, api_event, **params):
+    result = handler(api_event("user", {"goalId": "goal", **params}), None)
+    assert result["statusCode"] == 200
+    return json.loads(result["body"])
+
+
+def all_pages(handler, api_event, **params):
+    tasks = []
+    token = None
+    while True:
+        body = get(handler, api_event, **params, **({"nextToken": token} if token else {}))
+        tasks += body["tasks"]
+        token = body["nextToken"]
+        if not token:
+            return tasks
+
+
+def test_pages_have_the_same_fields_and_order_as_the_full_list(tasks, api_event):
+    full = get(tasks, api_event)["tasks"]
+    paged = all_pages(tasks, api_event, limit="3")
+    assert paged == full
+    assert [t["order"] for t in paged] == [1000.0 * (i + 1) for i in range(7)]
+
+
+@pytest.mark.parametrize("status, expected", [("open", ["t0", "t2", "t3", "t5", "t6"]), ("done", ["t1", "t4"])])
+def test_filtered_pages_number_their_own_order(tasks, api_event, status, expected):
+    paged = all_pages(tasks, api_event, status=status, limit="2")
+    assert [t["taskId"] for t in paged] == expected
+    assert [t["order"] for t in paged] == [1000.0 * (i + 1) for i in range(len(expected))]
+    assert all(set(t) == {"taskId", "taskText", "createdAt", "rank", "completed", "deadline", "timeSpent", "order"} for t in paged)
+
+
+def test_projected_pages_keep_order(tasks, api_event):
+    paged = all_pages(tasks, api_event, limit="4", fields="completed")
+    assert [set(t) for t in paged] == [{"taskId", "completed", "order"}] * 7
+    assert [t["order"] for t in paged] == [1000.0 * (i + 1) for i in range(7)]
+
+
+def test_token_without_offset_still_pages(tasks, api_event):
+    first = get(tasks, api_event, limit="3")
+    key = json.loads(base64.urlsafe_b64decode(first["nextToken"]))
+    del key["offset"]
+    body = get(tasks, api_event, limit="3", nextToken=encode_token(key))
+    assert [t["taskId"] for t in body["tasks"]] == ["t3", "t4", "t5"]
+    assert body["tasks"][0]["order"] == 1000.0
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from common import get_db, DB_TABLE, user_pk, idempotent, response, error
+from common.idempotency import idempotency_pk
+
+
+def partition(pk):
+    return get_db().query(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk",
+        ExpressionAttributeValues={":pk": {"S": pk}}
+    )["Items"]
+
+
+def keyed(api_event, body, key="key-1"):
+    return api_event("user", {"goalId": "goal"}, body, {"Idempotency-Key": key})
+
+
+def test_replay_returns_stored_response_without_running_again(seed_goal, load_handler, api_event):
+    add = load_handler("addTask")
+    seed_goal()
+    first = add(keyed(api_event, {"taskText": "Write the report"}), None)
+    replay = add(keyed(api_event, {"taskText": "Write the report"}), None)
+
+    assert first["statusCode"] == replay["statusCode"] == 200
+    assert json.loads(replay["body"]) == json.loads(first["body"])
+    assert replay["headers"]["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.get("headers", {})
+    tasks = [item for item in partition(user_pk("user")) if item["SK"]["S"].startswith("TASK#")]
+    assert len(tasks) == 1
+
+    # A new key is a new request
+    assert add(keyed(api_event, {"taskText": "Write the report"}, "key-2"), None)["statusCode"] == 200
+    assert len([item for item in partition(user_pk("user")) if item["SK"]["S"].startswith("TASK#")]) == 2
+
+
+def test_records_are_kept_out_of_the_user_partition(seed_goal, load_handler, api_event):
+    seed_goal()
+    load_handler("addTask")(keyed(api_event, {"taskText": "Write the report"}), None)
+
+    assert not any("response" in item for item in partition(user_pk("user")))
+    records = partition(idempotency_pk("user"))
+    assert len(records) == 1
+    assert records[0]["status"]["S"] == "completed" and "ttl" in records[0]
+
+
+def test_same_key_with_different_request_is_422(seed_goal, load_handler, api_event):
+    add = load_handler("addTask")
+    seed_goal()
+    add(keyed(api_event, {"taskText": "Write the report"}), None)
+    result = add(keyed(api_event, {"taskText": "Something else entirely"}), None)
+    assert result["statusCode"] == 422
+
+
+def test_duplicate_while_in_flight_is_409(table, api_event):
+    # The handler receives the duplicate while the first request is still running
+    seen = []
+
+    @idempotent
+    def handler(event, context):
+        if not seen:
+            seen.append(handler(event, context))
+        return response(200, {"ran": len(seen)})
+
+    first = handler(keyed(api_event, {"taskText": "Write the report"}), None)
+    assert seen[0]["statusCode"] == 409
+    assert first["statusCode"] == 200
+    assert handler(keyed(api_event, {"taskText": "Write the report"}), None)["headers"]["Idempotent-Replayed"] == "true"
+
+
+def test_server_error_deletes_the_record_so_a_retry_runs(table, api_event):
+    outcomes = [error(500, "DynamoDB throttled"), RuntimeError("crashed"), response(200, {"ok": True})]
+    calls = []
+
+    @idempotent
+    def handler(event, context):
+        calls.append(1)
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    event = keyed(api_event, {"taskText": "Write the report"})
+    assert handler(event, None)["statusCode"] == 500
+    assert partition(idempotency_pk("user")) == []
+    with pytest.raises(RuntimeError):
+        handler(event, None)
+    assert partition(idempotency_pk("user")) == []
+    assert handler(event, None)["statusCode"] == 200
+    assert "Idempotent-Replayed" in handler(event, None)["headers"]
+    assert len(calls) == 3
+
+
+def test_client_errors_are_stored_and_replayed(seed_goal, load_handler, api_event):
+    add = load_handler("addTask")
+    # No goal item: a 404, which a retry should get back rather than re-run
+    first = add(keyed(api_event, {"taskText": "Write the report"}), None)
+    seed_goal()
+    replay = add(keyed(api_event, {"taskText": "Write the report"}), None)
+    assert first["statusCode"] == replay["statusCode"] == 404
+    assert replay["headers"]["Idempotent-Replayed"] == "true"
@@ -0,0 +1,157 @@
+import sys
+import types
+
+import pytest
+
+from common import inference
+from common.inference import CircuitBreaker, call_with_failover, ProvidersUnavailable
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(inference.time, "time", c)
+    return c
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    # Three providers with fake clients; backoff sleeps are skipped
+    monkeypatch.setattr(inference, "PROVIDERS", [("a", "model-a"), ("b", "model-b"), ("c", "model-c")])
+    monkeypatch.setattr(inference, "HF_ATTEMPTS", 2)
+    monkeypatch.setattr(inference, "backoff", lambda attempt: 0)
+    monkeypatch.setattr(inference, "inference_client", lambda provider: provider)
+    monkeypatch.setattr(inference, "_breakers", {})
+
+
+def scripted(outcomes):
+    # call(client, model) that records each call and raises or returns the next outcome for that provider
+    calls = []
+
+    def call(client, model):
+        calls.append(client)
+        outcome = outcomes[client].pop(0) if outcomes.get(client) else TimeoutError(f"{client} timed out")
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return call, calls
+
+
+def test_client_is_built_with_timeout_and_reused(monkeypatch):
+    built = []
+
+    class InferenceClient:
+        def __init__(self, **kwargs):
+            built.append(kwargs)
+
+    monkeypatch.setitem(sys.modules, "huggingface_hub", types.SimpleNamespace(InferenceClient=InferenceClient))
+    monkeypatch.setattr(inference, "_clients", {})
+    first = inference.inference_client("novita")
+    assert inference.inference_client("novita") is first
+    assert built == [{"provider": "novita", "api_key": inference.HF_API_KEY, "timeout": inference.HF_TIMEOUT}]
+
+
+def test_timeout_retries_then_fails_over(providers):
+    call, calls = scripted({"a": [TimeoutError("read timed out"), TimeoutError("read timed out")], "b": ["plan"]})
+    assert call_with_failover(call) == "plan"
+    assert calls == ["a", "a", "b"]
+
+
+def test_retry_succeeds_on_same_provider(providers):
+    call, calls = scripted({"a": [TimeoutError("read timed out"), "plan"]})
+    assert call_with_failover(call) == "plan"
+    assert calls == ["a", "a"]
+
+
+def test_failover_order_and_last_error(providers):
+    call, calls = scripted({})
+    with pytest.raises(TimeoutError, match="c timed out"):
+        call_with_failover(call)
+    assert calls == ["a", "a", "b", "b", "c", "c"]
+
+
+def test_open_breaker_skips_provider(providers, clock, monkeypatch):
+    monkeypatch.setattr(inference, "PROVIDERS", [("a", "model-a"), ("b", "model-b")])
+    inference._breakers["a"] = CircuitBreaker(failures=2, cooldown=30)
+    call, calls = scripted({"b": ["one", "two"]})
+    assert call_with_failover(call) == "one"
+    assert calls == ["a", "a", "b"]
+
+    # a's breaker is now open, so the next request goes straight to b
+    calls.clear()
+    assert call_with_failover(call) == "two"
+    assert calls == ["b"]
+
+
+def test_every_breaker_open_raises_unavailable(providers, clock):
+    for provider in ("a", "b", "c"):
+        inference._breakers[provider] = b = CircuitBreaker(failures=1, cooldown=30)
+        b.failure()
+    call, calls = scripted({})
+    with pytest.raises(ProvidersUnavailable):
+        call_with_failover(call)
+    assert calls == []
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    b = CircuitBreaker(failures=3, cooldown=30)
+    b.failure()
+    b.failure()
+    assert b.allow()
+    # A success resets the count
+    b.success()
+    b.failure()
+    b.failure()
+    assert b.allow()
+    b.failure()
+    assert not b.allow()
+
+
+def test_breaker_half_open_lets_one_trial_through(clock):
+    b = CircuitBreaker(failures=1, cooldown=30)
+    b.failure()
+    clock.now += 29
+    assert not b.allow()
+    clock.now += 1
+    assert b.allow()
+    # Only one trial at a time while half-open
+    assert not b.allow()
+    b.success()
+    assert b.allow() and b.allow()
+
+
+def test_failed_trial_restarts_cooldown(clock):
+    b = CircuitBreaker(failures=3, cooldown=30)
+    for _ in range(3):
+        b.failure()
+    clock.now += 30
+    assert b.allow()
+    b.failure()
+    # Reopened by the single failed trial, and the cooldown counts from now
+    clock.now += 29
+    assert not b.allow()
+    clock.now += 1
+    assert b.allow()
+
+
+def test_half_open_trial_through_failover(providers, clock, monkeypatch):
+    monkeypatch.setattr(inference, "PROVIDERS", [("a", "model-a"), ("b", "model-b")])
+    inference._breakers["a"] = b = CircuitBreaker(failures=1, cooldown=30)
+    b.failure()
+    call, calls = scripted({"a": ["recovered"], "b": ["fallback"]})
+    assert call_with_failover(call) == "fallback"
+    assert calls == ["b"]
+
+    clock.now += 30
+    calls.clear()
+    assert call_with_failover(call) == "recovered"
+    assert calls == ["a"]
+    assert b.opened_at is None
@@ -0,0 +1,162 @@
+import inspect
+import json
+import time
+import types
+from datetime import timedelta
+
+import pytest
+
+from common import jobs, planner, create_job, get_job, claim_job, finish_job, enqueue, local_queue, get_db, DB_TABLE, user_pk
+from common.jobs import job_sk
+
+PLAN = "1. Pick a route for the first run\n2. Buy running shoes that fit\n3. Run three times a week"
+
+
+def test_unset_queue_url_raises(table, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_QUEUE_URL", None)
+    with pytest.raises(RuntimeError, match="JOB_QUEUE_URL"):
+        enqueue({"kind": "reindexTasks"})
+    with pytest.raises(RuntimeError):
+        create_job("user", "Learn to juggle")
+    # Nothing is written for a job that could never be delivered
+    items = get_db().query(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk",
+        ExpressionAttributeValues={":pk": {"S": user_pk("user")}}
+    )["Items"]
+    assert items == []
+
+
+def test_local_queue_is_opt_in(table):
+    job_id = create_job("user", "Learn to juggle")
+    assert get_job("user", job_id)["status"]["S"] == "queued"
+    assert json.loads(local_queue.messages[0]) == {"userId": "user", "jobId": job_id}
+
+
+def test_sqs_queue(table, monkeypatch):
+    from common import client
+
+    url = client("sqs").create_queue(QueueName="jobs")["QueueUrl"]
+    monkeypatch.setattr(jobs, "JOB_QUEUE_URL", url)
+    enqueue({"kind": "reindexTasks", "userId": "user", "goalId": "goal"})
+    messages = client("sqs").receive_message(QueueUrl=url)["Messages"]
+    assert json.loads(messages[0]["Body"])["goalId"] == "goal"
+    assert not local_queue.messages
+
+
+def set_updated_at(user_id, job_id, when):
+    get_db().update_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": user_pk(user_id)}, "SK": {"S": job_sk(job_id)}},
+        UpdateExpression="SET updatedAt = :when",
+        ExpressionAttributeValues={":when": {"S": when.isoformat()}}
+    )
+
+
+def test_claim_is_exclusive_until_the_job_goes_stale(table):
+    job_id = create_job("user", "Learn to juggle")
+    job = claim_job("user", job_id)
+    assert job["status"]["S"] == "running" and job["attempts"]["N"] == "1"
+    # A redelivered message while the first worker is still on it
+    assert claim_job("user", job_id) is None
+
+    set_updated_at("user", job_id, jobs.utc_now() - timedelta(seconds=jobs.JOB_STALE_SECONDS - 5))
+    assert claim_job("user", job_id) is None
+    set_updated_at("user", job_id, jobs.utc_now() - timedelta(seconds=jobs.JOB_STALE_SECONDS + 5))
+    assert claim_job("user", job_id)["attempts"]["N"] == "2"
+
+
+def test_finished_job_is_never_claimed(table):
+    job_id = create_job("user", "Learn to juggle")
+    claim_job("user", job_id)
+    finish_job("user", job_id, goal_id="goal")
+    set_updated_at("user", job_id, jobs.utc_now() - timedelta(days=1))
+    assert claim_job("user", job_id) is None
+
+
+@pytest.mark.parametrize("tz", ["America/New_York", "Asia/Tokyo"])
+def test_stale_cutoff_ignores_local_time_zone(table, monkeypatch, tz):
+    # A fresh running job must stay claimed whatever the container's time zone
+    monkeypatch.setenv("TZ", tz)
+    time.tzset()
+    try:
+        job_id = create_job("user", "Learn to juggle")
+        assert claim_job("user", job_id) is not None
+        assert claim_job("user", job_id) is None
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+@pytest.fixture
+def model(monkeypatch):
+    # Replaces the model call; set .error to make it fail
+    fake = types.SimpleNamespace(calls=0, error=None)
+
+    def call(goal):
+        fake.calls += 1
+        if fake.error:
+            raise fake.error
+        return PLAN
+
+    monkeypatch.setattr(planner, "call_huggingface", call)
+    monkeypatch.setattr(planner, "_plan_cache", planner.OrderedDict())
+    return fake
+
+
+def test_worker_generates_goal_and_marks_job_done(table, model, load_handler, api_event):
+    worker = load_handler("goalWorker")
+    get_goal_job = load_handler("getGoalJob")
+    job_id = create_job("user", "Start running")
+
+    assert local_queue.drain(worker) == 1
+    status = json.loads(get_goal_job(api_event("user", {"jobId": job_id}), None)["body"])
+    assert status["status"] == "done"
+    tasks = json.loads(load_handler("getTasks")(api_event("user", {"goalId": status["goalId"]}), None)["body"])["tasks"]
+    assert [t["taskText"] for t in tasks] == planner.extract_tasks_bullets(PLAN)
+
+    # A redelivery of the same message finds the job finished and changes nothing
+    local_queue.send(json.dumps({"userId": "user", "jobId": job_id}))
+    local_queue.drain(worker)
+    assert model.calls == 1
+    assert json.loads(get_goal_job(api_event("user", {"jobId": job_id}), None)["body"]) == status
+
+
+def test_worker_records_generation_failure(table, model, load_handler, api_event):
+    worker = load_handler("goalWorker")
+    model.error = TimeoutError("provider timed out")
+    job_id = create_job("user", "Start running")
+
+    local_queue.drain(worker)
+    result = load_handler("getGoalJob")(api_event("user", {"jobId": job_id}), None)
+    assert json.loads(result["body"]) == {"jobId": job_id, "status": "failed", "error": "provider timed out"}
+    goals = get_db().query(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk AND begins_with(SK, :goal)",
+        ExpressionAttributeValues={":pk": {"S": user_pk("user")}, ":goal": {"S": "GOAL#"}}
+    )["Items"]
+    assert goals == []
+
+
+def test_worker_reports_failed_messages_for_redelivery(table, model, load_handler, monkeypatch):
+    # When even recording the failure fails, only that message is handed back to SQS
+    worker = load_handler("goalWorker")
+    model.error = TimeoutError("provider timed out")
+    job_id = create_job("user", "Start running")
+
+    def finish_job(*args, **kwargs):
+        raise RuntimeError("throttled")
+
+    monkeypatch.setitem(inspect.unwrap(worker).__globals__, "finish_job", finish_job)
+    result = worker({"Records": [{"messageId": "m1", "body": json.dumps({"userId": "user", "jobId": job_id})}]}, None)
+    assert result == {"batchItemFailures": [{"itemIdentifier": "m1"}]}
+
+
+def test_get_goal_job_is_scoped_to_its_owner(table, load_handler, api_event):
+    get_goal_job = load_handler("getGoalJob")
+    job_id = create_job("user", "Start running")
+
+    assert json.loads(get_goal_job(api_event("user", {"jobId": job_id}), None)["body"]) == {"jobId": job_id, "status": "queued"}
+    assert get_goal_job(api_event("someone-else", {"jobId": job_id}), None)["statusCode"] == 404
+    assert get_goal_job(api_event("user", {"jobId": "missing"}), None)["statusCode"] == 404
+    assert get_goal_job(api_event("user"), None)["statusCode"] == 400
@@ -0,0 +1,46 @@
+import json
+
+from common import get_db, DB_TABLE, goal_sk, task_sk, decode_task
+
+
+def completed_count(pk):
+    goal = get_db().get_item(TableName=DB_TABLE, Key={"PK": {"S": pk}, "SK": {"S": goal_sk("goal")}})["Item"]
+    return int(goal["completedCount"]["N"])
+
+
+def mark(load_handler, api_event, completed):
+    result = load_handler("markTask")(api_event("user", {"goalId": "goal"}, {"taskId": "t0", "completed": completed}), None)
+    return result["statusCode"], json.loads(result["body"])
+
+
+def test_mark_flips_task_and_counter(seed_goal, load_handler, api_event):
+    pk = seed_goal(1)
+    assert mark(load_handler, api_event, True) == (200, {"success": True})
+    task = get_db().get_item(TableName=DB_TABLE, Key={"PK": {"S": pk}, "SK": {"S": task_sk("goal", "t0")}})["Item"]
+    assert decode_task(task)["completed"] is True
+    assert completed_count(pk) == 1
+
+    assert mark(load_handler, api_event, False) == (200, {"success": True})
+    assert completed_count(pk) == 0
+
+
+def test_mark_in_requested_state_is_a_no_op(seed_goal, load_handler, api_event):
+    pk = seed_goal(1)
+    assert mark(load_handler, api_event, True)[0] == 200
+    assert mark(load_handler, api_event, True) == (200, {"success": True})
+    assert completed_count(pk) == 1
+
+
+def test_mark_missing_task_is_404(seed_goal, load_handler, api_event):
+    pk = seed_goal()
+    for completed in (True, False):
+        assert mark(load_handler, api_event, completed) == (404, {"error": "Task not found"})
+    assert completed_count(pk) == 0
+
+
+def test_mark_task_of_missing_goal_is_404(seed_goal, load_handler, api_event):
+    # With or without the task item, which deleteGoal may not have reached yet
+    pk = seed_goal(1, goal=False)
+    assert mark(load_handler, api_event, True) == (404, {"error": "Goal not found"})
+    get_db().delete_item(TableName=DB_TABLE, Key={"PK": {"S": pk}, "SK": {"S": task_sk("goal", "t0")}})
+    assert mark(load_handler, api_event, True) == (404, {"error": "Goal not found"})
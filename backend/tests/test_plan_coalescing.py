@@ -0,0 +1,111 @@
+import threading
+import time
+import types
+
+import pytest
+
+from common import inference, planner
+
+PLAN = "1. Pick a route for the first run\n2. Buy running shoes that fit\n3. Run three times a week"
+
+
+class CountingProvider:
+    # Stands in for an InferenceClient: counts completions and takes `delay` seconds to answer
+    def __init__(self, delay=0.3, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, stream=False):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise TimeoutError("provider timed out")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message={"content": PLAN})])
+
+
+@pytest.fixture
+def provider(table, monkeypatch):
+    import moto.core.botocore_stubber as stubber
+
+    # DynamoDB applies a conditional write atomically; moto doesn't, so its requests are served one at a time
+    lock = threading.Lock()
+    process_request = stubber.BotocoreStubber.process_request
+
+    def atomic(self, request):
+        with lock:
+            return process_request(self, request)
+
+    monkeypatch.setattr(stubber.BotocoreStubber, "process_request", atomic)
+    fake = CountingProvider()
+    monkeypatch.setattr(inference, "PROVIDERS", [("fake", "model")])
+    monkeypatch.setattr(inference, "HF_ATTEMPTS", 1)
+    monkeypatch.setattr(inference, "inference_client", lambda name: fake)
+    # High enough that the failure test's calls never open it
+    monkeypatch.setattr(inference, "_breakers", {"fake": inference.CircuitBreaker(failures=100)})
+    monkeypatch.setattr(planner, "PLAN_LEASE_POLL_SECONDS", 0.02)
+    monkeypatch.setattr(planner, "_plan_cache", planner.OrderedDict())
+    return fake
+
+
+def submit_concurrently(goals):
+    barrier = threading.Barrier(len(goals))
+    results = [None] * len(goals)
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = planner.generate_plan(goals[i])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(goals))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+    return results
+
+
+def lease_item(goal):
+    from common import get_db, DB_TABLE
+
+    return get_db().get_item(
+        TableName=DB_TABLE,
+        Key={"PK": {"S": f"PLAN#{planner.plan_cache_key(goal)}"}, "SK": {"S": "LEASE"}}
+    ).get("Item")
+
+
+@pytest.mark.parametrize("n", [2, 8])
+def test_identical_submissions_share_one_call(provider, n):
+    # Goals that normalise to the same key count as identical
+    goals = ["Start running"] + ["start running!", "  Start   running  "] * n
+    results = submit_concurrently(goals[:n])
+
+    assert provider.calls == 1
+    assert all(isinstance(r, tuple) for r in results), results
+    assert {tuple(tasks) for tasks, _, _ in results} == {tuple(planner.extract_tasks_bullets(PLAN))}
+    assert sorted(cached for _, cached, _ in results) == [False] + [True] * (n - 1)
+    assert lease_item("Start running") is None
+
+
+def test_different_goals_are_not_coalesced(provider):
+    submit_concurrently(["Start running", "Learn to juggle", "Write a novel"])
+    assert provider.calls == 3
+
+
+def test_failed_holder_releases_lease(provider):
+    provider.fail = True
+    results = submit_concurrently(["Start running"] * 4)
+
+    # Waiters see the lease go away without a plan and try the model themselves; nobody waits out the lease
+    assert all(isinstance(r, TimeoutError) for r in results)
+    assert provider.calls == 4
+    assert lease_item("Start running") is None
+
+    provider.fail = False
+    tasks, cached, _ = planner.generate_plan("Start running")
+    assert tasks and not cached
@@ -0,0 +1,172 @@
+import json
+import random
+
+import pytest
+
+from common import rank_between, ranks_after, validate_rank, REBALANCE_LENGTH
+from fuzz_ranks import simulate
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_inserts_keep_order(seed):
+    # Property: inserting anywhere in a list (ends included) always yields a valid key strictly between its neighbours
+    rng = random.Random(seed)
+    keys = ranks_after(None, rng.randrange(0, 5))
+    for _ in range(300):
+        i = rng.randrange(len(keys) + 1)
+        prev = keys[i - 1] if i > 0 else None
+        nxt = keys[i] if i < len(keys) else None
+        key = rank_between(prev, nxt)
+        validate_rank(key)
+        assert (prev is None or prev < key) and (nxt is None or key < nxt)
+        keys.insert(i, key)
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+
+
+@pytest.mark.parametrize("front", [False, True])
+def test_adjacent_inserts_cross_rebalance_length(front):
+    # Inserting again and again next to the same task is what makes keys grow; it has to cross the threshold
+    # well before DynamoDB's 1024-byte key limit
+    a, b = ranks_after(None, 2)
+    for n in range(1, 2000):
+        if front:
+            b = rank_between(a, b)
+        else:
+            a = rank_between(a, b)
+        if len(a if not front else b) > REBALANCE_LENGTH:
+            break
+    assert n < 400
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_random_moves_and_inserts(seed):
+    # Random moves between existing neighbours and inserts, on a smaller scale than tools/fuzz_ranks.py: keys stay
+    # unique and ordered, and spread-out moves keep them well short of the rebalance threshold
+    result = simulate(seed, 20000, size=200)
+    assert result["rebalances"] == 0
+    assert result["maxLength"] <= 16
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_hot_spot_moves_rebalance_before_keys_grow_long(seed):
+    # Most moves land next to the same task, so keys grow until the goal is renumbered; none passes the bound
+    result = simulate(seed, 20000, size=200, hot=0.5)
+    assert result["rebalances"] > 0
+    assert result["maxLength"] <= REBALANCE_LENGTH + 1
+
+
+def test_appends_and_renumbering_stay_short():
+    keys = ranks_after(None, 10000)
+    assert max(len(k) for k in keys) <= 4
+    assert rank_between(None, keys[0]) < keys[0]
+
+
+def task_order(pk, goal_id="goal"):
+    from common import query_pages, task_prefix, task_id_from_sk
+
+    items = query_pages(
+        TableName="test",
+        KeyConditionExpression="PK = :pk AND begins_with(SK, :sk)",
+        ExpressionAttributeValues={":pk": {"S": pk}, ":sk": {"S": task_prefix(goal_id)}}
+    )
+    return [(item["rank"]["S"], task_id_from_sk(item["SK"]["S"])) for item in sorted(items, key=lambda i: i["rank"]["S"])]
+
+
+def test_long_rank_enqueues_rebalance(seed_goal, load_handler, api_event):
+    from common import local_queue
+
+    reorder = load_handler("reorderTasks")
+    worker = load_handler("goalWorker")
+    pk = seed_goal(3)
+
+    # Keep moving a task to just after t0, so its key lands between t0 and whatever moved there last
+    moved = [f"t{i % 2 + 1}" for i in range(400)]
+    prev = task_order(pk)[0][0]
+    next_rank = task_order(pk)[1][0]
+    for task_id in moved:
+        result = reorder(api_event("user", {"goalId": "goal"}, {"taskId": task_id, "prevRank": prev, "nextRank": next_rank}), None)
+        assert result["statusCode"] == 200
+        next_rank = json.loads(result["body"])["rank"]
+        if local_queue.messages:
+            break
+    assert len(next_rank) > REBALANCE_LENGTH
+    assert json.loads(local_queue.messages[0]) == {"kind": "reindexTasks", "userId": "user", "goalId": "goal"}
+
+    before = [task_id for _, task_id in task_order(pk)]
+    local_queue.drain(worker)
+    after = task_order(pk)
+    assert [task_id for _, task_id in after] == before
+    assert [rank for rank, _ in after] == ranks_after(None, 3)
+
+
+def test_short_ranks_do_not_enqueue(seed_goal, load_handler, api_event):
+    from common import local_queue
+
+    reorder = load_handler("reorderTasks")
+    pk = seed_goal(3)
+    ranks = [rank for rank, _ in task_order(pk)]
+    result = reorder(api_event("user", {"goalId": "goal"}, {"taskId": "t2", "prevRank": ranks[0], "nextRank": ranks[1]}), None)
+    assert result["statusCode"] == 200
+    assert not local_queue.messages
+
+
+def test_add_task_appends_after_the_highest_rank(seed_goal, load_handler, api_event):
+    from common import last_rank
+
+    reorder = load_handler("reorderTasks")
+    add = load_handler("addTask")
+    pk = seed_goal(40)
+    ranks = [rank for rank, _ in task_order(pk)]
+    # Move the first task to the end, so the highest rank no longer belongs to the task with the last SK
+    result = reorder(api_event("user", {"goalId": "goal"}, {"taskId": "t0", "prevRank": ranks[-1], "nextRank": None}), None)
+    assert result["statusCode"] == 200
+    assert last_rank(pk, "goal") == json.loads(result["body"])["rank"]
+
+    result = add(api_event("user", {"goalId": "goal"}, {"taskText": "One more task"}), None)
+    assert result["statusCode"] == 200
+    order = task_order(pk)
+    assert order[-1][1] == json.loads(result["body"])["taskId"]
+    assert order[-2][1] == "t0"
+
+
+def test_last_rank_of_a_goal_without_tasks(table):
+    from common import last_rank, user_pk
+
+    assert last_rank(user_pk("user"), "goal") is None
+
+
+def test_migrate_task_ranks_backfills_legacy_order(table, load_handler):
+    from common import batch_write, get_db, DB_TABLE, RANK_INDEX, user_pk, goal_sk, task_sk, sync_key, task_id_from_sk, task_item
+
+    migrate = load_handler("migrateTaskRanks")
+    pk = user_pk("user")
+    legacy = [("a", 3000.0), ("b", 1000.0), ("c", 2500.5), ("d", 2000.0)]
+    batch_write([{"PutRequest": {"Item": {"PK": {"S": pk}, "SK": {"S": goal_sk(goal)}, "taskCount": {"N": "0"}}}}
+                 for goal in ("goal", "ranked")] + [{"PutRequest": {"Item": {
+        "PK": {"S": pk}, "SK": {"S": task_sk("goal", task_id)}, "taskText": {"S": f"Task {task_id}"},
+        "order": {"N": str(order)}, "completed": {"BOOL": False}
+    }}} for task_id, order in legacy] + [
+        # A task added after ranks shipped, and a goal that never had legacy tasks
+        {"PutRequest": {"Item": task_item(pk, "goal", "e", "Task e", "a0", "2026-10-18T12:00:00")}},
+        {"PutRequest": {"Item": task_item(pk, "ranked", "f", "Task f", "a0", "2026-10-18T12:00:00")}}
+    ])
+
+    assert migrate({"dryRun": True}, None) == {"dryRun": True, "goals": 2, "migratedGoals": 1, "tasks": 5}
+    assert "rank" not in get_db().get_item(TableName=DB_TABLE, Key={"PK": {"S": pk}, "SK": {"S": task_sk("goal", "a")}})["Item"]
+
+    assert migrate({"dryRun": False}, None) == {"dryRun": False, "goals": 2, "migratedGoals": 1, "tasks": 5}
+    # Legacy tasks keep their old order and come before the ranked one; the index now returns them all in that order
+    assert [task_id for _, task_id in task_order(pk)] == ["b", "d", "c", "a", "e"]
+    assert [rank for rank, _ in task_order(pk)] == ranks_after(None, 5)
+    page = get_db().query(
+        TableName=DB_TABLE, IndexName=RANK_INDEX, KeyConditionExpression="syncKey = :syncKey",
+        ExpressionAttributeValues={":syncKey": {"S": sync_key(pk, "goal")}}
+    )
+    assert [task_id_from_sk(item["SK"]["S"]) for item in page["Items"]] == ["b", "d", "c", "a", "e"]
+    assert not any("order" in item for item in page["Items"])
+    goal = get_db().get_item(TableName=DB_TABLE, Key={"PK": {"S": pk}, "SK": {"S": goal_sk("goal")}})["Item"]
+    assert goal["version"]["N"] == "1"
+
+    # Nothing is left to migrate, and the already-ranked goal was never rewritten
+    assert migrate({"dryRun": False}, None)["tasks"] == 0
+    assert [rank for rank, _ in task_order(pk, "ranked")] == ["a0"]
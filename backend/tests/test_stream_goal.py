@@ -0,0 +1,71 @@
+import json
+import types
+
+import pytest
+
+from common import inference
+
+PLAN = "Here is your plan:\n\n1. Pick a route for the first run\n2. Buy running shoes that fit\n3. Run three times a week\n"
+
+
+class ChunkedProvider:
+    # Streams PLAN a few characters at a time and, before its last chunk, records how many tasks are already stored
+    def __init__(self):
+        self.stored_before_end = None
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, stream=False):
+        return self.stream()
+
+    def stream(self):
+        chunks = [PLAN[i:i + 5] for i in range(0, len(PLAN), 5)]
+        for i, content in enumerate(chunks):
+            if i == len(chunks) - 1:
+                self.stored_before_end = len(stored_tasks())
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=content))])
+
+
+def stored_tasks():
+    from common import query_pages, DB_TABLE, user_pk
+
+    return list(query_pages(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk AND begins_with(SK, :sk)",
+        ExpressionAttributeValues={":pk": {"S": user_pk("user")}, ":sk": {"S": "TASK#"}}
+    ))
+
+
+@pytest.fixture
+def provider(table, monkeypatch):
+    fake = ChunkedProvider()
+    monkeypatch.setattr(inference, "PROVIDERS", [("fake", "model")])
+    monkeypatch.setattr(inference, "inference_client", lambda name: fake)
+    monkeypatch.setattr(inference, "_breakers", {})
+    return fake
+
+
+def events(body):
+    return [(block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in body.strip().split("\n\n")]
+
+
+def test_tasks_are_stored_while_the_model_is_still_generating(provider, load_handler, api_event):
+    result = load_handler("goalProcessor")(api_event("user", body={"goal": "Start running", "stream": True}), None)
+
+    assert result["statusCode"] == 200
+    assert provider.stored_before_end >= 2
+    assert len(stored_tasks()) == 3
+
+
+def test_stream_body_lists_goal_tasks_and_done(provider, load_handler, api_event):
+    result = load_handler("goalProcessor")(api_event("user", body={"goal": "Start running", "stream": True}), None)
+
+    assert result["headers"]["Content-Type"] == "text/event-stream"
+    sent = events(result["body"])
+    assert [name for name, _ in sent] == ["goal", "task", "task", "task", "done"]
+    assert [data["taskText"] for name, data in sent if name == "task"] == [
+        "Pick a route for the first run", "Buy running shoes that fit", "Run three times a week"
+    ]
+    ranks = [data["rank"] for name, data in sent if name == "task"]
+    assert ranks == sorted(ranks)
+    assert sent[-1][1] == {"goalId": sent[0][1]["goalId"], "taskCount": 3}
@@ -0,0 +1,131 @@
+import json
+import time
+
+import pytest
+
+from common import sync, get_db, DB_TABLE, tombstone_sk, sync_key, TOMBSTONE_TTL
+from common.sync import SYNC_LAG_MS
+
+
+class Clock:
+    # Stands in for now_version, so every write's version and every cursor is chosen by the test
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock(1_800_000_000_000)
+    monkeypatch.setattr(sync, "now_version", c)
+    return c
+
+
+@pytest.fixture
+def handlers(load_handler, api_event):
+    loaded = {name: load_handler(name) for name in ("getTasks", "editTask", "addTask", "deleteTask", "markTask")}
+
+    def invoke(name, params=None, body=None):
+        return loaded[name](api_event("user", {"goalId": "goal", **(params or {})}, body), None)
+    return invoke
+
+
+def call(handlers, name, params=None, body=None):
+    result = handlers(name, params, body)
+    assert result["statusCode"] == 200, result
+    return json.loads(result["body"])
+
+
+def test_full_list_returns_a_cursor_that_trails_the_clock(seed_goal, clock, handlers):
+    seed_goal(3)
+    clock.now += 60_000
+    body = call(handlers, "getTasks")
+    assert body["version"] == clock.now - SYNC_LAG_MS
+    assert len(body["tasks"]) == 3
+
+
+def test_since_returns_only_tasks_changed_after_the_cursor(seed_goal, clock, handlers):
+    seed_goal(4)
+    clock.now += 60_000
+    cursor = call(handlers, "getTasks")["version"]
+
+    clock.now += 1000
+    call(handlers, "editTask", body={"taskId": "t1", "taskText": "Task number one, reworded"})
+    call(handlers, "markTask", body={"taskId": "t3", "completed": True})
+    added = call(handlers, "addTask", body={"taskText": "A task added later"})["taskId"]
+
+    clock.now += SYNC_LAG_MS + 1
+    body = call(handlers, "getTasks", {"since": str(cursor)})
+    changed = {t["taskId"]: t for t in body["tasks"]}
+    assert set(changed) == {"t1", "t3", added}
+    assert changed["t1"]["taskText"] == "Task number one, reworded"
+    assert changed["t3"]["completed"] is True
+    assert body["deleted"] == []
+    assert body["version"] == clock.now - SYNC_LAG_MS
+
+    # Nothing written since the newer cursor
+    body = call(handlers, "getTasks", {"since": str(body["version"])})
+    assert body["tasks"] == [] and body["deleted"] == []
+
+
+def test_deleted_tasks_come_back_as_ids_with_an_expiring_tombstone(seed_goal, clock, handlers):
+    pk = seed_goal(3)
+    clock.now += 60_000
+    cursor = call(handlers, "getTasks")["version"]
+
+    clock.now += 1000
+    # Edited and then deleted: reported only as deleted
+    call(handlers, "editTask", body={"taskId": "t0", "taskText": "Task number zero, reworded"})
+    call(handlers, "deleteTask", body={"taskId": "t0"})
+    call(handlers, "deleteTask", body={"taskId": "t2"})
+
+    body = call(handlers, "getTasks", {"since": str(cursor)})
+    assert body["tasks"] == []
+    assert body["deleted"] == ["t0", "t2"]
+
+    tombstone = get_db().get_item(TableName=DB_TABLE, Key={"PK": {"S": pk}, "SK": {"S": tombstone_sk("goal", "t2")}})["Item"]
+    assert tombstone["syncKey"]["S"] == sync_key(pk, "goal")
+    assert tombstone["version"]["N"] == str(clock.now)
+    # DynamoDB expires items by wall-clock seconds, so the TTL follows time.time() rather than the version clock
+    assert abs(int(tombstone["ttl"]["N"]) - (time.time() + TOMBSTONE_TTL)) < 60
+    # Tombstones stay out of the task list
+    assert [t["taskId"] for t in call(handlers, "getTasks")["tasks"]] == ["t1"]
+
+
+def test_cursor_lag_covers_writes_stamped_just_before_it(seed_goal, clock, handlers):
+    # Another container's clock runs behind, so its write lands after the fetch with a version older than "now".
+    # The cursor trails by SYNC_LAG_MS, so a write up to that far behind is still picked up by the next sync.
+    seed_goal(3)
+    clock.now += 60_000
+    fetched_at = clock.now
+    cursor = call(handlers, "getTasks")["version"]
+
+    clock.now = fetched_at - SYNC_LAG_MS + 1
+    call(handlers, "editTask", body={"taskId": "t0", "taskText": "Written by a slow clock"})
+    clock.now = cursor
+    call(handlers, "editTask", body={"taskId": "t1", "taskText": "Stamped exactly at the cursor"})
+
+    clock.now = fetched_at + 1000
+    body = call(handlers, "getTasks", {"since": str(cursor)})
+    assert [t["taskId"] for t in body["tasks"]] == ["t0"]
+
+
+def test_overlap_is_sent_again_rather_than_missed(seed_goal, clock, handlers):
+    # A write just before the full fetch is inside the lag window, so the next sync repeats it
+    seed_goal(2)
+    clock.now += 60_000
+    call(handlers, "editTask", body={"taskId": "t0", "taskText": "Written just before the fetch"})
+    clock.now += 100
+    full = call(handlers, "getTasks")
+    assert "Written just before the fetch" in [t["taskText"] for t in full["tasks"]]
+    body = call(handlers, "getTasks", {"since": str(full["version"])})
+    assert [t["taskId"] for t in body["tasks"]] == ["t0"]
+
+
+def test_since_older_than_tombstones_is_410(seed_goal, clock, handlers):
+    seed_goal(1)
+    too_old = clock.now - SYNC_LAG_MS - TOMBSTONE_TTL * 1000 - 1
+    assert handlers("getTasks", {"since": str(too_old)})["statusCode"] == 410
+    assert handlers("getTasks", {"since": "yesterday"})["statusCode"] == 400
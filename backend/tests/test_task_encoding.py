@@ -0,0 +1,56 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from common import encode_task, decode_task, TASK_SCHEMA
+
+TASK = {"taskText": "Write the report", "completed": False, "deadline": "", "timeSpent": 0}
+
+
+@pytest.mark.parametrize("created_at", [
+    "2026-10-18T12:00:00.123456",
+    "2026-10-18T12:00:00.000001",
+    "2026-10-18T12:00:00.999999",
+    "1999-12-31T23:59:59.500000"
+])
+def test_created_at_round_trips_every_microsecond(created_at):
+    item = encode_task({**TASK, "createdAt": created_at})
+    assert item["s"] == {"N": str(TASK_SCHEMA)}
+    assert decode_task(item)["createdAt"] == created_at
+
+
+def test_whole_seconds_keep_the_fraction():
+    # datetime.isoformat() drops ".000000"; the stored and returned format must not depend on the value
+    created_at = datetime(2026, 10, 18, 12, 0, 0).isoformat()
+    assert created_at == "2026-10-18T12:00:00"
+    assert decode_task(encode_task({**TASK, "createdAt": created_at}))["createdAt"] == "2026-10-18T12:00:00.000000"
+
+
+def test_random_timestamps_round_trip():
+    rng = random.Random(23)
+    start = datetime(2020, 1, 1)
+    for _ in range(2000):
+        created_at = (start + timedelta(microseconds=rng.randrange(10 ** 15))).isoformat(timespec="microseconds")
+        assert decode_task(encode_task({**TASK, "createdAt": created_at}))["createdAt"] == created_at
+
+
+def test_schema_1_items_hold_milliseconds():
+    item = {"s": {"N": "1"}, "tx": {"S": "Write the report"}, "ca": {"N": "1792324800123"}}
+    assert decode_task(item)["createdAt"] == "2026-10-18T12:00:00.123000"
+
+
+@pytest.mark.parametrize("stored, returned", [
+    ("2026-10-18T12:00:00.123456", "2026-10-18T12:00:00.123456"),
+    ("2026-10-18T12:00:00", "2026-10-18T12:00:00.000000")
+])
+def test_legacy_items_use_the_same_format(stored, returned):
+    item = {"taskText": {"S": "Write the report"}, "completed": {"BOOL": False}, "createdAt": {"S": stored}}
+    assert decode_task(item)["createdAt"] == returned
+    # And the migration's re-encoding keeps it
+    assert decode_task(encode_task(decode_task(item)))["createdAt"] == returned
+
+
+def test_unparseable_legacy_created_at_is_returned_as_stored():
+    item = {"taskText": {"S": "Write the report"}, "createdAt": {"S": "yesterday"}}
+    assert decode_task(item)["createdAt"] == "yesterday"
@@ -0,0 +1,116 @@
+import json
+import os
+import random
+import re
+
+import pytest
+
+from common import TaskLineParser
+from common.planner import extract_tasks_bullets
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "model_outputs.jsonl")
+
+
+def legacy_extract(text):
+    # The extractor TaskLineParser replaced, kept as the reference for the fuzz test
+    raw_tasks = re.split(r'\n+\s*(?:[-*•→]|\d+\.)\s+', text)
+    cleaned = []
+    seen = set()
+    for task in raw_tasks:
+        task = re.sub(r'[*#_`]+', '', task)
+        task = re.sub(r'^\d+\.\s*', '', task).strip()
+        if not task or len(task) < 10:
+            continue
+        key = task.lower()
+        if key not in seen:
+            seen.add(key)
+            cleaned.append(task)
+    return cleaned
+
+
+def streamed(text, rng):
+    # Feeds the text in random-sized chunks, the way tokens arrive from the provider
+    parser = TaskLineParser()
+    tasks = []
+    i = 0
+    while i < len(text):
+        n = rng.randrange(1, 12)
+        tasks += parser.feed(text[i:i + n])
+        i += n
+    return tasks + parser.finish()
+
+
+with open(CORPUS) as f:
+    corpus = [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.mark.parametrize("case", corpus, ids=[c["raw"][:30] for c in corpus])
+def test_corpus(case):
+    assert extract_tasks_bullets(case["raw"]) == case["tasks"]
+
+
+@pytest.mark.parametrize("case", corpus, ids=[c["raw"][:30] for c in corpus])
+def test_corpus_streamed(case):
+    # Streaming and whole-response parsing agree wherever the chunk boundaries fall (the fallback for
+    # marker-less output only exists on the whole-response path)
+    if not TaskLineParser().parse(case["raw"]) and "\n" in case["raw"]:
+        pytest.skip("no list markers")
+    rng = random.Random(case["raw"])
+    for _ in range(20):
+        assert streamed(case["raw"], rng) == case["tasks"]
+
+
+WORDS = "plan write research book call buy practice review schedule outline draft install learn visit the a for with every daily weekly new local three five morning garden budget shoes report".split()
+BULLETS = ["-", "*", "•", "→"]
+
+
+def random_task(rng, used):
+    while True:
+        words = [rng.choice(WORDS) for _ in range(rng.randrange(3, 9))]
+        words[0] = words[0].capitalize()
+        if rng.random() < 0.2:
+            i = rng.randrange(len(words))
+            words[i] = f"**{words[i]}**"
+        if rng.random() < 0.1:
+            words.append(str(rng.randrange(1, 60)))
+        text = " ".join(words)
+        key = "".join(re.sub(r'[*#_`]+', '', text).lower().split())
+        if len(re.sub(r'[*#_`]+', '', text)) >= 10 and key not in used:
+            used.add(key)
+            return text
+
+
+def random_response(rng):
+    # A list in the shapes both extractors understand: "N." numbering or '-', '*', '•', '→' bullets, optional
+    # indentation, bold words and blank lines between items. The first item is numbered, since the old extractor
+    # only recognised a bullet after a newline.
+    used = set()
+    lines = []
+    for n in range(1, rng.randrange(2, 14)):
+        if n == 1 or rng.random() < 0.6:
+            marker = f"{n}."
+        else:
+            marker = rng.choice(BULLETS)
+        indent = " " * rng.choice([0, 0, 0, 2, 4]) if n > 1 else ""
+        lines.append(f"{indent}{marker}{rng.choice([' ', ' ', '  '])}{random_task(rng, used)}")
+        if rng.random() < 0.2:
+            lines.append("")
+    return "\n".join(lines) + rng.choice(["", "\n"])
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_fuzz_matches_legacy_extractor(seed):
+    rng = random.Random(seed)
+    text = random_response(rng)
+    assert extract_tasks_bullets(text) == legacy_extract(text), text
+    assert streamed(text, rng) == legacy_extract(text), text
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_fuzz_drops_intro_and_sign_off(seed):
+    # Intentional difference: the old extractor kept an intro line as a task; the parser skips unmarked lines
+    rng = random.Random(seed)
+    intro = rng.choice(["Here is your plan:", "Sure! Here's a step-by-step plan to reach your goal:"])
+    sign_off = rng.choice(["", "\n\nGood luck, you've got this!"])
+    body = random_response(rng).rstrip("\n")
+    assert extract_tasks_bullets(f"{intro}\n\n{body}{sign_off}") == legacy_extract(body)
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from common import tracing, traced, phase
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    # A fresh container: the next invocation is a cold start
+    monkeypatch.setattr(tracing, "_cold", True)
+
+    @traced("test")
+    def handle(event, context):
+        with phase("Parse"):
+            pass
+        return {"statusCode": 200}
+    return handle
+
+
+def emitted(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines() if '"DurationMs"' in line]
+
+
+def test_zero_rate_traces_nothing_not_even_cold_starts(handler, monkeypatch, capsys):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    for _ in range(3):
+        handler({}, None)
+    assert emitted(capsys) == []
+
+
+def test_cold_start_is_traced_at_any_positive_rate(handler, monkeypatch, capsys):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1e-9)
+    for _ in range(3):
+        handler({}, None)
+    lines = emitted(capsys)
+    assert [line["ColdStart"] for line in lines] == [1]
+    assert lines[0]["Function"] == "test" and lines[0]["ParseCalls"] == 1
+
+
+def test_full_rate_traces_every_invocation(handler, monkeypatch, capsys):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    for _ in range(3):
+        handler({}, None)
+    assert [line["ColdStart"] for line in emitted(capsys)] == [1, 0, 0]
@@ -0,0 +1,80 @@
+"""Times goal deletion against a local DynamoDB at different worker counts.
+
+Seeds ``--tasks`` task items under one goal, deletes them with
+``common.delete_goal_tasks`` and reports how long it took, once per value of
+``--concurrency`` (1 is the old one-batch-at-a-time behaviour). Creates the
+table if it doesn't exist. Run DynamoDB Local first and point boto3 at it:
+
+    docker run -p 8000:8000 amazon/dynamodb-local
+    AWS_ENDPOINT_URL_DYNAMODB=http://localhost:8000 AWS_DEFAULT_REGION=us-east-2 \\
+        AWS_ACCESS_KEY_ID=local AWS_SECRET_ACCESS_KEY=local DB_TABLE=bench \\
+        python backend/tools/bench_delete_goal.py --tasks 10000 --concurrency 1 4 8 16
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "layers", "common", "python"))
+
+import common.deletion as deletion
+from common import get_db, DB_TABLE, batch_write, user_pk, task_sk
+
+PADDING = "x" * 200
+
+
+def ensure_table():
+    db = get_db()
+    if DB_TABLE in db.list_tables()["TableNames"]:
+        return
+    db.create_table(
+        TableName=DB_TABLE,
+        KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}, {"AttributeName": "SK", "KeyType": "RANGE"}],
+        AttributeDefinitions=[{"AttributeName": "PK", "AttributeType": "S"}, {"AttributeName": "SK", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    db.get_waiter("table_exists").wait(TableName=DB_TABLE)
+
+
+def seed(pk, goal_id, count):
+    # Task-sized items, so the key-only reads page the way they would on real data
+    batch_write([{"PutRequest": {"Item": {
+        "PK": {"S": pk},
+        "SK": {"S": task_sk(goal_id, f"{i:06d}")},
+        "type": {"S": "task"},
+        "taskText": {"S": PADDING},
+        "completed": {"BOOL": False},
+        "timeSpent": {"N": "0"}
+    }}} for i in range(count)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    ensure_table()
+    pk = user_pk("bench")
+    results = []
+    for concurrency in args.concurrency:
+        goal_id = str(uuid.uuid4())
+        seed(pk, goal_id, args.tasks)
+        deletion.DELETE_CONCURRENCY = concurrency
+        started = time.perf_counter()
+        deleted, finished = deletion.delete_goal_tasks(pk, goal_id)
+        elapsed = time.perf_counter() - started
+        results.append({
+            "concurrency": concurrency,
+            "deleted": deleted,
+            "finished": finished,
+            "seconds": round(elapsed, 2),
+            "itemsPerSecond": round(deleted / elapsed, 1)
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmarks the task extractor against raw model outputs taken from the logs.
+
+With ``LOG_MODEL_OUTPUT=1`` the generation path logs every model response as
+``repr(ai_response)`` on the line after ``----RAW TEXT----``. Point this at CloudWatch log exports (plain
+text, one log line per line) and it collects those responses into a corpus,
+times ``extract_tasks_bullets`` over it and reports how many tasks each
+response produced, listing the responses that produced none. It also reads
+``.jsonl`` corpora such as ``backend/tests/fixtures/model_outputs.jsonl``, the
+regression corpus the parser tests check against.
+
+    python backend/tools/bench_extractor.py goalProcessor-logs.txt --repeat 200
+    python backend/tools/bench_extractor.py goalProcessor-logs.txt --save corpus.jsonl
+    python backend/tools/bench_extractor.py backend/tests/fixtures/model_outputs.jsonl
+"""
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "layers", "common", "python"))
+
+from common.planner import extract_tasks_bullets
+
+RAW_MARKER = "----RAW TEXT----"
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def load_corpus(paths):
+    corpus = []
+    for path in paths:
+        with open(path) as f:
+            if path.endswith(".jsonl"):
+                corpus.extend(json.loads(line)["raw"] for line in f if line.strip())
+                continue
+            lines = f.read().splitlines()
+        for i, line in enumerate(lines[:-1]):
+            if line.rstrip().endswith(RAW_MARKER):
+                # The repr may be prefixed by the Lambda log timestamp/request id columns
+                raw = lines[i + 1]
+                raw = raw[min(pos for pos in (raw.find("'"), raw.find('"')) if pos >= 0):]
+                corpus.append(ast.literal_eval(raw))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="Log exports, or .jsonl corpora of {\"raw\": ...} lines")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--save", help="Write the collected corpus as JSON lines")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.inputs)
+    if args.save:
+        with open(args.save, "w") as f:
+            for raw in corpus:
+                f.write(json.dumps({"raw": raw}) + "\n")
+
+    timings = []
+    for raw in corpus:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            extract_tasks_bullets(raw)
+        timings.append((time.perf_counter() - started) / args.repeat * 1e6)
+
+    counts = [len(extract_tasks_bullets(raw)) for raw in corpus]
+    print(json.dumps({
+        "responses": len(corpus),
+        "p50Us": round(percentile(timings, 50), 1),
+        "p99Us": round(percentile(timings, 99), 1),
+        "responsesPerSecond": round(len(corpus) / (sum(timings) / 1e6), 1) if timings else 0.0,
+        "tasksMin": min(counts, default=0),
+        "tasksMax": max(counts, default=0),
+        "empty": [raw[:200] for raw, count in zip(corpus, counts) if count == 0]
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
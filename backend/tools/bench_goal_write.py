@@ -0,0 +1,95 @@
+"""Times writing a new goal and its tasks one PutItem at a time against batched BatchWriteItem.
+
+For each ``--tasks`` count, builds the items ``common.create_goal`` writes (the
+goal plus one task item per step) and stores them twice under fresh goal ids:
+once with a ``put_item`` per item, as ``goalProcessor`` used to, and once with
+``common.batch_write`` in 25-item chunks. Reports the median time and the
+number of DynamoDB requests for each. Runs against DynamoDB Local
+(``AWS_ENDPOINT_URL_DYNAMODB``) or a moto server started with ``--moto``.
+
+    python backend/tools/bench_goal_write.py --moto --tasks 10 25 100
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "layers", "common", "python"))
+os.environ.setdefault("DB_TABLE", "bench")
+
+from local_dynamo import connect, ensure_table
+
+
+def goal_items(count):
+    from common import user_pk, goal_sk, task_item, ranks_after
+
+    pk = user_pk("bench")
+    goal_id = str(uuid.uuid4())
+    created_at = datetime.utcnow().isoformat()
+    items = [{
+        "PK": {"S": pk},
+        "SK": {"S": goal_sk(goal_id)},
+        "type": {"S": "goal"},
+        "goalText": {"S": "Benchmark goal"},
+        "createdAt": {"S": created_at},
+        "taskCount": {"N": str(count)},
+        "completedCount": {"N": "0"},
+        "totalTimeSpent": {"N": "0"}
+    }]
+    for i, rank in enumerate(ranks_after(None, count)):
+        items.append(task_item(pk, goal_id, str(uuid.uuid4()), f"Work through step number {i + 1} of the plan", rank, created_at))
+    return items
+
+
+def put_each(items):
+    from common import get_db, DB_TABLE
+
+    db = get_db()
+    for item in items:
+        db.put_item(TableName=DB_TABLE, Item=item)
+    return len(items)
+
+
+def batched(items):
+    from common import batch_write
+    from common.dynamo import BATCH_SIZE
+
+    batch_write([{"PutRequest": {"Item": item}} for item in items])
+    return -(-len(items) // BATCH_SIZE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 25, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--moto", action="store_true", help="Start a moto server instead of using AWS_ENDPOINT_URL_DYNAMODB")
+    args = parser.parse_args()
+
+    try:
+        connect(args.moto)
+    except RuntimeError as e:
+        parser.error(str(e))
+    ensure_table()
+
+    results = []
+    for count in args.tasks:
+        row = {"tasks": count}
+        for name, write in (("putItem", put_each), ("batchWrite", batched)):
+            times = []
+            for _ in range(args.repeat):
+                items = goal_items(count)
+                started = time.perf_counter()
+                requests = write(items)
+                times.append((time.perf_counter() - started) * 1000)
+            row[f"{name}Ms"] = round(statistics.median(times), 1)
+            row[f"{name}Requests"] = requests
+        results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Runs the Lambda handlers locally under a request mix and reports per-route latency and DynamoDB cost.
+
+Handlers are loaded the way the ``router`` function loads them and invoked
+with API Gateway v2 (payload 2.0) events carrying JWT claims. DynamoDB is
+either DynamoDB Local (set ``AWS_ENDPOINT_URL_DYNAMODB``) or, with ``--moto``,
+a moto server started by this script; the table and its GSIs are
+created if missing. Model calls are replaced by a stub that sleeps
+``--llm-ms`` and returns a fixed plan. ``--concurrency`` worker processes
+play the part of concurrent Lambda containers, each handling one request at
+a time.
+
+Every invocation is traced (``TRACE_SAMPLE_RATE=1``), and the DynamoDB call
+counts and consumed capacity are read from the EMF lines the handlers emit.
+Reports throughput, p50/p95/p99 latency, DynamoDB calls and capacity per
+request for each route. ``--save`` writes the report; ``--compare`` checks a
+run against a saved one and exits non-zero when a route's p95 grows by more
+than ``--tolerance`` or it makes more DynamoDB calls per request.
+
+    docker run -p 8000:8000 amazon/dynamodb-local
+    AWS_ENDPOINT_URL_DYNAMODB=http://localhost:8000 AWS_DEFAULT_REGION=us-east-2 \\
+        AWS_ACCESS_KEY_ID=local AWS_SECRET_ACCESS_KEY=local DB_TABLE=bench \\
+        python backend/tools/bench_handlers.py --requests 2000 --concurrency 8 --save baseline.json
+    python backend/tools/bench_handlers.py --moto --mix getTasks=70,addTask=30 --compare baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from multiprocessing import Pool
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "layers", "common", "python"))
+sys.path.insert(0, os.path.join(BACKEND, "lambdas", "router"))
+
+from local_dynamo import connect, ensure_table
+
+os.environ.setdefault("DB_TABLE", "bench")
+os.environ["TRACE_SAMPLE_RATE"] = "1"
+os.environ.setdefault("JOB_QUEUE_URL", "local")
+
+DEFAULT_MIX = "getTasks=40,getUserGoals=15,getDashboard=10,addTask=15,markTask=10,editTask=5,goalProcessor=5"
+STUB_PLAN = "\n".join(f"{i}. Work through step number {i} of the plan" for i in range(1, 11))
+
+# Request name -> (handler, routeKey, event builder); builders get the worker's random source and one seeded user
+ROUTES = {
+    "getTasks": ("getTasks", "GET /tasks", lambda r, u: {"params": {"goalId": u["goalId"]}}),
+    "getOpenTasks": ("getTasks", "GET /tasks", lambda r, u: {"params": {"goalId": u["goalId"], "status": "open", "limit": "20"}}),
+    "getDueTasks": ("getDueTasks", "GET /tasks/due", lambda r, u: {"params": {"before": "2100-01-01"}}),
+    "getUserGoals": ("getUserGoals", "GET /goals", lambda r, u: {}),
+    "getDashboard": ("getDashboard", "GET /dashboard", lambda r, u: {}),
+    "addTask": ("addTask", "POST /addTask", lambda r, u: {"params": {"goalId": u["goalId"]}, "body": {"taskText": f"Benchmark task {r.randrange(10**6)}"}}),
+    "markTask": ("markTask", "PATCH /markTask", lambda r, u: {"params": {"goalId": u["goalId"]}, "body": {"taskId": r.choice(u["taskIds"]), "completed": r.random() < 0.5}}),
+    "editTask": ("editTask", "PATCH /editTask", lambda r, u: {"params": {"goalId": u["goalId"]}, "body": {"taskId": r.choice(u["taskIds"]), "timeSpent": r.randrange(120)}}),
+    "goalProcessor": ("goalProcessor", "POST /goal", lambda r, u: {"body": {"goal": f"Benchmark goal {uuid.uuid4().hex[:8]}"}})
+}
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def make_event(route_key, user_id, params=None, body=None):
+    method, path = route_key.split(" ", 1)
+    return {
+        "version": "2.0",
+        "routeKey": route_key,
+        "rawPath": path,
+        "headers": {"content-type": "application/json"},
+        "queryStringParameters": params,
+        "body": json.dumps(body) if body is not None else None,
+        "requestContext": {
+            "http": {"method": method, "path": path},
+            "authorizer": {"jwt": {"claims": {"sub": user_id}}}
+        }
+    }
+
+
+def setup_process(llm_ms):
+    # Runs in every worker: stubs the model call and drops clients inherited from the parent, whose
+    # connections mustn't be shared across the fork; handlers are imported lazily by the router's loader
+    import common.clients as clients
+    import common.planner as planner
+
+    clients._clients.clear()
+
+    def stub(goal):
+        time.sleep(llm_ms / 1000)
+        return STUB_PLAN
+
+    planner.call_huggingface = stub
+
+
+def invoke(name, event):
+    # Returns (status, latency ms, trace metrics); the handler's log output is captured rather than printed
+    from lambda_function import get_handler
+
+    handler = get_handler(name)
+    out = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        result = handler(event, None)
+    ms = (time.perf_counter() - started) * 1000
+    trace = {}
+    for line in out.getvalue().splitlines():
+        if line.startswith("{") and '"DurationMs"' in line:
+            trace = json.loads(line)
+    return result.get("statusCode", 0), ms, trace
+
+
+def seed_users(count):
+    # One goal per user, created through goalProcessor so the items look like production ones
+    from lambda_function import get_handler
+
+    users = []
+    for _ in range(count):
+        user_id = f"bench-{uuid.uuid4().hex[:12]}"
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = get_handler("goalProcessor")(make_event("POST /goal", user_id, body={"goal": f"Benchmark goal {uuid.uuid4().hex[:8]}"}), None)
+        created = json.loads(result["body"])
+        users.append({"userId": user_id, "goalId": created["goalId"], "taskIds": [t["taskId"] for t in created["tasks"]]})
+    return users
+
+
+def run_chunk(args):
+    requests, users, seed = args
+    r = random.Random(seed)
+    results = []
+    for name in requests:
+        user = r.choice(users)
+        handler, route_key, build = ROUTES[name]
+        spec = build(r, user)
+        status, ms, trace = invoke(handler, make_event(route_key, user["userId"], spec.get("params"), spec.get("body")))
+        results.append((name, status, ms, trace.get("DynamoDBCalls", 0), trace.get("DynamoDBCapacityUnits", 0)))
+    return results
+
+
+def report(results, elapsed):
+    routes = {}
+    for name, status, ms, calls, capacity in results:
+        routes.setdefault(name, []).append((status, ms, calls, capacity))
+    out = {}
+    for name, rows in sorted(routes.items()):
+        latencies = [ms for _, ms, _, _ in rows]
+        out[name] = {
+            "requests": len(rows),
+            "errors": sum(1 for status, _, _, _ in rows if status >= 500),
+            "throughputRps": round(len(rows) / elapsed, 1),
+            "p50Ms": round(percentile(latencies, 50), 2),
+            "p95Ms": round(percentile(latencies, 95), 2),
+            "p99Ms": round(percentile(latencies, 99), 2),
+            "dynamoCallsPerRequest": round(sum(c for _, _, c, _ in rows) / len(rows), 2),
+            "capacityPerRequest": round(sum(c for _, _, _, c in rows) / len(rows), 2)
+        }
+    return {"elapsedSeconds": round(elapsed, 2), "throughputRps": round(len(results) / elapsed, 1), "routes": out}
+
+
+def regressions(current, baseline, tolerance):
+    found = []
+    for name, stats in current["routes"].items():
+        base = baseline["routes"].get(name)
+        if not base:
+            continue
+        if stats["p95Ms"] > base["p95Ms"] * (1 + tolerance):
+            found.append(f"{name}: p95 {base['p95Ms']} -> {stats['p95Ms']} ms")
+        if stats["dynamoCallsPerRequest"] > base["dynamoCallsPerRequest"]:
+            found.append(f"{name}: DynamoDB calls/request {base['dynamoCallsPerRequest']} -> {stats['dynamoCallsPerRequest']}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Comma-separated request=weight pairs")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--moto", action="store_true", help="Start a moto server instead of using AWS_ENDPOINT_URL_DYNAMODB")
+    parser.add_argument("--save", help="Write the report as JSON")
+    parser.add_argument("--compare", help="Baseline report to check this run against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    try:
+        connect(args.moto)
+    except RuntimeError as e:
+        parser.error(str(e))
+
+    weights = {}
+    for pair in args.mix.split(","):
+        name, _, weight = pair.partition("=")
+        if name not in ROUTES:
+            parser.error(f"unknown request {name}; expected one of {', '.join(ROUTES)}")
+        weights[name] = float(weight or 1)
+
+    setup_process(args.llm_ms)
+    ensure_table()
+    users = seed_users(args.users)
+
+    r = random.Random(args.seed)
+    requests = r.choices(list(weights), weights=list(weights.values()), k=args.requests)
+    chunks = [(requests[i::args.concurrency], users, args.seed + i) for i in range(args.concurrency)]
+
+    with Pool(args.concurrency, initializer=setup_process, initargs=(args.llm_ms,)) as pool:
+        started = time.perf_counter()
+        results = [row for chunk in pool.map(run_chunk, chunks) for row in chunk]
+        elapsed = time.perf_counter() - started
+
+    result = report(results, elapsed)
+    print(json.dumps(result, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(result, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measures each handler's import (Lambda init) time and how many modules it loads.
+
+Every sample imports one handler's ``lambda_function.py`` in a fresh Python
+process, the way a cold container does, and records the wall time of the
+import and the modules it added to ``sys.modules``. Reports the median over
+``--repeat`` processes per handler. ``--save`` and ``--compare`` keep a
+baseline, e.g. one taken on an older checkout.
+
+    python backend/tools/bench_imports.py --repeat 15 --save imports.json
+    python backend/tools/bench_imports.py --handlers getTasks addTask --compare imports.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDAS = os.path.join(BACKEND, "lambdas")
+LAYER = os.path.join(BACKEND, "layers", "common", "python")
+
+PROBE = """
+import importlib.util, json, sys, time
+before = set(sys.modules)
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location("lambda_function", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+ms = (time.perf_counter() - started) * 1000
+loaded = set(sys.modules) - before
+print(json.dumps({"ms": ms, "modules": len(loaded), "common": sorted(m for m in loaded if m.startswith("common."))}))
+"""
+
+
+def sample(handler):
+    env = {**os.environ, "PYTHONPATH": LAYER, "DB_TABLE": os.environ.get("DB_TABLE", "bench"), "JOB_QUEUE_URL": os.environ.get("JOB_QUEUE_URL", "local")}
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, os.path.join(LAMBDAS, handler, "lambda_function.py")],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--handlers", nargs="+", default=sorted(d for d in os.listdir(LAMBDAS) if os.path.exists(os.path.join(LAMBDAS, d, "lambda_function.py"))))
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--save", help="Write the report as JSON")
+    parser.add_argument("--compare", help="Earlier report to show next to this one")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report = {}
+    for handler in args.handlers:
+        samples = [sample(handler) for _ in range(args.repeat)]
+        report[handler] = {
+            "importMs": round(statistics.median(s["ms"] for s in samples), 2),
+            "modules": samples[-1]["modules"],
+            "commonModules": samples[-1]["common"]
+        }
+        if handler in baseline:
+            report[handler]["baselineImportMs"] = baseline[handler]["importMs"]
+            report[handler]["baselineModules"] = baseline[handler]["modules"]
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
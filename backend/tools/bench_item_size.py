@@ -0,0 +1,98 @@
+"""Compares task item size and getTasks read cost in the legacy and compact encodings.
+
+Builds synthetic tasks, writes each as a legacy item (long attribute names,
+every default stored, ISO ``createdAt``, ``type`` and ``updatedAt``) and as
+the compact item ``common.task_item`` writes, and reports the average item
+size and the read capacity a full ``GET /tasks`` query costs at each goal size
+(eventually consistent: 0.5 RCU per 4 KB, summed over the query's 1 MB pages).
+No DynamoDB needed.
+
+    python backend/tools/bench_item_size.py --sizes 10 100 1000
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "layers", "common", "python"))
+
+from common import item_size, task_item, task_sk, user_pk, sync_attributes, ranks_after
+
+WORDS = "research write draft review plan book call practice read outline schedule finish prepare update the a for of chapter site budget notes".split()
+PAGE_BYTES = 1024 * 1024
+
+
+def make_tasks(count):
+    r = random.Random(count)
+    return [{
+        "taskId": str(uuid.UUID(int=r.getrandbits(128))),
+        "taskText": " ".join(r.choice(WORDS) for _ in range(r.randint(4, 12))).capitalize(),
+        "createdAt": "2026-10-18T15:26:13.123456",
+        "completed": r.random() < 0.3,
+        "deadline": "2026-11-0%dT18:00" % r.randint(1, 9) if r.random() < 0.5 else "",
+        "timeSpent": r.randrange(600) if r.random() < 0.4 else 0,
+        "rank": rank
+    } for rank in ranks_after(None, count)]
+
+
+def legacy_item(pk, goal_id, task):
+    return {
+        "PK": {"S": pk},
+        "SK": {"S": task_sk(goal_id, task["taskId"])},
+        "type": {"S": "task"},
+        "taskText": {"S": task["taskText"]},
+        "completed": {"BOOL": task["completed"]},
+        "createdAt": {"S": task["createdAt"]},
+        "rank": {"S": task["rank"]},
+        "deadline": {"S": task["deadline"]},
+        "timeSpent": {"N": str(task["timeSpent"])},
+        "updatedAt": {"S": task["createdAt"]},
+        **sync_attributes(pk, goal_id)
+    }
+
+
+def compact_item(pk, goal_id, task):
+    item = task_item(pk, goal_id, task["taskId"], task["taskText"], task["rank"], task["createdAt"], task["deadline"])
+    if task["completed"]:
+        item["c"] = {"BOOL": True}
+    if task["timeSpent"]:
+        item["ts"] = {"N": str(task["timeSpent"])}
+    return item
+
+
+def query_rcu(sizes):
+    # Query rounds the summed size of each page (not each item) up to 4 KB
+    units = 0.0
+    page = 0
+    for size in sizes:
+        if page + size > PAGE_BYTES:
+            units += math.ceil(page / 4096) * 0.5
+            page = 0
+        page += size
+    return units + math.ceil(page / 4096) * 0.5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    pk = user_pk("bench")
+    goal_id = str(uuid.uuid4())
+    results = []
+    for count in args.sizes:
+        tasks = make_tasks(count)
+        row = {"tasks": count}
+        for name, build in (("legacy", legacy_item), ("compact", compact_item)):
+            sizes = [item_size(build(pk, goal_id, task)) for task in tasks]
+            row[f"{name}AvgBytes"] = round(sum(sizes) / count, 1)
+            row[f"{name}QueryRcu"] = query_rcu(sizes)
+        results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
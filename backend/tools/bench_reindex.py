@@ -0,0 +1,138 @@
+"""Times reindexTasks against the old one-UpdateItem-per-task reindex.
+
+Seeds a goal with ``--tasks`` ranked tasks and, for each scenario, reorders
+it twice: once the old way (read every task, then one ``update_item`` per
+task whether its position changed or not) and once through the
+``reindexTasks`` handler (changed tasks only, in 100-item
+``TransactWriteItems`` chunks). Scenarios: ``reverse`` moves every task,
+``moveOne`` moves the last task to the front, ``unchanged`` sends the current
+order. Reports the median time and write requests for each. Runs against
+DynamoDB Local (``AWS_ENDPOINT_URL_DYNAMODB``) or a moto server with ``--moto``.
+moto snapshots the whole table for every item of a ``TransactWriteItems``
+call, so under moto the transaction timings grow with the table and only the
+request counts carry over to DynamoDB; time against DynamoDB Local.
+
+    python backend/tools/bench_reindex.py --moto --tasks 20 200
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "layers", "common", "python"))
+os.environ.setdefault("DB_TABLE", "bench")
+
+from local_dynamo import connect, ensure_table
+
+SCENARIOS = {
+    "reverse": lambda ids: ids[::-1],
+    "moveOne": lambda ids: ids[-1:] + ids[:-1],
+    "unchanged": lambda ids: list(ids)
+}
+
+
+def load_handler():
+    spec = importlib.util.spec_from_file_location("reindexTasks_lambda_function", os.path.join(BACKEND, "lambdas", "reindexTasks", "lambda_function.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.lambda_handler
+
+
+def seed(pk, goal_id, count):
+    from common import batch_write, task_item, ranks_after
+
+    task_ids = [str(uuid.uuid4()) for _ in range(count)]
+    batch_write([{"PutRequest": {"Item": task_item(pk, goal_id, task_id, f"Task {i}", rank, "2026-10-18T12:00:00")}}
+                 for i, (task_id, rank) in enumerate(zip(task_ids, ranks_after(None, count)))])
+    return task_ids
+
+
+def clear(pk, goal_id):
+    # Keeps the table down to one goal, since moto copies the whole table for every item in a transaction
+    from common import delete_goal_tasks
+
+    delete_goal_tasks(pk, goal_id)
+
+
+def per_task_updates(pk, goal_id, task_ids):
+    # The old reindex: every task is read and rewritten with its new position
+    from common import get_db, DB_TABLE, query_pages, task_prefix, task_sk, ranks_after
+
+    db = get_db()
+    list(query_pages(
+        TableName=DB_TABLE,
+        KeyConditionExpression="PK = :pk AND begins_with(SK, :sk_prefix)",
+        ExpressionAttributeValues={":pk": {"S": pk}, ":sk_prefix": {"S": task_prefix(goal_id)}}
+    ))
+    for task_id, rank in zip(task_ids, ranks_after(None, len(task_ids))):
+        db.update_item(
+            TableName=DB_TABLE,
+            Key={"PK": {"S": pk}, "SK": {"S": task_sk(goal_id, task_id)}},
+            UpdateExpression="SET #rank = :rank",
+            ExpressionAttributeNames={"#rank": "rank"},
+            ExpressionAttributeValues={":rank": {"S": rank}}
+        )
+    return len(task_ids)
+
+
+def transactional(handler, user_id, goal_id, task_ids):
+    event = {
+        "requestContext": {"authorizer": {"jwt": {"claims": {"sub": user_id}}}},
+        "queryStringParameters": {"goalId": goal_id},
+        "body": json.dumps({"taskIds": task_ids})
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = handler(event, None)
+    updated = json.loads(result["body"])["updated"]
+    return -(-updated // 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[20, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--moto", action="store_true", help="Start a moto server instead of using AWS_ENDPOINT_URL_DYNAMODB")
+    args = parser.parse_args()
+
+    try:
+        connect(args.moto)
+    except RuntimeError as e:
+        parser.error(str(e))
+    ensure_table()
+
+    from common import user_pk
+
+    handler = load_handler()
+    user_id = "bench"
+    pk = user_pk(user_id)
+    results = []
+    for count in args.tasks:
+        for scenario, reorder in SCENARIOS.items():
+            row = {"tasks": count, "scenario": scenario}
+            for name in ("perTaskUpdate", "transactions"):
+                times = []
+                for _ in range(args.repeat):
+                    goal_id = str(uuid.uuid4())
+                    task_ids = reorder(seed(pk, goal_id, count))
+                    started = time.perf_counter()
+                    if name == "perTaskUpdate":
+                        requests = per_task_updates(pk, goal_id, task_ids)
+                    else:
+                        requests = transactional(handler, user_id, goal_id, task_ids)
+                    times.append((time.perf_counter() - started) * 1000)
+                    clear(pk, goal_id)
+                row[f"{name}Ms"] = round(statistics.median(times), 1)
+                row[f"{name}WriteRequests"] = requests
+            results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
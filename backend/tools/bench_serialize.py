@@ -0,0 +1,91 @@
+"""Measures getTasks payload size and serialize time at different list sizes.
+
+Builds synthetic task lists shaped like ``GET /tasks`` responses and, for each
+size, times stdlib ``json`` and ``orjson`` (when installed) and the identity,
+gzip and br (when ``brotli`` is installed) encodings ``encoded_response``
+would pick. ``--fields`` drops the task down to the listed fields, as
+``?fields=`` does.
+
+    python backend/tools/bench_serialize.py --sizes 100 1000 10000
+    python backend/tools/bench_serialize.py --fields taskText,completed
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "layers", "common", "python"))
+
+from common import api
+
+WORDS = "research write draft review plan book call practice read outline schedule finish prepare update the a for of chapter site budget notes".split()
+
+
+def make_tasks(count, fields=None):
+    r = random.Random(count)
+    tasks = []
+    for i in range(count):
+        task = {
+            "taskId": str(uuid.UUID(int=r.getrandbits(128))),
+            "taskText": " ".join(r.choice(WORDS) for _ in range(r.randint(4, 12))).capitalize(),
+            "createdAt": "2026-10-18T15:26:13.123456",
+            "rank": f"a{i:05d}",
+            "completed": r.random() < 0.3,
+            "deadline": "2026-11-0%dT18:00" % r.randint(1, 9) if r.random() < 0.5 else "",
+            "timeSpent": r.randrange(600),
+            "order": (i + 1) * 1000.0
+        }
+        if fields:
+            task = {k: v for k, v in task.items() if k in ("taskId", "order", *fields)}
+        tasks.append(task)
+    return {"tasks": tasks, "version": 1792338864427}
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--fields", help="Comma-separated fields to keep, as in ?fields=")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    fields = args.fields.split(",") if args.fields else None
+    encoders = {"json": lambda body: json.dumps(body).encode()}
+    if api.orjson is not None:
+        encoders["orjson"] = api.orjson.dumps
+    encodings = {"identity": lambda raw: raw, "gzip": lambda raw: gzip.compress(raw, compresslevel=5)}
+    if api.brotli is not None:
+        encodings["br"] = lambda raw: api.brotli.compress(raw, quality=4)
+
+    results = []
+    for size in args.sizes:
+        body = make_tasks(size, fields)
+        row = {"tasks": size}
+        for name, encode in encoders.items():
+            raw, ms = timed(lambda: encode(body), args.repeat)
+            row[f"{name}Ms"] = round(ms, 3)
+        raw = encoders["orjson" if "orjson" in encoders else "json"](body)
+        for name, compress in encodings.items():
+            data, ms = timed(lambda: compress(raw), args.repeat)
+            row[f"{name}Bytes"] = len(data)
+            row[f"{name}Ms"] = round(ms, 3)
+            # What API Gateway receives: base64 inflates compressed bodies by a third before it decodes them
+            if name != "identity":
+                row[f"{name}Base64Bytes"] = len(base64.b64encode(data))
+        results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
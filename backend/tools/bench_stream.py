@@ -0,0 +1,130 @@
+"""Measures time-to-first-task of goalProcessor's stream mode against the plain request with a fake model provider.
+
+The provider is a stand-in ``InferenceClient`` that answers after
+``--first-token-ms`` and then sends the plan in small chunks, one every
+``--chunk-ms``; without ``stream`` it sleeps for the whole generation and
+returns the text at once. Every run posts a fresh goal, so the plan cache
+never answers. For each mode it reports the median time until the handler
+returns (what a client behind API Gateway waits for either way) and, for
+stream mode, the ``TimeToFirstTask`` the handler emits: how long after the
+goal item is written the first task is stored and readable through
+``GET /tasks``. Runs against DynamoDB Local (``AWS_ENDPOINT_URL_DYNAMODB``)
+or a moto server started with ``--moto``.
+
+    python backend/tools/bench_stream.py --moto --tasks 10 --first-token-ms 400 --chunk-ms 25
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import types
+import uuid
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "layers", "common", "python"))
+sys.path.insert(0, os.path.join(BACKEND, "lambdas", "router"))
+os.environ.setdefault("DB_TABLE", "bench")
+os.environ.setdefault("JOB_QUEUE_URL", "local")
+
+from local_dynamo import connect, ensure_table
+
+CHUNK_CHARS = 4
+
+
+class FakeProvider:
+    # Answers chat.completions.create like an InferenceClient, at a fixed first-token latency and chunk rate
+    def __init__(self, plan, first_token_ms, chunk_ms):
+        self.plan = plan
+        self.first_token_ms = first_token_ms
+        self.chunk_ms = chunk_ms
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def chunks(self):
+        return [self.plan[i:i + CHUNK_CHARS] for i in range(0, len(self.plan), CHUNK_CHARS)]
+
+    def create(self, model, messages, stream=False):
+        if not stream:
+            time.sleep((self.first_token_ms + self.chunk_ms * len(self.chunks())) / 1000)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message={"content": self.plan})])
+        return self.stream()
+
+    def stream(self):
+        time.sleep(self.first_token_ms / 1000)
+        for content in self.chunks():
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=content))])
+            time.sleep(self.chunk_ms / 1000)
+
+
+def make_event(user_id, body):
+    return {
+        "headers": {"content-type": "application/json"},
+        "body": json.dumps(body),
+        "requestContext": {"authorizer": {"jwt": {"claims": {"sub": user_id}}}}
+    }
+
+
+def invoke(handler, body):
+    # Returns (status, ms, emitted metrics); the handler's log output is captured rather than printed
+    out = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        result = handler(make_event("bench-stream", body), None)
+    ms = (time.perf_counter() - started) * 1000
+    metrics = {}
+    for line in out.getvalue().splitlines():
+        if line.startswith("{") and '"_aws"' in line:
+            metrics.update(json.loads(line))
+    return result["statusCode"], ms, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10)
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--chunk-ms", type=float, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--moto", action="store_true", help="Start a moto server instead of using AWS_ENDPOINT_URL_DYNAMODB")
+    args = parser.parse_args()
+
+    try:
+        connect(args.moto)
+    except RuntimeError as e:
+        parser.error(str(e))
+    ensure_table()
+
+    import common.inference as inference
+    from lambda_function import get_handler
+
+    plan = "Here is your plan:\n\n" + "\n".join(f"{i}. Work through step number {i} of the plan" for i in range(1, args.tasks + 1))
+    provider = FakeProvider(plan, args.first_token_ms, args.chunk_ms)
+    inference.PROVIDERS = [("fake", "model")]
+    inference.inference_client = lambda name: provider
+    handler = get_handler("goalProcessor")
+
+    runs = {"plain": [], "stream": []}
+    first_task = []
+    for _ in range(args.repeat):
+        for mode in runs:
+            body = {"goal": f"Benchmark goal {uuid.uuid4().hex[:8]}", "stream": mode == "stream"}
+            status, ms, metrics = invoke(handler, body)
+            if status != 200:
+                raise SystemExit(f"{mode} request failed with {status}")
+            runs[mode].append(ms)
+            if mode == "stream":
+                first_task.append(metrics["TimeToFirstTask"])
+
+    print(json.dumps({
+        "tasks": args.tasks,
+        "modelMs": round(args.first_token_ms + args.chunk_ms * len(provider.chunks())),
+        "plainResponseMs": round(statistics.median(runs["plain"]), 1),
+        "streamResponseMs": round(statistics.median(runs["stream"]), 1),
+        "streamFirstTaskStoredMs": round(statistics.median(first_task), 1)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
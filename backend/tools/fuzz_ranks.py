@@ -0,0 +1,80 @@
+"""Drives rank keys through long runs of random moves and inserts and checks they stay ordered, unique and short.
+
+Each step either inserts a new task or moves an existing one, at a random
+position or, with probability ``--hot``, to just after the first task, so
+it lands between that task and the one moved there last (the pattern that
+makes keys grow fastest). Every new key has to fall strictly between its
+neighbours. When one comes out longer than ``REBALANCE_LENGTH`` the list is
+renumbered, as ``reindex_goal`` does after ``request_rebalance``. Reports
+the longest key seen, the number of rebalances and the steps per second;
+exits non-zero on a collision, a misordered key or a key longer than
+``REBALANCE_LENGTH + 1``. ``tests/test_ranks.py`` runs the same check on a
+smaller scale.
+
+    python backend/tools/fuzz_ranks.py --steps 1000000 --seeds 3
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "layers", "common", "python"))
+
+from common.ranks import rank_between, ranks_after, validate_rank, REBALANCE_LENGTH
+
+
+def simulate(seed, steps, size=500, hot=0.0):
+    # Returns {"maxLength", "rebalances"}; raises AssertionError when a key breaks the order or the length bound
+    rng = random.Random(seed)
+    keys = ranks_after(None, size // 2)
+    max_length = 0
+    rebalances = 0
+    for _ in range(steps):
+        n = len(keys)
+        if n < 2 or (n < size and rng.random() < 0.2):
+            i = rng.randrange(n + 1)
+        else:
+            j = rng.randrange(n)
+            keys.pop(j)
+            n -= 1
+            i = 1 if rng.random() < hot else rng.randrange(n + 1)
+        prev = keys[i - 1] if i > 0 else None
+        nxt = keys[i] if i < n else None
+        key = rank_between(prev, nxt)
+        validate_rank(key)
+        assert (prev is None or prev < key) and (nxt is None or key < nxt), (prev, key, nxt)
+        assert len(key) <= REBALANCE_LENGTH + 1, key
+        keys.insert(i, key)
+        max_length = max(max_length, len(key))
+        if len(key) > REBALANCE_LENGTH:
+            keys = ranks_after(None, len(keys))
+            rebalances += 1
+    assert keys == sorted(set(keys))
+    return {"maxLength": max_length, "rebalances": rebalances}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=1000000)
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--size", type=int, default=500, help="Most tasks in the list at once")
+    parser.add_argument("--hot", type=float, nargs="+", default=[0.0, 0.01, 0.5])
+    args = parser.parse_args()
+
+    results = []
+    for hot in args.hot:
+        for seed in range(args.seeds):
+            started = time.perf_counter()
+            try:
+                row = simulate(seed, args.steps, args.size, hot)
+            except AssertionError as e:
+                raise SystemExit(f"hot={hot} seed={seed}: {e}")
+            elapsed = time.perf_counter() - started
+            results.append({"hot": hot, "seed": seed, **row, "stepsPerSecond": round(args.steps / elapsed)})
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
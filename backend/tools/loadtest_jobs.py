@@ -0,0 +1,91 @@
+"""Bursts async goal submissions at a deployed API and polls the jobs to completion.
+
+Submits ``--burst`` goals to ``POST /goal`` with ``"async": true`` from
+``--concurrency`` threads, then polls ``GET /goalJob`` until every job is done
+or failed (or ``--timeout-s`` passes). Reports submit latency, end-to-end job
+latency and completed jobs per second. Each goal gets a unique suffix so the
+plan cache doesn't hide the model latency; pass ``--reuse-goal`` to measure
+the cached path instead.
+
+    python backend/tools/loadtest_jobs.py https://<api-id>.execute-api.<region>.amazonaws.com --token "$ID_TOKEN" --burst 200
+"""
+import argparse
+import json
+import time
+import uuid
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def call(url, token, method="GET", payload=None):
+    req = urllib.request.Request(url, method=method, data=json.dumps(payload).encode() if payload is not None else None, headers={
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json"
+    })
+    with urllib.request.urlopen(req, timeout=30) as res:
+        return json.loads(res.read())
+
+
+def submit(args, i):
+    goal = args.goal if args.reuse_goal else f"{args.goal} ({uuid.uuid4().hex[:8]})"
+    started = time.time()
+    job = call(f"{args.api}/goal", args.token, "POST", {"goal": goal, "async": True})
+    return {"jobId": job["jobId"], "submittedAt": started, "submitMs": (time.time() - started) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("api", help="API base URL")
+    parser.add_argument("--token", required=True, help="Cognito ID token")
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--goal", default="Learn to cook ten weeknight dinners in two months")
+    parser.add_argument("--reuse-goal", action="store_true")
+    parser.add_argument("--poll-interval-s", type=float, default=1.0)
+    parser.add_argument("--timeout-s", type=float, default=600.0)
+    args = parser.parse_args()
+    args.api = args.api.rstrip("/")
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        jobs = list(pool.map(lambda i: submit(args, i), range(args.burst)))
+    submitted = time.time()
+
+    pending = {job["jobId"]: job for job in jobs}
+    finished = {}
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        while pending and time.time() - started < args.timeout_s:
+            statuses = pool.map(lambda job_id: call(f"{args.api}/goalJob?jobId={job_id}", args.token), list(pending))
+            now = time.time()
+            for status in statuses:
+                if status["status"] in ("done", "failed"):
+                    job = pending.pop(status["jobId"])
+                    finished[status["jobId"]] = {**job, "status": status["status"], "totalMs": (now - job["submittedAt"]) * 1000}
+            if pending:
+                time.sleep(args.poll_interval_s)
+    elapsed = time.time() - started
+
+    done = [job for job in finished.values() if job["status"] == "done"]
+    print(json.dumps({
+        "submitted": len(jobs),
+        "submitSeconds": round(submitted - started, 2),
+        "submitP50Ms": percentile([job["submitMs"] for job in jobs], 50),
+        "submitP99Ms": percentile([job["submitMs"] for job in jobs], 99),
+        "done": len(done),
+        "failed": len(finished) - len(done),
+        "timedOut": len(pending),
+        "jobP50Ms": percentile([job["totalMs"] for job in done], 50),
+        "jobP99Ms": percentile([job["totalMs"] for job in done], 99),
+        "jobsPerSecond": round(len(done) / elapsed, 2) if elapsed else 0.0
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Local DynamoDB for the bench scripts: a moto server, or DynamoDB Local via ``AWS_ENDPOINT_URL_DYNAMODB``.
+
+``connect(use_moto)`` points boto3 at one or the other and ``ensure_table()``
+creates the app table with its GSIs when it is missing. Import it after
+``common`` is importable (the scripts put the layer on ``sys.path`` first).
+"""
+import logging
+import os
+
+
+def connect(use_moto):
+    # Returns the endpoint in use; raises when neither a moto server nor AWS_ENDPOINT_URL_DYNAMODB is available
+    if use_moto:
+        from moto.server import ThreadedMotoServer
+
+        # The server logs every request to stderr otherwise
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = ThreadedMotoServer(port=0)
+        server.start()
+        host, port = server.get_host_and_port()
+        os.environ["AWS_ENDPOINT_URL_DYNAMODB"] = f"http://{host}:{port}"
+        for name, value in (("AWS_ACCESS_KEY_ID", "local"), ("AWS_SECRET_ACCESS_KEY", "local"), ("AWS_DEFAULT_REGION", "us-east-2")):
+            os.environ.setdefault(name, value)
+    elif not os.environ.get("AWS_ENDPOINT_URL_DYNAMODB"):
+        raise RuntimeError("set AWS_ENDPOINT_URL_DYNAMODB to a local DynamoDB, or pass --moto")
+    return os.environ["AWS_ENDPOINT_URL_DYNAMODB"]
+
+
+def ensure_table():
+    from common import get_db, DB_TABLE, RANK_INDEX, OPEN_INDEX, DUE_INDEX
+    from common.sync import SYNC_INDEX
+
+    db = get_db()
+    if DB_TABLE in db.list_tables()["TableNames"]:
+        return
+    db.create_table(
+        TableName=DB_TABLE,
+        KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}, {"AttributeName": "SK", "KeyType": "RANGE"}],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "syncKey", "AttributeType": "S"},
+            {"AttributeName": "version", "AttributeType": "N"},
+            {"AttributeName": "rank", "AttributeType": "S"},
+            {"AttributeName": "openKey", "AttributeType": "S"},
+            {"AttributeName": "dueKey", "AttributeType": "S"},
+            {"AttributeName": "dl", "AttributeType": "S"}
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": index,
+            "KeySchema": [{"AttributeName": partition, "KeyType": "HASH"}, {"AttributeName": sort, "KeyType": "RANGE"}],
+            "Projection": {"ProjectionType": "ALL"}
+        } for index, partition, sort in ((SYNC_INDEX, "syncKey", "version"), (RANK_INDEX, "syncKey", "rank"), (OPEN_INDEX, "openKey", "rank"), (DUE_INDEX, "dueKey", "dl"))],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    db.get_waiter("table_exists").wait(TableName=DB_TABLE)
@@ -0,0 +1,86 @@
+"""Replays a recorded request mix against a model of Lambda container pools.
+
+Each line of the input file is a JSON object with ``time`` (seconds since the
+start of the recording), ``routeKey`` and optionally ``durationMs``. The mix is
+replayed twice: once with one function per route, as deployed today, and once
+with every routed path sharing the ``router`` function's containers. A request
+is a cold start when its function has no idle container.
+
+Nothing is invoked: each request takes its recorded ``durationMs`` (or
+``--duration-ms``) and a cold start adds a flat ``--cold-start-ms``, so the
+latencies in the report are modelled from those inputs, not measured. The
+cold-start counts depend only on the timing of the mix and the pool rules.
+Use ``bench_handlers.py`` to measure handler latency and ``bench_imports.py``
+to measure per-handler init time, and feed the results in here.
+
+    python backend/tools/replay.py requests.jsonl --cold-start-ms 450
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambdas", "router"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "layers", "common", "python"))
+
+from lambda_function import ROUTES
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def simulate(requests, function_for, cold_start_ms, idle_timeout_s, duration_ms):
+    # Per function: list of times at which each container becomes free
+    pools = {}
+    cold = 0
+    latencies = []
+    for req in requests:
+        fn = function_for(req["routeKey"])
+        pool = pools.setdefault(fn, [])
+        now = req["time"]
+        # Containers idle for longer than the timeout are reclaimed
+        pool[:] = [free_at for free_at in pool if now - free_at < idle_timeout_s or free_at > now]
+        idle = [i for i, free_at in enumerate(pool) if free_at <= now]
+        latency = req.get("durationMs", duration_ms)
+        if idle:
+            pool.pop(idle[0])
+        else:
+            cold += 1
+            latency += cold_start_ms
+        pool.append(now + latency / 1000)
+        latencies.append(latency)
+    return {
+        "requests": len(requests),
+        "coldStarts": cold,
+        "coldStartRate": cold / len(requests) if requests else 0.0,
+        "modelP50Ms": percentile(latencies, 50),
+        "modelP99Ms": percentile(latencies, 99),
+        "functions": len(pools)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", help="JSON lines file of recorded requests")
+    parser.add_argument("--cold-start-ms", type=float, default=400.0)
+    parser.add_argument("--idle-timeout-s", type=float, default=600.0)
+    parser.add_argument("--duration-ms", type=float, default=50.0, help="Duration of requests recorded without durationMs")
+    args = parser.parse_args()
+
+    with open(args.recording) as f:
+        requests = sorted((json.loads(line) for line in f if line.strip()), key=lambda r: r["time"])
+
+    results = {
+        "model": {"coldStartMs": args.cold_start_ms, "idleTimeoutS": args.idle_timeout_s, "durationMs": args.duration_ms},
+        "perFunction": simulate(requests, lambda route: route, args.cold_start_ms, args.idle_timeout_s, args.duration_ms),
+        "router": simulate(requests, lambda route: "router" if route in ROUTES else route, args.cold_start_ms, args.idle_timeout_s, args.duration_ms)
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
+import { idempotentFetch } from "./idempotency";
 
 export const addGoal = async (goal: string, token: string) => {
     try {
-        const res = await fetch('https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/goal', {
+        const res = await idempotentFetch('https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/goal', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
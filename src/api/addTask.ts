@@ -1,7 +1,8 @@
+import { idempotentFetch } from "./idempotency";
 import { Task } from "./tasks";
 
 export const addTask = async (goalId: string, task: Partial<Task>, token: string) => {
-    const res = await fetch(`https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/addTask?goalId=${goalId}`, {
+    const res = await idempotentFetch(`https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/addTask?goalId=${goalId}`, {
         method: 'POST',
         headers: {
             Authorization: `Bearer ${token}`,
@@ -0,0 +1,42 @@
+import { Goal } from "./goals";
+
+export interface GoalSummary extends Goal {
+    total: number;
+    completed: number;
+    overdue: number;
+    timeSpent: number;
+}
+
+export interface Dashboard {
+    goals: GoalSummary[];
+    totals: {
+        goals: number;
+        total: number;
+        completed: number;
+        overdue: number;
+        timeSpent: number;
+    };
+}
+
+const localNow = () => {
+    const d = new Date();
+    return new Date(d.getTime() - d.getTimezoneOffset() * 60000).toISOString().slice(0, 16);
+};
+
+export const fetchDashboard = async (token: string): Promise<Dashboard> => {
+    try {
+        const res = await fetch(`https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/dashboard?now=${encodeURIComponent(localNow())}`, {
+            headers: {
+                Authorization: `Bearer ${token}`,
+                "Content-Type": "application/json"
+            }
+        });
+
+        if (!res.ok) throw new Error("Failed to fetch dashboard");
+
+        return await res.json();
+    } catch (err) {
+        console.error(err);
+        throw err;
+    }
+};
@@ -1,6 +1,7 @@
+import { idempotentFetch } from "./idempotency";
 
 export const deleteGoal = async (goalId: string, token: string) => {
-    const res = await fetch(`https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/deleteGoal?goalId=${goalId}`, {
+    const res = await idempotentFetch(`https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/deleteGoal?goalId=${goalId}`, {
         method: 'DELETE',
         headers: {
             Authorization: `Bearer ${token}`,
@@ -4,6 +4,10 @@ export interface Goal {
     goalId: string;
     goalText: string;
     createdAt: string;
+    taskCount?: number;
+    completedCount?: number;
+    totalTimeSpent?: number;
+    nextDeadline?: string | null;
 }
 
 export const fetchGoals = async (token: string): Promise<Goal[]> => {
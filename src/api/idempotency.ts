@@ -0,0 +1,17 @@
+// Sends the request with an Idempotency-Key header and retries network failures with the same key,
+// so a request that reached the server before the connection dropped is replayed instead of repeated.
+export const idempotentFetch = async (url: string, init: RequestInit, attempts = 3): Promise<Response> => {
+    const key = crypto.randomUUID();
+
+    for (let attempt = 1; ; attempt++) {
+        try {
+            return await fetch(url, {
+                ...init,
+                headers: { ...(init.headers as Record<string, string>), 'Idempotency-Key': key },
+            });
+        } catch (err) {
+            if (attempt >= attempts) throw err;
+            await new Promise((resolve) => setTimeout(resolve, 250 * 2 ** attempt));
+        }
+    }
+};
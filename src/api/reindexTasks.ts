@@ -1,5 +1,5 @@
 
-export const reindexTasks = async (goalId: string, token: string): Promise<void> => {
+export const reindexTasks = async (goalId: string, token: string, taskIds?: string[]): Promise<void> => {
     try {
         const res = await fetch(`https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/reindexTasks?goalId=${goalId}`, {
             method: 'POST',
@@ -7,6 +7,7 @@ export const reindexTasks = async (goalId: string, token: string): Promise<void>
                 Authorization: `Bearer ${token}`,
                 "Content-Type": "application/json"
             },
+            body: taskIds ? JSON.stringify({ taskIds }) : undefined,
         });
 
         if (!res.ok) throw new Error("Failed to reindex tasks");
@@ -15,4 +16,4 @@ export const reindexTasks = async (goalId: string, token: string): Promise<void>
         console.error(err);
         throw err;
     }
-};
\ No newline at end of file
+};
@@ -2,16 +2,18 @@ export type TaskOrderInput = {
     goalId: string;
     taskId: string;
     newOrder: number;
+    prevRank?: string;
+    nextRank?: string;
 };
 
-export const taskOrder = async ({ goalId, taskId, newOrder }: TaskOrderInput, token: string) => {
+export const taskOrder = async ({ goalId, taskId, prevRank, nextRank }: TaskOrderInput, token: string) => {
     const res = await fetch(`https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/updateTaskOrder?goalId=${goalId}`, {
         method: 'PATCH',
         headers: {
             Authorization: `Bearer ${token}`,
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ goalId, taskId, newOrder }),
+        body: JSON.stringify({ taskId, prevRank, nextRank }),
     });
 
     if (!res.ok) {
@@ -3,27 +3,62 @@ export interface Task {
     taskText: string;
     createdAt: string;
     order: number;
+    rank?: string;
     completed: boolean;
     deadline?: string;
     timeSpent?: number;
 }
 
-export const fetchTasks = async ({ queryKey }: { queryKey: string[] }, token: string): Promise<Task[]> => {
+const TASKS_URL = 'https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/tasks';
+
+// Sync cursor per goal from the last response; the next refetch only asks for what changed after it
+const cursors = new Map<string, number>();
+
+// Plain comparison, not localeCompare: rank keys are ordered by character code
+const byRank = (a: Task, b: Task) => {
+    const ra = a.rank ?? '';
+    const rb = b.rank ?? '';
+    return ra < rb ? -1 : ra > rb ? 1 : a.order - b.order;
+};
+
+const mergeTasks = (previous: Task[], changed: Task[], deleted: string[]): Task[] => {
+    const byId = new Map(previous.map((task) => [task.taskId, task]));
+    deleted.forEach((taskId) => byId.delete(taskId));
+    changed.forEach((task) => byId.set(task.taskId, { ...byId.get(task.taskId), ...task }));
+
+    return [...byId.values()]
+        .sort(byRank)
+        .map((task, i) => ({ ...task, order: (i + 1) * 1000 }));
+};
+
+export const fetchTasks = async ({ queryKey }: { queryKey: string[] }, token: string, previous?: Task[]): Promise<Task[]> => {
     const [, goalId] = queryKey;
+    const headers = {
+        Authorization: `Bearer ${token}`,
+        "Content-Type": "application/json"
+    };
     try {
-        const res = await fetch(`https://8ngxqqzrpc.execute-api.us-east-2.amazonaws.com/dev/tasks?goalId=${goalId}`, {
-            headers: {
-                Authorization: `Bearer ${token}`,
-                "Content-Type": "application/json"
-            },
-        });
+        const since = cursors.get(goalId);
+        if (previous && since !== undefined) {
+            const res = await fetch(`${TASKS_URL}?goalId=${goalId}&since=${since}`, { headers });
+
+            // Anything else (e.g. 410 once the cursor is older than the tombstones) falls back to a full fetch
+            if (res.ok) {
+                const data = await res.json();
+                cursors.set(goalId, data.version);
+                return mergeTasks(previous, data.tasks, data.deleted);
+            }
+        }
+
+        const res = await fetch(`${TASKS_URL}?goalId=${goalId}`, { headers });
 
         if (!res.ok) throw new Error("Failed to fetch tasks");
 
         const data = await res.json();
+        cursors.set(goalId, data.version);
         return data.tasks
     } catch (err) {
         console.error(err);
         throw err;
     }
-};
\ No newline at end of file
+};
@@ -0,0 +1,17 @@
+import { useQuery } from '@tanstack/react-query';
+import { fetchDashboard } from '../api/dashboard';
+import { useAuth } from 'react-oidc-context';
+
+export const useDashboardQuery = () => {
+    const auth = useAuth();
+    const token = auth.user?.access_token;
+
+    return useQuery({
+        // Under 'goals' so goal mutations invalidate it too
+        queryKey: ['goals', 'dashboard'],
+        queryFn: () => fetchDashboard(token!),
+        enabled: !!token,
+        // Task mutations on the goal page don't touch this key, so refresh whenever the dashboard is shown
+        refetchOnMount: 'always',
+    });
+};
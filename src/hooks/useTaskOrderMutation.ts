@@ -24,6 +24,14 @@ export const useTaskOrderMutation = (goalId: string) => {
             return { previousTasks };
         },
 
+        onSuccess: (data, { taskId }) => {
+            queryClient.setQueryData<any[]>(['tasks', goalId], old =>
+                old?.map(task =>
+                    task.taskId === taskId ? { ...task, rank: data.rank } : task
+                )
+            );
+        },
+
         onError: (_err, _vars, context) => {
             if (context?.previousTasks) {
                 queryClient.setQueryData(['tasks', goalId], context.previousTasks);
@@ -1,15 +1,17 @@
-import { useQuery } from '@tanstack/react-query';
-import { fetchTasks } from '../api/tasks';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
+import { fetchTasks, Task } from '../api/tasks';
 import { useAuth } from 'react-oidc-context';
 
 export const useTasksQuery = (goalId: string) => {
+    const queryClient = useQueryClient();
     const auth = useAuth();
     const token = auth.user?.access_token;
 
     return useQuery({
         queryKey: ['tasks', goalId],
-        queryFn: ({ queryKey }) => fetchTasks({ queryKey }, token!),
+        // The cached list is patched with just the changes since the last fetch
+        queryFn: ({ queryKey }) => fetchTasks({ queryKey }, token!, queryClient.getQueryData<Task[]>(['tasks', goalId])),
         enabled: !!goalId && !!token,
         staleTime: 1000 * 60, // 1 min freshness
     });
-};
\ No newline at end of file
+};
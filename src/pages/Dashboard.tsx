@@ -5,8 +5,7 @@ import { Goal } from '../api/goals';
 import { useState } from 'react';
 import { useDeleteGoalMutation } from '../hooks/useDeleteGoalMutation';
 import { useAddGoalMutation } from '../hooks/useAddGoalMutation';
-import { useQueries } from '@tanstack/react-query';
-import { fetchTasks, Task } from '../api/tasks';
+import { useDashboardQuery } from '../hooks/useDashboardQuery';
 
 
 export default function Dashboard() {
@@ -20,26 +19,17 @@ export default function Dashboard() {
     const [confirmDeleteId, setConfirmDeleteId] = useState<string | null>(null);
     const { mutate: deleteGoal, isPending: isDeletingGoal } = useDeleteGoalMutation();
 
-    const token = auth.user?.access_token;
-    const taskQueries = useQueries({
-        queries: goals.map((g) => ({
-            queryKey: ['tasks', g.goalId],
-            queryFn: ({ queryKey }: { queryKey: string[] }) => fetchTasks({ queryKey }, token!),
-            enabled: !!token && goals.length > 0,
-            staleTime: 1000 * 60,
-        })),
-    });
+    const { data: dashboard, isLoading: statsLoading } = useDashboardQuery();
+    const summaries = new Map((dashboard?.goals ?? []).map((g) => [g.goalId, g]));
 
-    const allTasks: Task[] = taskQueries.flatMap((q) => q.data ?? []);
-    const totalTasks = allTasks.length;
-    const completedTasks = allTasks.filter((t) => t.completed).length;
+    const totalTasks = dashboard?.totals.total ?? 0;
+    const completedTasks = dashboard?.totals.completed ?? 0;
     const completionRate = totalTasks > 0 ? Math.round((completedTasks / totalTasks) * 100) : 0;
     const now = new Date();
     const goalsThisMonth = goals.filter((g) => {
         const d = new Date(g.createdAt);
         return d.getMonth() === now.getMonth() && d.getFullYear() === now.getFullYear();
     }).length;
-    const statsLoading = taskQueries.some((q) => q.isLoading);
 
     if (isLoading) {
         return (
@@ -224,11 +214,11 @@ export default function Dashboard() {
                         </div>
                     ) : (
                         <div className="space-y-4">
-                            {goals.map((goal, idx) => {
-                                const goalTasks = taskQueries[idx]?.data ?? [];
-                                const goalTasksLoading = taskQueries[idx]?.isLoading;
-                                const goalTotal = goalTasks.length;
-                                const goalCompleted = goalTasks.filter((t) => t.completed).length;
+                            {goals.map((goal) => {
+                                const summary = summaries.get(goal.goalId);
+                                const goalTasksLoading = statsLoading;
+                                const goalTotal = summary?.total ?? 0;
+                                const goalCompleted = summary?.completed ?? 0;
                                 const goalRate = goalTotal > 0 ? Math.round((goalCompleted / goalTotal) * 100) : 0;
                                 const goalStatus = goalTotal === 0 ? 'empty' : goalRate === 100 ? 'done' : goalCompleted > 0 ? 'active' : 'pending';
                                 const statusConfig = {
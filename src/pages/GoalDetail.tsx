@@ -1,6 +1,5 @@
 import { useTasksQuery } from '../hooks/useTasksQuery';
 import { useTaskOrderMutation } from '../hooks/useTaskOrderMutation';
-import { reindexTasks } from '../api/reindexTasks';
 import { useParams } from 'react-router-dom';
 import {
     DndContext,
@@ -25,8 +24,6 @@ import AddTaskModal from '../components/AddTaskModal';
 import CheckmarkDropZone, { COMPLETE_DROPZONE_ID } from '../components/CheckmarkDropZone';
 import { useState, useMemo, useEffect } from 'react';
 import { Task } from '../api/tasks';
-import { useAuth } from 'react-oidc-context';
-import { useQueryClient } from '@tanstack/react-query';
 import { useEditTaskMutation } from '../hooks/useEditTaskMutation';
 import { useDeleteTaskMutation } from '../hooks/useDeleteTaskMutation';
 import { useAddTaskMutation } from '../hooks/useAddTaskMutation';
@@ -40,9 +37,6 @@ function computeFractionalOrder(before?: number, after?: number): number {
 }
 
 export default function GoalDetail() {
-    const queryClient = useQueryClient();
-    const auth = useAuth();
-    const token = auth.user?.access_token;
     const { goalId } = useParams();
     const { data: tasks = [], isLoading, error } = useTasksQuery(goalId!);
     const { mutate: taskOrder } = useTaskOrderMutation(goalId!);
@@ -186,19 +180,7 @@ export default function GoalDetail() {
             ));
 
             if (goalId) {
-                taskOrder({ goalId, taskId: active.id as string, newOrder },
-                    {
-                        onSuccess: () => {
-                            if (newOrder % 1 > 0 && newOrder % 1 < 0.0001) {
-                                reindexTasks(goalId, token!).then(() => {
-                                    queryClient.invalidateQueries({ queryKey: ['tasks', goalId] });
-                                }).catch((e) => {
-                                    console.error('Reindexing failed:', e.message);
-                                });
-                            }
-                        }
-                    }
-                );
+                taskOrder({ goalId, taskId: active.id as string, newOrder, prevRank: before?.rank, nextRank: after?.rank });
             }
         }
 